@@ -1,13 +1,18 @@
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_restful import Api
+from age_estimator import AgeEstimator
+from pipeline_sdk.blobs import create_image_blobs
 from pipeline_sdk.proxies import ServiceJWT, ServerIdentityClient, \
     DiscoveryServiceClient
 from pipeline_sdk.utils import compose_relative_resource_url
+from pipeline_sdk.versioning import ModelVersion, weights_digest
 
+from .inference import FacesAgeEstimator
 from .resources import AgeEstimation
 from .config import SERVICE_NAME, API_VERSION, SERVICE_SECRET, \
-    IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS
+    IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS, IMAGE_BLOBS_DIR, \
+    DECODED_IMAGES_CACHE_SIZE, WEIGHTS_PATH
 
 INTER_SERVICES_TOKEN = None
 app = Flask(__name__)
@@ -22,9 +27,26 @@ def create_api() -> Api:
     secret, INTER_SERVICES_TOKEN = _fetch_config_from_identity_service()
     app.config['JWT_SECRET_KEY'] = secret
     api = Api(app)
+    model = AgeEstimator.initialize(weights_path=WEIGHTS_PATH)
     api.add_resource(
         AgeEstimation,
         compose_relative_resource_url(SERVICE_NAME, API_VERSION, 'estimate_age'),
+        resource_class_kwargs={
+            'estimator': FacesAgeEstimator(model=model),
+            'image_blobs': create_image_blobs(
+                blobs_dir=IMAGE_BLOBS_DIR,
+                max_decoded_images=DECODED_IMAGES_CACHE_SIZE
+            )
+        }
+    )
+    api.add_resource(
+        ModelVersion,
+        compose_relative_resource_url(
+            SERVICE_NAME, API_VERSION, 'model_version'
+        ),
+        resource_class_kwargs={
+            'model_version': weights_digest(weights_path=WEIGHTS_PATH)
+        }
     )
     return api
 
@@ -2,3 +2,10 @@ import os
 
 
 AGE_ESTIMATION_CHANNEL = os.environ['AGE_ESTIMATION_CHANNEL']
+RESOURCES_MANAGER_SERVICE_NAME = os.environ.get(
+    'RESOURCES_MANAGER_SERVICE_NAME', 'resources_manager_service'
+)
+RESOURCES_MANAGER_NODES = os.environ.get(
+    'RESOURCES_MANAGER_NODES', RESOURCES_MANAGER_SERVICE_NAME
+).split(',')
+RESOURCES_MANAGER_API_VERSION = 'v1'
@@ -17,3 +17,8 @@ DISCOVERY_SERVICE_SPECS = ServiceSpecs(
     service_name=os.environ['DISCOVERY_SERVICE_NAME'],
     version='v1'
 )
+WEIGHTS_PATH = os.path.join(
+    os.path.dirname(__file__), '..', 'weights', 'weights.pth'
+)
+IMAGE_BLOBS_DIR = os.environ.get('IMAGE_BLOBS_DIR')
+DECODED_IMAGES_CACHE_SIZE = 16
@@ -0,0 +1,31 @@
+from typing import List, Optional
+
+import numpy as np
+from age_estimator import AgeEstimator
+from pipeline_sdk.primitives import AgeEstimationResult, BoundingBox
+from pipeline_sdk.utils import take_image_crops
+
+
+class FacesAgeEstimator:
+
+    def __init__(self, model: AgeEstimator):
+        self.__model = model
+
+    def estimate(self,
+                 image: np.ndarray,
+                 faces_bboxes: List[BoundingBox]
+                 ) -> List[AgeEstimationResult]:
+        faces_crops = take_image_crops(image=image, bounding_boxes=faces_bboxes)
+        inference_results = self.__infer(faces_crops=faces_crops)
+        return [
+            AgeEstimationResult(face_bbox, inferred_age)
+            for face_bbox, inferred_age in zip(faces_bboxes, inference_results)
+        ]
+
+    def __infer(self,
+                faces_crops: List[Optional[np.ndarray]]
+                ) -> List[Optional[int]]:
+        return [
+            self.__model.estimate_age(image=crop) if crop is not None else None
+            for crop in faces_crops
+        ]
@@ -1,41 +1,32 @@
 import json
-from typing import Tuple, List, Optional
+from typing import Optional
 
-import numpy as np
 from flask import Response, request, make_response
 from flask_jwt_extended import jwt_required
 from flask_restful import Resource
-from age_estimator import AgeEstimator
-from pipeline_sdk.primitives import AgeEstimationResult
-from pipeline_sdk.utils import image_from_str, decode_bboxes, take_image_crops
+from pipeline_sdk.blobs import ImageBlobs, image_from_request
+from pipeline_sdk.utils import decode_bboxes
 
-BoundingBox = Tuple[Tuple[int, int], Tuple[int, int]]
+from .inference import FacesAgeEstimator
 
 
 class AgeEstimation(Resource):
 
-    def __init__(self, model: AgeEstimator):
-        self.__model = model
+    def __init__(self,
+                 estimator: FacesAgeEstimator,
+                 image_blobs: Optional[ImageBlobs]):
+        self.__estimator = estimator
+        self.__image_blobs = image_blobs
 
     @jwt_required
     def post(self) -> Response:
-        if 'image' not in request.files or 'faces' not in request.files:
+        image = image_from_request(image_blobs=self.__image_blobs)
+        if image is None or 'faces' not in request.files:
             return make_response({'msg': 'Required fields not provided.'}, 500)
-        image = image_from_str(raw_image=request.files['image'].read())
         faces_bboxes = json.load(request.files['faces'])
         faces_bboxes = decode_bboxes(raw_bboxes=faces_bboxes)
-        faces_crops = take_image_crops(image=image, bounding_boxes=faces_bboxes)
-        inference_results = self.__infer(faces_crops=faces_crops)
-        age_estimations = [
-            AgeEstimationResult(face_bbox, inferred_age)
-            for face_bbox, inferred_age in zip(faces_bboxes, inference_results)
-        ]
+        age_estimations = self.__estimator.estimate(
+            image=image,
+            faces_bboxes=faces_bboxes
+        )
         return make_response({'age_estimation': age_estimations}, 200)
-
-    def __infer(self,
-                faces_crops: List[Optional[np.ndarray]]
-                ) -> List[Optional[int]]:
-        return [
-            self.__model.estimate_age(image=crop) if crop is not None else None
-            for crop in faces_crops
-        ]
@@ -30,6 +30,11 @@ TO_FETCH_FROM_ENV = [
         'PEOPLE_DETECTION_SERVICE_HOST',
         'PEOPLE_DETECTION_SERVICE_PORT'
     ),
+    (
+        'PIPELINE_WORKER_SERVICE_NAME',
+        'PIPELINE_WORKER_SERVICE_HOST',
+        'PIPELINE_WORKER_SERVICE_PORT'
+    ),
     (
         'RESOURCES_MANAGER_SERVICE_NAME',
         'RESOURCES_MANAGER_SERVICE_HOST',
@@ -10,6 +10,7 @@ TO_FETCH_FROM_ENV = [
     ('FACE_DETECTION_SERVICE_NAME', 'FACE_DETECTION_SERVICE_SECRET'),
     ('GATEWAY_SERVICE_NAME', 'GATEWAY_SERVICE_SECRET'),
     ('PEOPLE_DETECTION_SERVICE_NAME', 'PEOPLE_DETECTION_SERVICE_SECRET'),
+    ('PIPELINE_WORKER_SERVICE_NAME', 'PIPELINE_WORKER_SERVICE_SECRET'),
     ('RESOURCES_MANAGER_SERVICE_NAME', 'RESOURCES_MANAGER_SERVICE_SECRET'),
     ('USER_IDENTITY_SERVICE_NAME', 'USER_IDENTITY_SERVICE_SECRET')
 ]
@@ -11,4 +11,5 @@ sudo -E docker build \
     --build-arg DISCOVERY_SERVICE_PORT=$DISCOVERY_SERVICE_PORT \
     --build-arg FACE_DETECTION_CHANNEL=$FACE_DETECTION_CHANNEL \
     --build-arg AGE_ESTIMATION_CHANNEL=$AGE_ESTIMATION_CHANNEL \
-    -t face_detection_service .
\ No newline at end of file
+    -f Dockerfile \
+    -t face_detection_service ..
\ No newline at end of file
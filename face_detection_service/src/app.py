@@ -1,15 +1,19 @@
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_restful import Api
+from pipeline_sdk.blobs import create_image_blobs
 from pipeline_sdk.proxies import ServerIdentityClient, ServiceJWT, \
     DiscoveryServiceClient
 from pipeline_sdk.utils import compose_relative_resource_url
+from pipeline_sdk.versioning import ModelVersion, weights_digest
 from retina_face_net import RetinaFaceNet
 
+from .inference import FacesDetector
 from .resources import FacesDetection
 from .config import SERVICE_NAME, SERVICE_SECRET, CONFIDENCE_THRESHOLD, \
     TOP_K_PREDICTIONS_TO_TAKE, NMS_THRESHOLD, WEIGHTS_PATH, API_VERSION, \
-    IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS
+    IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS, IMAGE_BLOBS_DIR, \
+    DECODED_IMAGES_CACHE_SIZE
 
 INTER_SERVICES_TOKEN = None
 app = Flask(__name__)
@@ -35,7 +39,20 @@ def create_api() -> Api:
         FacesDetection,
         compose_relative_resource_url(SERVICE_NAME, API_VERSION, 'detect_faces'),
         resource_class_kwargs={
-            'model': model
+            'detector': FacesDetector(model=model),
+            'image_blobs': create_image_blobs(
+                blobs_dir=IMAGE_BLOBS_DIR,
+                max_decoded_images=DECODED_IMAGES_CACHE_SIZE
+            )
+        }
+    )
+    api.add_resource(
+        ModelVersion,
+        compose_relative_resource_url(
+            SERVICE_NAME, API_VERSION, 'model_version'
+        ),
+        resource_class_kwargs={
+            'model_version': weights_digest(weights_path=WEIGHTS_PATH)
         }
     )
     return api
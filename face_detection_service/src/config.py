@@ -23,3 +23,5 @@ WEIGHTS_PATH = os.path.join(
 CONFIDENCE_THRESHOLD = 0.3
 TOP_K_PREDICTIONS_TO_TAKE = 20
 NMS_THRESHOLD = 0.4
+IMAGE_BLOBS_DIR = os.environ.get('IMAGE_BLOBS_DIR')
+DECODED_IMAGES_CACHE_SIZE = 16
@@ -0,0 +1,36 @@
+from typing import List
+
+import numpy as np
+from pipeline_sdk.utils import flatten, take_image_crops
+from retina_face_net import RetinaFaceNet
+
+from .utils import translate_results
+from .primitives import BoundingBox
+
+
+class FacesDetector:
+
+    def __init__(self, model: RetinaFaceNet):
+        self.__model = model
+
+    def detect(self,
+               image: np.ndarray,
+               people_detection: List[BoundingBox]
+               ) -> List[BoundingBox]:
+        image_crops = take_image_crops(
+            image=image,
+            bounding_boxes=people_detection
+        )
+        inferences_results = [
+            self.__model.infer(image=crop) if crop is not None else None
+            for crop in image_crops
+        ]
+        translated_results = [
+            translate_results(
+                inference_results=inference_results,
+                reference_bbox=reference_bbox
+            )
+            for inference_results, reference_bbox
+            in zip(inferences_results, people_detection)
+        ]
+        return flatten(input_list=translated_results)
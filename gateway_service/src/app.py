@@ -1,22 +1,35 @@
 import logging
 from time import sleep
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 
 import pika
 import requests
 from flask import Flask
 from flask_jwt_extended import JWTManager
 from flask_restful import Api
+from pipeline_sdk.blobs import ImageBlobs, ImageBlobsSweeper
+from pipeline_sdk.routing import create_service_router, \
+    compose_relative_resource_url
 from requests import Response
 
 from .resources.asynchronous import \
     AsynchronousProcessingStart, AsynchronousProcessingResultsFetch
+from .resources.monitoring import UpstreamPoolsStats, ResultsCacheStats, \
+    CoalescingStats
 from .resources.synchronous import ProcessingPipeline
 from .resources.users import Register, Login, TokenRefresh, LogoutAccessToken, \
     LogoutRefreshToken
 from .config import API_VERSION, SERVICE_NAME, \
     SERVER_IDENTITY_URL, DISCOVERY_URL, SERVICE_SECRET, JWT_SECRET, \
-    OBJECT_DETECTION_CHANNEL
+    OBJECT_DETECTION_CHANNEL, RESOURCES_MANAGER_NODES, UPSTREAM_POOL_MAXSIZE, \
+    UPSTREAM_POOL_BLOCK, IMAGE_BLOBS_DIR, IMAGE_BLOBS_TTL, \
+    IMAGE_BLOBS_SWEEP_INTERVAL, RESULTS_CACHE_MAX_BYTES, RESULTS_CACHE_TTL, \
+    MODELS_VERSIONS, MODELS_SERVICES_API_VERSION, \
+    MODELS_VERSIONS_REFRESH_INTERVAL
+from .coalescing import SingleFlight
+from .models_versions import ModelsVersionsMonitor
+from .results_cache import PipelineResultsCache
+from .sessions import UpstreamSessions
 
 app = Flask(__name__)
 app.config['PROPAGATE_EXCEPTIONS'] = True
@@ -36,8 +49,8 @@ def create_api() -> Api:
         services=[
             'user_identity_service', 'people_detection_service',
             'face_detection_service', 'age_estimation_service',
-            'message_broker', 'resource_manager_service'
-        ]
+            'message_broker'
+        ] + RESOURCES_MANAGER_NODES
     )
     connection = pika.BlockingConnection(
         pika.ConnectionParameters(
@@ -47,6 +60,12 @@ def create_api() -> Api:
     )
     channel = connection.channel()
     channel.queue_declare(queue=OBJECT_DETECTION_CHANNEL)
+    upstream_sessions = UpstreamSessions(
+        pool_maxsize=UPSTREAM_POOL_MAXSIZE,
+        pool_block=UPSTREAM_POOL_BLOCK
+    )
+    synchronous_single_flight = SingleFlight()
+    asynchronous_single_flight = SingleFlight()
     user_identity_url = \
         f"{services_info['user_identity_service']['service_address']}:" \
         f"{services_info['user_identity_service']['service_port']}"
@@ -55,7 +74,8 @@ def create_api() -> Api:
         construct_api_url('/register_user'),
         resource_class_kwargs={
             'base_forwarding_url': user_identity_url,
-            'inter_services_token': INTER_SERVICES_TOKEN
+            'inter_services_token': INTER_SERVICES_TOKEN,
+            'upstream_sessions': upstream_sessions
         }
     )
     api.add_resource(
@@ -63,7 +83,8 @@ def create_api() -> Api:
         construct_api_url('/user_login'),
         resource_class_kwargs={
             'base_forwarding_url': user_identity_url,
-            'inter_services_token': INTER_SERVICES_TOKEN
+            'inter_services_token': INTER_SERVICES_TOKEN,
+            'upstream_sessions': upstream_sessions
         }
     )
     api.add_resource(
@@ -87,9 +108,25 @@ def create_api() -> Api:
     age_estimation_url = \
         f"{services_info['age_estimation_service']['service_address']}:" \
         f"{services_info['age_estimation_service']['service_port']}"
-    base_resources_manager_path = \
-        f"{services_info['resource_manager_service']['service_address']}:" \
-        f"{services_info['resource_manager_service']['service_port']}"
+    models_versions_monitor = _create_models_versions_monitor(
+        models_urls={
+            'people_detection': (
+                people_detection_url, 'people_detection_service'
+            ),
+            'face_detection': (face_detection_url, 'face_detection_service'),
+            'age_estimation': (age_estimation_url, 'age_estimation_service')
+        },
+        upstream_sessions=upstream_sessions
+    )
+    results_cache = PipelineResultsCache(
+        max_bytes=RESULTS_CACHE_MAX_BYTES,
+        ttl=RESULTS_CACHE_TTL,
+        models_versions_monitor=models_versions_monitor
+    )
+    resources_manager_router = create_service_router(
+        nodes=RESOURCES_MANAGER_NODES,
+        services_info=services_info
+    )
     api.add_resource(
         ProcessingPipeline,
         construct_api_url('/sync/process_image'),
@@ -97,29 +134,90 @@ def create_api() -> Api:
             'base_people_detection_url': people_detection_url,
             'base_face_detection_url': face_detection_url,
             'base_age_estimation_url': age_estimation_url,
-            'inter_services_token': INTER_SERVICES_TOKEN
+            'inter_services_token': INTER_SERVICES_TOKEN,
+            'upstream_sessions': upstream_sessions,
+            'image_blobs': _create_image_blobs(),
+            'results_cache': results_cache,
+            'single_flight': synchronous_single_flight
         }
     )
     api.add_resource(
         AsynchronousProcessingStart,
         construct_api_url('/async/process_image'),
         resource_class_kwargs={
-            'base_resources_manager_path': base_resources_manager_path,
+            'resources_manager_router': resources_manager_router,
             'inter_services_token': INTER_SERVICES_TOKEN,
-            'message_channel': channel
+            'message_channel': channel,
+            'upstream_sessions': upstream_sessions,
+            'single_flight': asynchronous_single_flight
         }
     )
     api.add_resource(
         AsynchronousProcessingResultsFetch,
         construct_api_url('/async/fetch_results'),
         resource_class_kwargs={
-            'base_resources_manager_path': base_resources_manager_path,
+            'resources_manager_router': resources_manager_router,
             'inter_services_token': INTER_SERVICES_TOKEN,
+            'upstream_sessions': upstream_sessions
+        }
+    )
+    api.add_resource(
+        UpstreamPoolsStats,
+        construct_api_url('/upstream_pools'),
+        resource_class_kwargs={'upstream_sessions': upstream_sessions}
+    )
+    api.add_resource(
+        ResultsCacheStats,
+        construct_api_url('/results_cache'),
+        resource_class_kwargs={'results_cache': results_cache}
+    )
+    api.add_resource(
+        CoalescingStats,
+        construct_api_url('/coalescing'),
+        resource_class_kwargs={
+            'synchronous_single_flight': synchronous_single_flight,
+            'asynchronous_single_flight': asynchronous_single_flight
         }
     )
     return api
 
 
+def _create_image_blobs() -> Optional[ImageBlobs]:
+    if IMAGE_BLOBS_DIR is None:
+        return None
+    image_blobs = ImageBlobs(blobs_dir=IMAGE_BLOBS_DIR)
+    ImageBlobsSweeper(
+        image_blobs=image_blobs,
+        max_age=IMAGE_BLOBS_TTL,
+        sweep_interval=IMAGE_BLOBS_SWEEP_INTERVAL
+    ).start()
+    return image_blobs
+
+
+def _create_models_versions_monitor(models_urls: Dict[str, Tuple[str, str]],
+                                    upstream_sessions: UpstreamSessions
+                                    ) -> ModelsVersionsMonitor:
+    models_endpoints = {
+        model: (
+            base_url,
+            compose_relative_resource_url(
+                service_name, MODELS_SERVICES_API_VERSION, 'model_version'
+            )
+        )
+        for model, (base_url, service_name) in models_urls.items()
+    }
+    monitor = ModelsVersionsMonitor(
+        models_endpoints=models_endpoints,
+        fallback_versions=MODELS_VERSIONS,
+        inter_services_token=INTER_SERVICES_TOKEN,
+        upstream_sessions=upstream_sessions,
+        refresh_interval=MODELS_VERSIONS_REFRESH_INTERVAL
+    )
+    monitor.refresh()
+    monitor.start()
+    return monitor
+
+
 def construct_api_url(resource_postfix: str) -> str:
     return f'/{API_VERSION}/{SERVICE_NAME}{resource_postfix}'
 
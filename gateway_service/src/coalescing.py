@@ -0,0 +1,59 @@
+from threading import Event, Lock
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class InFlightCall:
+
+    def __init__(self):
+        self.done = Event()
+        self.result = None
+        self.error: Optional[Exception] = None
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__calls: Dict[Hashable, InFlightCall] = {}
+        self.__executed = 0
+        self.__coalesced = 0
+
+    def run(self, key: Hashable, compute: Callable[[], T]) -> T:
+        with self.__lock:
+            call = self.__calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = InFlightCall()
+                self.__calls[key] = call
+                self.__executed += 1
+            else:
+                self.__coalesced += 1
+        if not is_leader:
+            return self.__await(call=call)
+        try:
+            call.result = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.__lock:
+                self.__calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    @property
+    def stats(self) -> dict:
+        with self.__lock:
+            return {
+                'in_flight': len(self.__calls),
+                'executed': self.__executed,
+                'coalesced': self.__coalesced
+            }
+
+    def __await(self, call: InFlightCall) -> T:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
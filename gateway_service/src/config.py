@@ -20,3 +20,32 @@ DISCOVERY_URL = \
     f'{DISCOVERY_SERVICE_HOST}:{DISCOVERY_SERVICE_PORT}/' \
     f'{DISCOVERY_SERVICE_PATH}'
 OBJECT_DETECTION_CHANNEL = os.environ['OBJECT_DETECTION_CHANNEL']
+RESOURCES_MANAGER_SERVICE_NAME = os.environ.get(
+    'RESOURCES_MANAGER_SERVICE_NAME', 'resources_manager_service'
+)
+RESOURCES_MANAGER_NODES = os.environ.get(
+    'RESOURCES_MANAGER_NODES', RESOURCES_MANAGER_SERVICE_NAME
+).split(',')
+RESOURCES_MANAGER_API_VERSION = 'v1'
+UPSTREAM_POOL_MAXSIZE = int(os.environ.get('UPSTREAM_POOL_MAXSIZE', 32))
+UPSTREAM_POOL_BLOCK = False
+IMAGE_BLOBS_DIR = os.environ.get('IMAGE_BLOBS_DIR')
+IMAGE_BLOBS_TTL = 300
+IMAGE_BLOBS_SWEEP_INTERVAL = 60
+RESULTS_CACHE_MAX_BYTES = int(
+    os.environ.get('RESULTS_CACHE_MAX_BYTES', 64 * 1024 * 1024)
+)
+RESULTS_CACHE_TTL = 600
+MODELS_VERSIONS = {
+    'people_detection': os.environ.get(
+        'PEOPLE_DETECTION_MODEL_VERSION', 'resnet50_coco_best_v2.1.0'
+    ),
+    'face_detection': os.environ.get(
+        'FACE_DETECTION_MODEL_VERSION', 'FaceNet_resnet_50'
+    ),
+    'age_estimation': os.environ.get(
+        'AGE_ESTIMATION_MODEL_VERSION', 'age_estimator_0.1.0'
+    )
+}
+MODELS_SERVICES_API_VERSION = 'v1'
+MODELS_VERSIONS_REFRESH_INTERVAL = 30
@@ -0,0 +1,58 @@
+import logging
+import time
+from threading import Thread, Lock
+from typing import Dict, Tuple
+
+from .sessions import UpstreamSessions
+
+ModelEndpoint = Tuple[str, str]
+
+
+class ModelsVersionsMonitor(Thread):
+
+    def __init__(self,
+                 models_endpoints: Dict[str, ModelEndpoint],
+                 fallback_versions: Dict[str, str],
+                 inter_services_token: str,
+                 upstream_sessions: UpstreamSessions,
+                 refresh_interval: float):
+        super().__init__(daemon=True)
+        self.__models_endpoints = models_endpoints
+        self.__inter_services_token = inter_services_token
+        self.__upstream_sessions = upstream_sessions
+        self.__refresh_interval = refresh_interval
+        self.__lock = Lock()
+        self.__versions = dict(fallback_versions)
+
+    @property
+    def versions(self) -> Dict[str, str]:
+        with self.__lock:
+            return dict(self.__versions)
+
+    def run(self) -> None:
+        while True:
+            time.sleep(self.__refresh_interval)
+            self.refresh()
+
+    def refresh(self) -> None:
+        for model, (base_url, version_path) in self.__models_endpoints.items():
+            try:
+                version = self.__fetch_version(
+                    base_url=base_url,
+                    version_path=version_path
+                )
+            except Exception as e:
+                logging.error(f'Fetching {model} model version failed: {e}')
+                continue
+            with self.__lock:
+                self.__versions[model] = version
+
+    def __fetch_version(self, base_url: str, version_path: str) -> str:
+        session = self.__upstream_sessions.session_for(base_url=base_url)
+        response = session.get(
+            f'{base_url}{version_path}',
+            headers={'Authorization': f'Bearer {self.__inter_services_token}'},
+            verify=False
+        )
+        response.raise_for_status()
+        return response.json()['model_version']
@@ -1,26 +1,39 @@
 import io
 from typing import Tuple
 import json
+from uuid import uuid4
 
-import requests
 from flask import Response, request, make_response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from flask_restful import Resource, reqparse
 from pika.channel import Channel
+from pipeline_sdk.routing import ServiceRouter
 
-from ..config import OBJECT_DETECTION_CHANNEL
+from ..coalescing import SingleFlight
+from ..config import OBJECT_DETECTION_CHANNEL, RESOURCES_MANAGER_API_VERSION
+from ..results_cache import image_digest
+from ..sessions import UpstreamSessions
+
+RESULTS_TYPES = [
+    'people_detection', 'faces_detection', 'age_estimation', 'error'
+]
+FINAL_RESULTS_TYPES = ['age_estimation', 'error']
 
 
 class AsynchronousProcessingStart(Resource):
 
     def __init__(self,
-                 base_resources_manager_path: str,
+                 resources_manager_router: ServiceRouter,
                  inter_services_token: str,
-                 message_channel: Channel
+                 message_channel: Channel,
+                 upstream_sessions: UpstreamSessions,
+                 single_flight: SingleFlight
                  ):
-        self.__base_resources_manager_path = base_resources_manager_path
+        self.__resources_manager_router = resources_manager_router
         self.__inter_services_token = inter_services_token
         self.__message_channel = message_channel
+        self.__upstream_sessions = upstream_sessions
+        self.__single_flight = single_flight
 
     @jwt_required
     def post(self) -> Response:
@@ -31,29 +44,55 @@ class AsynchronousProcessingStart(Resource):
         in_memory_file = io.BytesIO()
         request.files['image'].save(in_memory_file)
         raw_image = in_memory_file.getvalue()
-        processing_response, return_code = \
-            self.__start_processing(raw_image=raw_image)
+        login = get_jwt_identity()
+        processing_response, return_code = self.__single_flight.run(
+            key=(login, image_digest(raw_image=raw_image)),
+            compute=lambda: self.__start_processing(
+                login=login, raw_image=raw_image
+            )
+        )
         return make_response(processing_response, return_code)
 
-    def __start_processing(self, raw_image: bytes) -> Tuple[dict, int]:
+    def __start_processing(self, login: str, raw_image: bytes
+                           ) -> Tuple[dict, int]:
         headers = {
             'Authorization': f'Bearer {self.__inter_services_token}'
         }
-        payload = {'login': get_jwt_identity()}
+        resource_identifier = str(uuid4())
+        payload = {
+            'login': login,
+            'resource_identifier': resource_identifier
+        }
         files = {'image': raw_image}
-        url = f'{self.__base_resources_manager_path}' \
-            f'/v1/resource_manager_service/register_input_image'
-        response = requests.post(
-            url, files=files, data=payload, headers=headers, verify=False
+        base_resources_manager_path = self.__resources_manager_router.url_for(
+            key=resource_identifier
+        )
+        url = self.__resources_manager_router.resource_url_for(
+            key=resource_identifier,
+            service_version=RESOURCES_MANAGER_API_VERSION,
+            path_postfix='register_input_image'
+        )
+        session = self.__upstream_sessions.session_for(
+            base_url=base_resources_manager_path
+        )
+        response = session.post(
+            url,
+            params={'login': login},
+            files=files,
+            data=payload,
+            headers=headers,
+            verify=False
         )
         if response.status_code != 200:
             return {'msg': 'Something went wrong, try again.'}, 500
         resource_identifiers = response.json()
-        self.__message_channel.basic_publish(
-            exchange='',
-            routing_key=OBJECT_DETECTION_CHANNEL,
-            body=json.dumps(resource_identifiers)
-        )
+        reused_results = resource_identifiers.pop('reused_results', [])
+        if 'age_estimation' not in reused_results:
+            self.__message_channel.basic_publish(
+                exchange='',
+                routing_key=OBJECT_DETECTION_CHANNEL,
+                body=json.dumps(resource_identifiers)
+            )
         processing_response = {
             'request_identifier': resource_identifiers['request_identifier']
         }
@@ -63,11 +102,13 @@ class AsynchronousProcessingStart(Resource):
 class AsynchronousProcessingResultsFetch(Resource):
 
     def __init__(self,
-                 base_resources_manager_path: str,
-                 inter_services_token: str
+                 resources_manager_router: ServiceRouter,
+                 inter_services_token: str,
+                 upstream_sessions: UpstreamSessions
                  ):
-        self.__base_resources_manager_path = base_resources_manager_path
+        self.__resources_manager_router = resources_manager_router
         self.__inter_services_token = inter_services_token
+        self.__upstream_sessions = upstream_sessions
         self.__parser = self.__initialize_request_parser()
 
     @jwt_required
@@ -75,6 +116,12 @@ class AsynchronousProcessingResultsFetch(Resource):
         data = self.__parser.parse_args()
         login = get_jwt_identity()
         request_identifier = data['request_identifier']
+        if data['timeout'] is not None:
+            return self.__wait_for_results(
+                requester_login=login,
+                request_identifier=request_identifier,
+                timeout=data['timeout']
+            )
         return self.__fetch_results(
             requester_login=login,
             request_identifier=request_identifier
@@ -90,18 +137,59 @@ class AsynchronousProcessingResultsFetch(Resource):
         payload = {
             'requester_login': requester_login,
             'resource_identifier': request_identifier,
-            'resources_types': [
-                'people_detection', 'faces_detection', 'age_estimation', 'error'
-            ]
+            'resources_types': RESULTS_TYPES
         }
-        url = f'{self.__base_resources_manager_path}' \
-            f'/v1/resource_manager_service/fetch_intermediate_results'
-        response = requests.get(
+        base_resources_manager_path = self.__resources_manager_router.url_for(
+            key=request_identifier
+        )
+        url = self.__resources_manager_router.resource_url_for(
+            key=request_identifier,
+            service_version=RESOURCES_MANAGER_API_VERSION,
+            path_postfix='fetch_intermediate_results'
+        )
+        session = self.__upstream_sessions.session_for(
+            base_url=base_resources_manager_path
+        )
+        response = session.get(
             url, data=payload, headers=headers, verify=False
         )
         response_content = response.json()
         return make_response(response_content, response.status_code)
 
+    def __wait_for_results(self,
+                           requester_login: str,
+                           request_identifier: str,
+                           timeout: float
+                           ) -> Response:
+        headers = {
+            'Authorization': f'Bearer {self.__inter_services_token}'
+        }
+        payload = {
+            'requester_login': requester_login,
+            'resource_identifier': request_identifier,
+            'resources_types': RESULTS_TYPES,
+            'awaited_types': FINAL_RESULTS_TYPES,
+            'timeout': timeout
+        }
+        base_resources_manager_path = self.__resources_manager_router.url_for(
+            key=request_identifier
+        )
+        url = self.__resources_manager_router.resource_url_for(
+            key=request_identifier,
+            service_version=RESOURCES_MANAGER_API_VERSION,
+            path_postfix='wait_for_results'
+        )
+        session = self.__upstream_sessions.session_for(
+            base_url=base_resources_manager_path
+        )
+        response = session.get(
+            url, data=payload, headers=headers, verify=False
+        )
+        response_content = response.json()
+        if response.status_code != 200:
+            return make_response(response_content, response.status_code)
+        return make_response(response_content['resources'], 200)
+
     def __initialize_request_parser(self) -> reqparse.RequestParser:
         parser = reqparse.RequestParser()
         parser.add_argument(
@@ -110,4 +198,10 @@ class AsynchronousProcessingResultsFetch(Resource):
                  'be specified in this request.',
             required=True
         )
+        parser.add_argument(
+            'timeout',
+            help='Field "timeout" must be a number.',
+            type=float,
+            required=False
+        )
         return parser
@@ -1,11 +1,15 @@
-import requests
 from flask import Response, request
 from flask_restful import Resource
 
+from ..sessions import UpstreamSessions
+
 
 class Proxy(Resource):
 
-    def __init__(self, base_forwarding_url: str, inter_services_token: str):
+    def __init__(self,
+                 base_forwarding_url: str,
+                 inter_services_token: str,
+                 upstream_sessions: UpstreamSessions):
         super().__init__()
         self.__excluded_headers = [
             'content-encoding', 'content-length',
@@ -13,6 +17,7 @@ class Proxy(Resource):
         ]
         self.__base_forwarding_url = base_forwarding_url
         self.__inter_services_token = inter_services_token
+        self.__upstream_sessions = upstream_sessions
 
     def _forward_message(self, target_path: str) -> Response:
         if not target_path.startswith('/'):
@@ -22,7 +27,10 @@ class Proxy(Resource):
             key: value for (key, value) in request.headers if key != 'Host'
         }
         headers['Authorization'] = f'Bearer {self.__inter_services_token}'
-        resp = requests.request(
+        session = self.__upstream_sessions.session_for(
+            base_url=self.__base_forwarding_url
+        )
+        resp = session.request(
             method=request.method,
             url=target_url,
             headers=headers,
@@ -0,0 +1,43 @@
+from flask import Response, make_response
+from flask_jwt_extended import jwt_required
+from flask_restful import Resource
+
+from ..coalescing import SingleFlight
+from ..results_cache import PipelineResultsCache
+from ..sessions import UpstreamSessions
+
+
+class UpstreamPoolsStats(Resource):
+
+    def __init__(self, upstream_sessions: UpstreamSessions):
+        self.__upstream_sessions = upstream_sessions
+
+    @jwt_required
+    def get(self) -> Response:
+        return make_response(self.__upstream_sessions.stats, 200)
+
+
+class ResultsCacheStats(Resource):
+
+    def __init__(self, results_cache: PipelineResultsCache):
+        self.__results_cache = results_cache
+
+    @jwt_required
+    def get(self) -> Response:
+        return make_response(self.__results_cache.stats, 200)
+
+
+class CoalescingStats(Resource):
+
+    def __init__(self,
+                 synchronous_single_flight: SingleFlight,
+                 asynchronous_single_flight: SingleFlight):
+        self.__synchronous_single_flight = synchronous_single_flight
+        self.__asynchronous_single_flight = asynchronous_single_flight
+
+    @jwt_required
+    def get(self) -> Response:
+        return make_response({
+            'synchronous': self.__synchronous_single_flight.stats,
+            'asynchronous': self.__asynchronous_single_flight.stats
+        }, 200)
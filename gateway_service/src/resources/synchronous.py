@@ -1,26 +1,46 @@
 import io
 import json
-from typing import List, Tuple
+from dataclasses import dataclass
+from typing import List, Tuple, Optional, Dict
 
 from flask import Response, request, make_response
 from flask_jwt_extended import jwt_required
 from flask_restful import Resource
-import requests
+from pipeline_sdk.blobs import ImageBlobs
+from requests import Response as UpstreamResponse
+
+from ..coalescing import SingleFlight
+from ..results_cache import PipelineResultsCache
+from ..sessions import UpstreamSessions
 
 BoundingBox = Tuple[Tuple[int, int], Tuple[int, int]]
 
 
+@dataclass(frozen=True)
+class ImageReference:
+    files: Dict[str, bytes]
+    data: Optional[Dict[str, str]] = None
+
+
 class ProcessingPipeline(Resource):
 
     def __init__(self,
                  base_people_detection_url: str,
                  base_face_detection_url: str,
                  base_age_estimation_url: str,
-                 inter_services_token: str):
+                 inter_services_token: str,
+                 upstream_sessions: UpstreamSessions,
+                 image_blobs: Optional[ImageBlobs],
+                 results_cache: PipelineResultsCache,
+                 single_flight: SingleFlight):
         self.__base_people_detection_url = base_people_detection_url
         self.__base_face_detection_url = base_face_detection_url
         self.__base_age_estimation_url = base_age_estimation_url
         self.__inter_services_token = inter_services_token
+        self.__upstream_sessions = upstream_sessions
+        self.__image_blobs = image_blobs
+        self.__results_cache = results_cache
+        self.__single_flight = single_flight
 
     @jwt_required
     def post(self) -> Response:
@@ -31,54 +51,97 @@ class ProcessingPipeline(Resource):
         in_memory_file = io.BytesIO()
         request.files['image'].save(in_memory_file)
         raw_image = in_memory_file.getvalue()
-        return self.__processing_started(raw_image=raw_image)
+        cache_key = self.__results_cache.key_for(raw_image=raw_image)
+        cached_results = self.__results_cache.get(key=cache_key)
+        if cached_results is not None:
+            return make_response(cached_results, 200)
+        results = self.__single_flight.run(
+            key=cache_key,
+            compute=lambda: self.__process(
+                raw_image=raw_image, cache_key=cache_key
+            )
+        )
+        return make_response(results, 200)
+
+    def __process(self, raw_image: bytes, cache_key: str) -> dict:
+        image_reference = self.__upload(raw_image=raw_image)
+        response = self.__processing_started(image_reference=image_reference)
+        results = response.json()
+        if response.status_code == 200:
+            self.__results_cache.put(key=cache_key, content=results)
+        return results
 
-    def __processing_started(self, raw_image: bytes) -> Response:
+    def __upload(self, raw_image: bytes) -> ImageReference:
+        if self.__image_blobs is None:
+            return ImageReference(files={'image': raw_image})
+        image_handle = self.__image_blobs.put(raw_image=raw_image)
+        return ImageReference(files={}, data={'image_handle': image_handle})
+
+    def __processing_started(self, image_reference: ImageReference
+                             ) -> UpstreamResponse:
         headers = {
             'Authorization': f'Bearer {self.__inter_services_token}'
         }
-        files = {'image': raw_image}
+        files = image_reference.files
         url = f'{self.__base_people_detection_url}/v1/people_detection_service/' \
             f'detect_people'
-        response = requests.post(
-            url, headers=headers, files=files, verify=False
+        session = self.__upstream_sessions.session_for(
+            base_url=self.__base_people_detection_url
+        )
+        response = session.post(
+            url,
+            headers=headers,
+            files=files,
+            data=image_reference.data,
+            verify=False
         )
         people_detected = response.json()['people']
         return self.__people_detected(
-            raw_image=raw_image, people_detected=people_detected
+            image_reference=image_reference, people_detected=people_detected
         )
 
     def __people_detected(self,
-                          raw_image: bytes,
+                          image_reference: ImageReference,
                           people_detected: List[BoundingBox]
-                          ) -> Response:
+                          ) -> UpstreamResponse:
         headers = {'Authorization': f'Bearer {self.__inter_services_token}'}
-        files = {'image': raw_image, 'people': json.dumps(people_detected)}
+        files = {
+            **image_reference.files, 'people': json.dumps(people_detected)
+        }
         url = f'{self.__base_face_detection_url}/v1/face_detection_service/' \
             f'detect_faces'
-        response = requests.post(
+        session = self.__upstream_sessions.session_for(
+            base_url=self.__base_face_detection_url
+        )
+        response = session.post(
             url,
             headers=headers,
             files=files,
+            data=image_reference.data,
             verify=False
         )
         faces_detected = response.json()['faces']
         return self.__faces_detected(
-            raw_image=raw_image, faces_detected=faces_detected
+            image_reference=image_reference, faces_detected=faces_detected
         )
 
     def __faces_detected(self,
-                         raw_image: bytes,
+                         image_reference: ImageReference,
                          faces_detected: List[BoundingBox]
-                         ) -> Response:
+                         ) -> UpstreamResponse:
         headers = {'Authorization': f'Bearer {self.__inter_services_token}'}
-        files = {'image': raw_image, 'faces': json.dumps(faces_detected)}
+        files = {
+            **image_reference.files, 'faces': json.dumps(faces_detected)
+        }
         url = f'{self.__base_age_estimation_url}/v1/age_estimation_service/' \
             f'estimate_age'
-        response = requests.post(
+        session = self.__upstream_sessions.session_for(
+            base_url=self.__base_age_estimation_url
+        )
+        return session.post(
             url,
             headers=headers,
             files=files,
+            data=image_reference.data,
             verify=False
         )
-        return make_response(response.json(), 200)
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional
+
+from .models_versions import ModelsVersionsMonitor
+
+
+def image_digest(raw_image: bytes) -> str:
+    return hashlib.sha256(raw_image).hexdigest()
+
+
+def _versions_tag(models_versions: Dict[str, str]) -> str:
+    return ','.join(
+        f'{model}={version}'
+        for model, version in sorted(models_versions.items())
+    )
+
+
+class PipelineResultsCache:
+
+    def __init__(self,
+                 max_bytes: int,
+                 ttl: float,
+                 models_versions_monitor: ModelsVersionsMonitor):
+        self.__max_bytes = max_bytes
+        self.__ttl = ttl
+        self.__models_versions_monitor = models_versions_monitor
+        self.__entries = OrderedDict()
+        self.__current_bytes = 0
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+        self.__expirations = 0
+        self.__evictions = 0
+
+    def key_for(self, raw_image: bytes) -> str:
+        versions_tag = _versions_tag(
+            models_versions=self.__models_versions_monitor.versions
+        )
+        return f'{image_digest(raw_image=raw_image)}|{versions_tag}'
+
+    def get(self, key: str) -> Optional[dict]:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                self.__misses += 1
+                return None
+            content, _, expires_at = entry
+            if expires_at < time.monotonic():
+                self.__remove(key=key)
+                self.__expirations += 1
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(key)
+            self.__hits += 1
+            return content
+
+    def put(self, key: str, content: dict) -> None:
+        size = len(key) + len(json.dumps(content))
+        if size > self.__max_bytes:
+            return None
+        expires_at = time.monotonic() + self.__ttl
+        with self.__lock:
+            self.__remove(key=key)
+            self.__entries[key] = (content, size, expires_at)
+            self.__current_bytes += size
+            while self.__current_bytes > self.__max_bytes:
+                oldest_key = next(iter(self.__entries))
+                self.__remove(key=oldest_key)
+                self.__evictions += 1
+
+    @property
+    def stats(self) -> dict:
+        with self.__lock:
+            lookups = self.__hits + self.__misses
+            return {
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'hit_ratio': self.__hits / lookups if lookups > 0 else 0.0,
+                'expirations': self.__expirations,
+                'evictions': self.__evictions,
+                'entries': len(self.__entries),
+                'current_bytes': self.__current_bytes,
+                'max_bytes': self.__max_bytes,
+                'models_versions': self.__models_versions_monitor.versions
+            }
+
+    def __remove(self, key: str) -> None:
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__current_bytes -= entry[1]
@@ -0,0 +1,66 @@
+from threading import Lock
+from typing import Dict, List
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool
+
+
+class UpstreamSessions:
+
+    def __init__(self, pool_maxsize: int, pool_block: bool):
+        self.__pool_maxsize = pool_maxsize
+        self.__pool_block = pool_block
+        self.__lock = Lock()
+        self.__sessions: Dict[str, Session] = {}
+
+    def session_for(self, base_url: str) -> Session:
+        with self.__lock:
+            session = self.__sessions.get(base_url)
+            if session is None:
+                session = self.__create_session()
+                self.__sessions[base_url] = session
+            return session
+
+    @property
+    def stats(self) -> Dict[str, List[dict]]:
+        with self.__lock:
+            sessions = dict(self.__sessions)
+        return {
+            base_url: self.__session_stats(session=session)
+            for base_url, session in sessions.items()
+        }
+
+    def __create_session(self) -> Session:
+        session = Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.__pool_maxsize,
+            pool_block=self.__pool_block
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def __session_stats(self, session: Session) -> List[dict]:
+        stats = []
+        for adapter in set(session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for pool_key in pools.keys():
+                pool = pools[pool_key]
+                stats.append({
+                    'host': pool.host,
+                    'port': pool.port,
+                    'connections_opened': pool.num_connections,
+                    'requests_sent': pool.num_requests,
+                    'idle_connections': self.__count_idle(pool=pool),
+                    'max_connections': self.__pool_maxsize
+                })
+        return stats
+
+    def __count_idle(self, pool: HTTPConnectionPool) -> int:
+        if pool.pool is None:
+            return 0
+        return sum(
+            1 for connection in list(pool.pool.queue) if connection is not None
+        )
@@ -0,0 +1,53 @@
+import time
+from threading import Event, Thread
+
+import pytest
+
+from src.coalescing import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    single_flight = SingleFlight()
+    release = Event()
+    computations = []
+
+    def compute() -> int:
+        computations.append(1)
+        release.wait()
+        return 42
+
+    results = []
+    threads = [
+        Thread(target=lambda: results.append(
+            single_flight.run(key='image', compute=compute)
+        ))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    while single_flight.stats['coalesced'] < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == [42] * 4
+    assert len(computations) == 1
+    assert single_flight.stats == {
+        'in_flight': 0,
+        'executed': 1,
+        'coalesced': 3
+    }
+
+
+def test_failed_computation_is_not_cached():
+    single_flight = SingleFlight()
+
+    def fail() -> int:
+        raise RuntimeError('Upstream failed.')
+
+    with pytest.raises(RuntimeError):
+        single_flight.run(key='image', compute=fail)
+
+    assert single_flight.run(key='image', compute=lambda: 7) == 7
+    assert single_flight.stats['executed'] == 2
@@ -0,0 +1,113 @@
+import time
+from typing import Tuple
+
+from src.models_versions import ModelsVersionsMonitor
+from src.results_cache import PipelineResultsCache
+
+
+class VersionResponse:
+
+    def __init__(self, version: str):
+        self.__version = version
+
+    def raise_for_status(self) -> None:
+        if self.__version is None:
+            raise RuntimeError('Model service unavailable.')
+
+    def json(self) -> dict:
+        return {'model_version': self.__version}
+
+
+class ModelServices:
+
+    def __init__(self, versions: dict):
+        self.versions = versions
+
+    def session_for(self, base_url: str) -> 'ModelServices':
+        return self
+
+    def get(self, url: str, headers: dict, verify: bool) -> VersionResponse:
+        return VersionResponse(version=self.versions.get(url))
+
+
+def _create_cache(model_services: ModelServices,
+                  max_bytes: int = 1024,
+                  ttl: float = 60.0
+                  ) -> Tuple[PipelineResultsCache, ModelsVersionsMonitor]:
+    monitor = ModelsVersionsMonitor(
+        models_endpoints={
+            'people_detection': ('https://people', '/version'),
+            'age_estimation': ('https://age', '/version')
+        },
+        fallback_versions={
+            'people_detection': 'static',
+            'age_estimation': 'static'
+        },
+        inter_services_token='token',
+        upstream_sessions=model_services,
+        refresh_interval=60.0
+    )
+    monitor.refresh()
+    return PipelineResultsCache(
+        max_bytes=max_bytes,
+        ttl=ttl,
+        models_versions_monitor=monitor
+    ), monitor
+
+
+def test_key_changes_when_model_service_reports_new_version():
+    model_services = ModelServices(versions={
+        'https://people/version': 'aaaa',
+        'https://age/version': 'bbbb'
+    })
+    results_cache, monitor = _create_cache(model_services=model_services)
+    key = results_cache.key_for(raw_image=b'image')
+    results_cache.put(key=key, content={'people': []})
+
+    model_services.versions['https://people/version'] = 'cccc'
+    monitor.refresh()
+
+    assert results_cache.get(key=key) == {'people': []}
+    assert results_cache.key_for(raw_image=b'image') != key
+    assert results_cache.stats['models_versions'] == {
+        'people_detection': 'cccc',
+        'age_estimation': 'bbbb'
+    }
+
+
+def test_unreachable_service_keeps_last_known_version():
+    model_services = ModelServices(versions={
+        'https://people/version': 'aaaa'
+    })
+    results_cache, monitor = _create_cache(model_services=model_services)
+    key = results_cache.key_for(raw_image=b'image')
+
+    model_services.versions = {}
+    monitor.refresh()
+
+    assert results_cache.key_for(raw_image=b'image') == key
+    assert monitor.versions == {
+        'people_detection': 'aaaa',
+        'age_estimation': 'static'
+    }
+
+
+def test_entries_expire_and_are_evicted_by_size():
+    results_cache, _ = _create_cache(
+        model_services=ModelServices(versions={}),
+        max_bytes=300,
+        ttl=0.05
+    )
+    keys = [
+        results_cache.key_for(raw_image=raw_image)
+        for raw_image in (b'a', b'b', b'c')
+    ]
+    for key in keys:
+        results_cache.put(key=key, content={'people': []})
+
+    assert results_cache.get(key=keys[0]) is None
+    assert results_cache.get(key=keys[2]) == {'people': []}
+    time.sleep(0.1)
+    assert results_cache.get(key=keys[2]) is None
+    assert results_cache.stats['evictions'] == 1
+    assert results_cache.stats['expirations'] == 1
@@ -4,14 +4,18 @@ from flask_restful import Api
 from keras_retinanet.models import load_model
 import tensorflow as tf
 from tensorflow.python.keras.backend import set_session
+from pipeline_sdk.blobs import create_image_blobs
 from pipeline_sdk.proxies import ServerIdentityClient, ServiceJWT, \
     DiscoveryServiceClient
 from pipeline_sdk.utils import compose_relative_resource_url
+from pipeline_sdk.versioning import ModelVersion, weights_digest
 
+from .inference import PeopleDetector
 from .resources import PeopleDetection
 from .config import SERVICE_NAME, API_VERSION, SERVICE_SECRET, \
     WEIGHTS_PATH, CONFIDENCE_THRESHOLD, CLASSES_TO_FETCH, \
-    MAX_IMAGE_DIM, IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS
+    MAX_IMAGE_DIM, IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS, \
+    IMAGE_BLOBS_DIR, DECODED_IMAGES_CACHE_SIZE
 
 INTER_SERVICES_TOKEN = None
 app = Flask(__name__)
@@ -38,12 +42,27 @@ def create_api() -> Api:
         PeopleDetection,
         compose_relative_resource_url(SERVICE_NAME, API_VERSION, 'detect_people'),
         resource_class_kwargs={
-            'model': model,
-            'session': TF_SESSION,
-            'graph': GRAPH,
-            'confidence_threshold': CONFIDENCE_THRESHOLD,
-            'classes_to_fetch': CLASSES_TO_FETCH,
-            'max_image_dim': MAX_IMAGE_DIM
+            'detector': PeopleDetector(
+                model=model,
+                session=TF_SESSION,
+                graph=GRAPH,
+                confidence_threshold=CONFIDENCE_THRESHOLD,
+                classes_to_fetch=CLASSES_TO_FETCH,
+                max_image_dim=MAX_IMAGE_DIM
+            ),
+            'image_blobs': create_image_blobs(
+                blobs_dir=IMAGE_BLOBS_DIR,
+                max_decoded_images=DECODED_IMAGES_CACHE_SIZE
+            )
+        }
+    )
+    api.add_resource(
+        ModelVersion,
+        compose_relative_resource_url(
+            SERVICE_NAME, API_VERSION, 'model_version'
+        ),
+        resource_class_kwargs={
+            'model_version': weights_digest(weights_path=WEIGHTS_PATH)
         }
     )
     return api
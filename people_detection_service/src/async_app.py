@@ -9,23 +9,25 @@ import pika
 import numpy as np
 import requests
 from flask import Response
+from pipeline_sdk.routing import create_service_router
 
 from .utils import generate_random_bboxes
 from .config import SERVICE_NAME, SERVICE_SECRET, SERVER_IDENTITY_URL, \
     DISCOVERY_URL
-from .async_config import OBJECT_DETECTION_CHANNEL, FACE_DETECTION_CHANNEL
+from .async_config import OBJECT_DETECTION_CHANNEL, FACE_DETECTION_CHANNEL, \
+    RESOURCES_MANAGER_NODES, RESOURCES_MANAGER_API_VERSION
 
 
 INTER_SERVICES_TOKEN = None
 CHANNEL = None
-BASE_RESOURCES_URL = None
+RESOURCES_MANAGER_ROUTER = None
 
 
 def create_app() -> None:
     global INTER_SERVICES_TOKEN
     _, INTER_SERVICES_TOKEN = _fetch_config_from_identity_service()
     services_info = _fetch_services_info(
-        services=['message_broker', 'resource_manager_service']
+        services=['message_broker'] + RESOURCES_MANAGER_NODES
     )
     connection = pika.BlockingConnection(
         pika.ConnectionParameters(
@@ -33,10 +35,11 @@ def create_app() -> None:
             port=services_info['message_broker']['service_port']
         )
     )
-    global BASE_RESOURCES_URL
-    BASE_RESOURCES_URL = \
-        f"{services_info['resource_manager_service']['service_address']}:" \
-        f"{services_info['resource_manager_service']['service_port']}"
+    global RESOURCES_MANAGER_ROUTER
+    RESOURCES_MANAGER_ROUTER = create_service_router(
+        nodes=RESOURCES_MANAGER_NODES,
+        services_info=services_info
+    )
     global CHANNEL
     CHANNEL = connection.channel()
     CHANNEL.queue_declare(queue=OBJECT_DETECTION_CHANNEL)
@@ -48,6 +51,14 @@ def create_app() -> None:
     CHANNEL.start_consuming()
 
 
+def _resources_manager_url(request_identifier: str, path_postfix: str) -> str:
+    return RESOURCES_MANAGER_ROUTER.resource_url_for(
+        key=request_identifier,
+        service_version=RESOURCES_MANAGER_API_VERSION,
+        path_postfix=path_postfix
+    )
+
+
 def _fetch_config_from_identity_service() -> Tuple[str, str]:
     payload = {'service_name': SERVICE_NAME, 'password': SERVICE_SECRET}
     response = requests.post(
@@ -154,8 +165,10 @@ def _fetch_processing_input(requester_login: str,
         'requester_login': requester_login,
         'resource_identifier': request_identifier
     }
-    url = f'{BASE_RESOURCES_URL}' \
-        f'/v1/resource_manager_service/fetch_input_image'
+    url = _resources_manager_url(
+        request_identifier=request_identifier,
+        path_postfix='fetch_input_image'
+    )
     response = requests.get(
         url, data=payload, headers=headers, verify=False
     )
@@ -193,8 +206,10 @@ def _send_back_processing_results(requester_login: str,
         'resource_identifier': request_identifier,
         'result_type': resource_type
     }
-    url = f'{BASE_RESOURCES_URL}' \
-        f'/v1/resource_manager_service/register_intermediate_result'
+    url = _resources_manager_url(
+        request_identifier=request_identifier,
+        path_postfix='register_intermediate_result'
+    )
     resource_content = json.dumps(resource_content)
     files = {"resource_content": resource_content}
     response = requests.post(
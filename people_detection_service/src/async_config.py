@@ -3,3 +3,10 @@ import os
 
 OBJECT_DETECTION_CHANNEL = os.environ['OBJECT_DETECTION_CHANNEL']
 FACE_DETECTION_CHANNEL = os.environ['FACE_DETECTION_CHANNEL']
+RESOURCES_MANAGER_SERVICE_NAME = os.environ.get(
+    'RESOURCES_MANAGER_SERVICE_NAME', 'resources_manager_service'
+)
+RESOURCES_MANAGER_NODES = os.environ.get(
+    'RESOURCES_MANAGER_NODES', RESOURCES_MANAGER_SERVICE_NAME
+).split(',')
+RESOURCES_MANAGER_API_VERSION = 'v1'
@@ -23,3 +23,5 @@ WEIGHTS_PATH = os.path.join(
 CONFIDENCE_THRESHOLD = 0.4
 CLASSES_TO_FETCH = {0}
 MAX_IMAGE_DIM = 800
+IMAGE_BLOBS_DIR = os.environ.get('IMAGE_BLOBS_DIR')
+DECODED_IMAGES_CACHE_SIZE = 16
@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import os
+import re
+import time
+import uuid
+from collections import OrderedDict
+from threading import Lock, Thread
+from typing import Optional
+
+import numpy as np
+from flask import request
+
+from .utils import image_from_str
+
+HANDLE_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+SHARD_WIDTH = 2
+
+
+class ImageBlobs:
+
+    def __init__(self, blobs_dir: str, max_decoded_images: int = 0):
+        os.makedirs(blobs_dir, exist_ok=True)
+        self.__blobs_dir = blobs_dir
+        self.__max_decoded_images = max_decoded_images
+        self.__lock = Lock()
+        self.__decoded_images: OrderedDict = OrderedDict()
+
+    def put(self, raw_image: bytes) -> str:
+        handle = hashlib.sha256(raw_image).hexdigest()
+        blob_path = self.__blob_path(handle=handle)
+        if os.path.isfile(blob_path):
+            os.utime(blob_path)
+            return handle
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        temporary_path = f'{blob_path}.{uuid.uuid4().hex}.tmp'
+        with open(temporary_path, 'wb') as f:
+            f.write(raw_image)
+        os.replace(temporary_path, blob_path)
+        return handle
+
+    def load_raw(self, handle: str) -> Optional[bytes]:
+        if HANDLE_PATTERN.match(handle) is None:
+            return None
+        try:
+            with open(self.__blob_path(handle=handle), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def load_image(self, handle: str) -> Optional[np.ndarray]:
+        with self.__lock:
+            image = self.__decoded_images.get(handle)
+            if image is not None:
+                self.__decoded_images.move_to_end(handle)
+                return image.copy()
+        raw_image = self.load_raw(handle=handle)
+        if raw_image is None:
+            return None
+        image = image_from_str(raw_image=raw_image)
+        if image is None or self.__max_decoded_images <= 0:
+            return image
+        with self.__lock:
+            self.__decoded_images[handle] = image
+            self.__decoded_images.move_to_end(handle)
+            while len(self.__decoded_images) > self.__max_decoded_images:
+                self.__decoded_images.popitem(last=False)
+        return image.copy()
+
+    def sweep(self, max_age: float) -> int:
+        removed = 0
+        expiration_time = time.time() - max_age
+        for shard in os.listdir(self.__blobs_dir):
+            shard_dir = os.path.join(self.__blobs_dir, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for blob_name in os.listdir(shard_dir):
+                blob_path = os.path.join(shard_dir, blob_name)
+                try:
+                    if os.path.getmtime(blob_path) < expiration_time:
+                        os.remove(blob_path)
+                        removed += 1
+                except OSError:
+                    continue
+        return removed
+
+    def __blob_path(self, handle: str) -> str:
+        return os.path.join(self.__blobs_dir, handle[:SHARD_WIDTH], handle)
+
+
+def create_image_blobs(blobs_dir: Optional[str],
+                       max_decoded_images: int = 0
+                       ) -> Optional[ImageBlobs]:
+    if blobs_dir is None:
+        return None
+    return ImageBlobs(
+        blobs_dir=blobs_dir,
+        max_decoded_images=max_decoded_images
+    )
+
+
+def image_from_request(image_blobs: Optional[ImageBlobs]
+                       ) -> Optional[np.ndarray]:
+    if 'image' in request.files:
+        return image_from_str(raw_image=request.files['image'].read())
+    image_handle = request.form.get('image_handle')
+    if image_handle is None or image_blobs is None:
+        return None
+    return image_blobs.load_image(handle=image_handle)
+
+
+class ImageBlobsSweeper(Thread):
+
+    def __init__(self,
+                 image_blobs: ImageBlobs,
+                 max_age: float,
+                 sweep_interval: float):
+        super().__init__(daemon=True)
+        self.__image_blobs = image_blobs
+        self.__max_age = max_age
+        self.__sweep_interval = sweep_interval
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.__image_blobs.sweep(max_age=self.__max_age)
+            except Exception as e:
+                logging.error(f'Image blobs sweep failed: {e}')
+            time.sleep(self.__sweep_interval)
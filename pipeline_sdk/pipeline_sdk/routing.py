@@ -0,0 +1,82 @@
+import bisect
+import hashlib
+from typing import List, Dict, Tuple
+
+DEFAULT_VIRTUAL_NODES = 128
+
+
+class HashRing:
+
+    def __init__(self,
+                 nodes: List[str],
+                 virtual_nodes: int = DEFAULT_VIRTUAL_NODES):
+        self.__virtual_nodes = virtual_nodes
+        self.__ring: List[Tuple[int, str]] = []
+        for node in nodes:
+            self.add_node(node=node)
+
+    @property
+    def nodes(self) -> List[str]:
+        return sorted({node for _, node in self.__ring})
+
+    def add_node(self, node: str) -> None:
+        for replica in range(self.__virtual_nodes):
+            bisect.insort(self.__ring, (_hash(f'{node}#{replica}'), node))
+
+    def remove_node(self, node: str) -> None:
+        self.__ring = [entry for entry in self.__ring if entry[1] != node]
+
+    def node_for(self, key: str) -> str:
+        if len(self.__ring) == 0:
+            raise ValueError('Hash ring does not contain any node.')
+        position = bisect.bisect(self.__ring, (_hash(key), ''))
+        if position == len(self.__ring):
+            position = 0
+        return self.__ring[position][1]
+
+
+class ServiceRouter:
+
+    def __init__(self, ring: HashRing, nodes_urls: Dict[str, str]):
+        self.__ring = ring
+        self.__nodes_urls = nodes_urls
+
+    def url_for(self, key: str) -> str:
+        return self.__nodes_urls[self.__ring.node_for(key=key)]
+
+    def resource_url_for(self,
+                         key: str,
+                         service_version: str,
+                         path_postfix: str
+                         ) -> str:
+        node = self.__ring.node_for(key=key)
+        relative_resource_url = compose_relative_resource_url(
+            service_name=node,
+            service_version=service_version,
+            path_postfix=path_postfix
+        )
+        return f'{self.__nodes_urls[node]}{relative_resource_url}'
+
+
+def create_service_router(nodes: List[str],
+                          services_info: Dict[str, dict]
+                          ) -> ServiceRouter:
+    nodes_urls = {
+        node: f"{services_info[node]['service_address']}:"
+              f"{services_info[node]['service_port']}"
+        for node in nodes
+    }
+    return ServiceRouter(ring=HashRing(nodes=nodes), nodes_urls=nodes_urls)
+
+
+def compose_relative_resource_url(service_name: str,
+                                  service_version: str,
+                                  path_postfix: str
+                                  ) -> str:
+    if path_postfix.startswith('/'):
+        path_postfix = path_postfix.lstrip('/')
+    return f"/{service_version}/{service_name}/{path_postfix}"
+
+
+def _hash(key: str) -> int:
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:16], 16)
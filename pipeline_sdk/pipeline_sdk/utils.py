@@ -6,6 +6,7 @@ import cv2 as cv
 
 from .primitives import BoundingBox, Point
 from .proxies.primitives import ServiceSpecs
+from .routing import compose_relative_resource_url
 
 
 T = TypeVar('T')
@@ -21,15 +22,6 @@ def compose_url(service_specs: ServiceSpecs,
     return f"{service_specs.host}:{service_specs.port}{relative_resource_url}"
 
 
-def compose_relative_resource_url(service_name: str,
-                                  service_version: str,
-                                  path_postfix: str
-                                  ) -> str:
-    if path_postfix.startswith('/'):
-        path_postfix = path_postfix.lstrip('/')
-    return f"/{service_version}/{service_name}/{path_postfix}"
-
-
 def image_to_jpeg_bytes(image: np.ndarray,
                         compression_rate: int = 90
                         ) -> bytes:
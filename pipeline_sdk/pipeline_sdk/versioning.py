@@ -0,0 +1,26 @@
+import hashlib
+
+from flask import Response, make_response
+from flask_jwt_extended import jwt_required
+from flask_restful import Resource
+
+WEIGHTS_DIGEST_LENGTH = 16
+WEIGHTS_READ_CHUNK_SIZE = 1024 * 1024
+
+
+def weights_digest(weights_path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(weights_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(WEIGHTS_READ_CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()[:WEIGHTS_DIGEST_LENGTH]
+
+
+class ModelVersion(Resource):
+
+    def __init__(self, model_version: str):
+        self.__model_version = model_version
+
+    @jwt_required
+    def get(self) -> Response:
+        return make_response({'model_version': self.__model_version}, 200)
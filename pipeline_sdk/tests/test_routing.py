@@ -0,0 +1,48 @@
+from pipeline_sdk.routing import HashRing, create_service_router, \
+    compose_relative_resource_url
+
+NODES = ['resources_manager_0', 'resources_manager_1', 'resources_manager_2']
+KEYS = [f'request-{i}' for i in range(1000)]
+
+
+def test_removing_node_only_moves_its_keys():
+    ring = HashRing(nodes=NODES)
+    placement = {key: ring.node_for(key=key) for key in KEYS}
+
+    ring.remove_node(node='resources_manager_1')
+
+    for key, node in placement.items():
+        if node != 'resources_manager_1':
+            assert ring.node_for(key=key) == node
+    assert ring.nodes == ['resources_manager_0', 'resources_manager_2']
+
+
+def test_keys_spread_over_all_nodes():
+    ring = HashRing(nodes=NODES)
+
+    counts = {node: 0 for node in NODES}
+    for key in KEYS:
+        counts[ring.node_for(key=key)] += 1
+
+    assert min(counts.values()) > len(KEYS) / len(NODES) / 2
+
+
+def test_resource_url_is_built_from_owning_node():
+    services_info = {
+        node: {'service_address': f'https://{node}', 'service_port': 5000}
+        for node in NODES
+    }
+    router = create_service_router(nodes=NODES, services_info=services_info)
+
+    node = HashRing(nodes=NODES).node_for(key='request-1')
+
+    assert router.resource_url_for(
+        key='request-1',
+        service_version='v1',
+        path_postfix='/fetch_input_image'
+    ) == f'https://{node}:5000/v1/{node}/fetch_input_image'
+    assert compose_relative_resource_url(
+        service_name=node,
+        service_version='v1',
+        path_postfix='fetch_input_image'
+    ) == f'/v1/{node}/fetch_input_image'
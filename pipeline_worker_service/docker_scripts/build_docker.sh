@@ -0,0 +1,13 @@
+#!bash
+export $(egrep -v '^#' ../.env | xargs)
+sudo -E docker build \
+    --build-arg PIPELINE_WORKER_SERVICE_NAME=$PIPELINE_WORKER_SERVICE_NAME \
+    --build-arg PIPELINE_WORKER_SERVICE_SECRET=$PIPELINE_WORKER_SERVICE_SECRET \
+    --build-arg SERVER_IDENTITY_SERVICE_NAME=$SERVER_IDENTITY_SERVICE_NAME \
+    --build-arg SERVER_IDENTITY_SERVICE_HOST=$SERVER_IDENTITY_SERVICE_HOST \
+    --build-arg SERVER_IDENTITY_SERVICE_PORT=$SERVER_IDENTITY_SERVICE_PORT \
+    --build-arg DISCOVERY_SERVICE_NAME=$DISCOVERY_SERVICE_NAME \
+    --build-arg DISCOVERY_SERVICE_HOST=$DISCOVERY_SERVICE_HOST \
+    --build-arg DISCOVERY_SERVICE_PORT=$DISCOVERY_SERVICE_PORT \
+    -f Dockerfile \
+    -t pipeline_worker_service ..
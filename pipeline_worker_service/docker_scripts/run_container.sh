@@ -0,0 +1,2 @@
+#!bash
+sudo -E docker run --network host pipeline_worker_service
\ No newline at end of file
@@ -0,0 +1,3 @@
+#!bash
+sudo docker rm -f pipeline_worker_service_container
+sudo -E docker run --network host --name pipeline_worker_service_container -d pipeline_worker_service
\ No newline at end of file
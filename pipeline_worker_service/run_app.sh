@@ -0,0 +1,3 @@
+#!/bin/bash
+
+python -m pipeline_worker_service.src.app
@@ -0,0 +1,117 @@
+from flask import Flask
+from flask_jwt_extended import JWTManager
+from flask_restful import Api
+from age_estimator import AgeEstimator
+from keras_retinanet.models import load_model
+from retina_face_net import RetinaFaceNet
+import tensorflow as tf
+from tensorflow.python.keras.backend import set_session
+from pipeline_sdk.proxies import ServerIdentityClient, ServiceJWT, \
+    DiscoveryServiceClient
+from pipeline_sdk.utils import compose_relative_resource_url
+
+from age_estimation_service.src.inference import FacesAgeEstimator
+from face_detection_service.src.inference import FacesDetector
+from people_detection_service.src.inference import PeopleDetector
+from .resources import FusedProcessingPipeline
+from .config import SERVICE_NAME, API_VERSION, SERVICE_SECRET, \
+    IDENTITY_SERVICE_SPECS, DISCOVERY_SERVICE_SPECS, \
+    PEOPLE_DETECTION_WEIGHTS_PATH, PEOPLE_CONFIDENCE_THRESHOLD, \
+    PEOPLE_CLASSES_TO_FETCH, PEOPLE_MAX_IMAGE_DIM, \
+    FACE_DETECTION_WEIGHTS_PATH, FACES_CONFIDENCE_THRESHOLD, \
+    FACES_TOP_K_PREDICTIONS_TO_TAKE, FACES_NMS_THRESHOLD, \
+    AGE_ESTIMATION_WEIGHTS_PATH
+
+INTER_SERVICES_TOKEN = None
+app = Flask(__name__)
+GRAPH = None
+TF_SESSION = None
+app.config['PROPAGATE_EXCEPTIONS'] = True
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+jwt = JWTManager(app)
+
+
+def create_api() -> Api:
+    global INTER_SERVICES_TOKEN
+    service_jwt = _fetch_config_from_identity_service()
+    INTER_SERVICES_TOKEN = service_jwt.token
+    app.config['JWT_SECRET_KEY'] = service_jwt.token_secret
+    api = Api(app)
+    api.add_resource(
+        FusedProcessingPipeline,
+        compose_relative_resource_url(
+            SERVICE_NAME, API_VERSION, 'sync/process_image'
+        ),
+        resource_class_kwargs={
+            'people_detector': _create_people_detector(),
+            'faces_detector': _create_faces_detector(),
+            'age_estimator': _create_age_estimator()
+        }
+    )
+    return api
+
+
+def _create_people_detector() -> PeopleDetector:
+    global TF_SESSION
+    global GRAPH
+    GRAPH = tf.get_default_graph()
+    TF_SESSION = tf.Session(graph=GRAPH)
+    set_session(TF_SESSION)
+    model = load_model(PEOPLE_DETECTION_WEIGHTS_PATH)
+    return PeopleDetector(
+        model=model,
+        session=TF_SESSION,
+        graph=GRAPH,
+        confidence_threshold=PEOPLE_CONFIDENCE_THRESHOLD,
+        classes_to_fetch=PEOPLE_CLASSES_TO_FETCH,
+        max_image_dim=PEOPLE_MAX_IMAGE_DIM
+    )
+
+
+def _create_faces_detector() -> FacesDetector:
+    model = RetinaFaceNet.initialize(
+        weights_path=FACE_DETECTION_WEIGHTS_PATH,
+        confidence_threshold=FACES_CONFIDENCE_THRESHOLD,
+        top_k=FACES_TOP_K_PREDICTIONS_TO_TAKE,
+        nms_threshold=FACES_NMS_THRESHOLD
+    )
+    return FacesDetector(model=model)
+
+
+def _create_age_estimator() -> FacesAgeEstimator:
+    model = AgeEstimator.initialize(weights_path=AGE_ESTIMATION_WEIGHTS_PATH)
+    return FacesAgeEstimator(model=model)
+
+
+def _fetch_config_from_identity_service() -> ServiceJWT:
+    client = ServerIdentityClient(
+        server_identity_specs=IDENTITY_SERVICE_SPECS
+    )
+    return client.obtain_service_jwt_safely(
+        service_name=SERVICE_NAME,
+        service_secret=SERVICE_SECRET
+    )
+
+
+def _fetch_port() -> int:
+    client = DiscoveryServiceClient(
+        discovery_service_specs=DISCOVERY_SERVICE_SPECS,
+        service_token=INTER_SERVICES_TOKEN
+    )
+    discovery_info = client.obtain_discovery_info_safely(
+        service_names=[SERVICE_NAME]
+    )
+    service_info = discovery_info.get(SERVICE_NAME)
+    if service_info is None:
+        raise RuntimeError(
+            f"Could not fetch data about {SERVICE_NAME} from discovery service"
+        )
+    return service_info.port
+
+
+api = create_api()
+
+
+if __name__ == '__main__':
+    port = _fetch_port()
+    app.run(host='0.0.0.0', port=port, ssl_context='adhoc')
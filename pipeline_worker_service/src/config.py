@@ -0,0 +1,29 @@
+import os
+
+from pipeline_sdk.proxies import ServiceSpecs
+
+API_VERSION = 'v1'
+SERVICE_NAME = os.environ['PIPELINE_WORKER_SERVICE_NAME']
+SERVICE_SECRET = os.environ['PIPELINE_WORKER_SERVICE_SECRET']
+IDENTITY_SERVICE_SPECS = ServiceSpecs(
+    host=os.environ['SERVER_IDENTITY_SERVICE_HOST'],
+    port=os.environ['SERVER_IDENTITY_SERVICE_PORT'],
+    service_name=os.environ['SERVER_IDENTITY_SERVICE_NAME'],
+    version='v1'
+)
+DISCOVERY_SERVICE_SPECS = ServiceSpecs(
+    host=os.environ['DISCOVERY_SERVICE_HOST'],
+    port=os.environ['DISCOVERY_SERVICE_PORT'],
+    service_name=os.environ['DISCOVERY_SERVICE_NAME'],
+    version='v1'
+)
+WEIGHTS_DIR = os.path.join(os.path.dirname(__file__), '..', 'weights')
+PEOPLE_DETECTION_WEIGHTS_PATH = os.path.join(WEIGHTS_DIR, 'people.h5')
+PEOPLE_CONFIDENCE_THRESHOLD = 0.4
+PEOPLE_CLASSES_TO_FETCH = {0}
+PEOPLE_MAX_IMAGE_DIM = 800
+FACE_DETECTION_WEIGHTS_PATH = os.path.join(WEIGHTS_DIR, 'faces.pth')
+FACES_CONFIDENCE_THRESHOLD = 0.3
+FACES_TOP_K_PREDICTIONS_TO_TAKE = 20
+FACES_NMS_THRESHOLD = 0.4
+AGE_ESTIMATION_WEIGHTS_PATH = os.path.join(WEIGHTS_DIR, 'age.pth')
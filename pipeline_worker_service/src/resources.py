@@ -0,0 +1,47 @@
+import io
+
+from flask import Response, request, make_response
+from flask_jwt_extended import jwt_required
+from flask_restful import Resource
+from pipeline_sdk.utils import decode_bboxes, image_from_str
+
+from age_estimation_service.src.inference import FacesAgeEstimator
+from face_detection_service.src.inference import FacesDetector
+from people_detection_service.src.inference import PeopleDetector
+
+
+class FusedProcessingPipeline(Resource):
+
+    def __init__(self,
+                 people_detector: PeopleDetector,
+                 faces_detector: FacesDetector,
+                 age_estimator: FacesAgeEstimator):
+        self.__people_detector = people_detector
+        self.__faces_detector = faces_detector
+        self.__age_estimator = age_estimator
+
+    @jwt_required
+    def post(self) -> Response:
+        if 'image' not in request.files:
+            return make_response(
+                {'msg': 'Field called "image" must be specified'}, 500
+            )
+        in_memory_file = io.BytesIO()
+        request.files['image'].save(in_memory_file)
+        image = image_from_str(raw_image=in_memory_file.getvalue())
+        if image is None:
+            return make_response(
+                {'msg': 'Field called "image" must contain valid image'}, 400
+            )
+        people_detected = self.__people_detector.detect(image=image)
+        faces_detected = self.__faces_detector.detect(
+            image=image,
+            people_detection=decode_bboxes(
+                raw_bboxes=[bbox.to_dict() for bbox in people_detected]
+            )
+        )
+        age_estimations = self.__age_estimator.estimate(
+            image=image,
+            faces_bboxes=faces_detected
+        )
+        return make_response({'age_estimation': age_estimations}, 200)
@@ -9,4 +9,5 @@ sudo -E docker build \
     --build-arg DISCOVERY_SERVICE_PORT=$DISCOVERY_SERVICE_PORT \
     --build-arg RESOURCES_MANAGER_SERVICE_SECRET=$RESOURCES_MANAGER_SERVICE_SECRET \
     --build-arg RESOURCES_MANAGER_SERVICE_NAME=$RESOURCES_MANAGER_SERVICE_NAME \
-    -t resources_manager_service .
\ No newline at end of file
+    -f Dockerfile \
+    -t resources_manager_service ..
\ No newline at end of file
@@ -0,0 +1,7 @@
+#!/bin/bash
+
+if [[ ${RUN_ASYNC_SERVER} = true ]] ; then
+   python -m src.asgi_app
+else
+   python -m src.app
+fi
\ No newline at end of file
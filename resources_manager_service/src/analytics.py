@@ -0,0 +1,163 @@
+import os
+import sqlite3
+from collections import Counter
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Dict, List, Optional
+
+from .cache import ResultKey
+
+PEOPLE_DETECTION = 'people_detection'
+FACES_DETECTION = 'faces_detection'
+AGE_ESTIMATION = 'age_estimation'
+AGGREGATED_RESULTS = {PEOPLE_DETECTION, FACES_DETECTION, AGE_ESTIMATION}
+
+Contributions = Dict[str, int]
+
+
+@dataclass
+class AggregatedBucket:
+    bucket_start: float
+    metrics: Dict[str, int] = field(default_factory=dict)
+
+
+class AnalyticsAggregates:
+
+    def __init__(self,
+                 db_path: str,
+                 granularities: Dict[str, int],
+                 age_buckets: List[int]):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.__granularities = granularities
+        self.__age_buckets = sorted(age_buckets)
+        self.__lock = Lock()
+        self.__connection = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self.__initialize_schema()
+
+    @property
+    def granularities(self) -> List[str]:
+        return list(self.__granularities)
+
+    def record(self,
+               key: ResultKey,
+               created_at: float,
+               content: dict
+               ) -> None:
+        _, requester_login, result_type = key
+        if result_type not in AGGREGATED_RESULTS:
+            return None
+        contributions = self.__compute_contributions(
+            result_type=result_type,
+            content=content
+        )
+        rows = [
+            (
+                granularity,
+                created_at - created_at % bucket_size,
+                requester_login,
+                metric,
+                value
+            )
+            for granularity, bucket_size in self.__granularities.items()
+            for metric, value in contributions.items()
+        ]
+        with self.__lock:
+            self.__connection.execute("BEGIN")
+            try:
+                self.__connection.executemany(
+                    "INSERT INTO aggregates (granularity, bucket_start, "
+                    "requester_login, metric, value) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (granularity, bucket_start, requester_login, "
+                    "metric) DO UPDATE SET value = value + excluded.value",
+                    rows
+                )
+            except Exception:
+                self.__connection.execute("ROLLBACK")
+                raise
+            self.__connection.execute("COMMIT")
+
+    def query(self,
+              granularity: str,
+              range_start: float,
+              range_end: float,
+              requester_login: Optional[str] = None,
+              metrics: Optional[List[str]] = None
+              ) -> List[AggregatedBucket]:
+        query = "SELECT bucket_start, metric, SUM(value) FROM aggregates " \
+                "WHERE granularity = ? AND bucket_start >= ? " \
+                "AND bucket_start < ?"
+        parameters = [granularity, range_start, range_end]
+        if requester_login is not None:
+            query += " AND requester_login = ?"
+            parameters.append(requester_login)
+        if metrics:
+            placeholders = ", ".join("?" for _ in metrics)
+            query += f" AND metric IN ({placeholders})"
+            parameters.extend(metrics)
+        query += " GROUP BY bucket_start, metric ORDER BY bucket_start"
+        with self.__lock:
+            rows = self.__connection.execute(query, parameters).fetchall()
+        buckets: Dict[float, AggregatedBucket] = {}
+        for bucket_start, metric, value in rows:
+            bucket = buckets.setdefault(
+                bucket_start, AggregatedBucket(bucket_start=bucket_start)
+            )
+            bucket.metrics[metric] = value
+        return list(buckets.values())
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.__connection.execute("DELETE FROM aggregates")
+
+    def __compute_contributions(self, result_type: str, content: dict
+                                ) -> Contributions:
+        if result_type == PEOPLE_DETECTION:
+            return {
+                'processed_images': 1,
+                'people': len(_list_of(content=content, key='people'))
+            }
+        if result_type == FACES_DETECTION:
+            return {'faces': len(_list_of(content=content, key='faces'))}
+        estimations = _list_of(content=content, key='age_estimation')
+        histogram = Counter(
+            self.__age_bucket_name(age=estimation['age'])
+            for estimation in estimations
+            if isinstance(estimation, dict) and
+            isinstance(estimation.get('age'), (int, float))
+        )
+        return {'age_estimations': len(estimations), **histogram}
+
+    def __age_bucket_name(self, age: float) -> str:
+        lower_bound = self.__age_buckets[0]
+        for upper_bound in self.__age_buckets[1:]:
+            if age < upper_bound:
+                return f'age_{lower_bound}_{upper_bound - 1}'
+            lower_bound = upper_bound
+        return f'age_{lower_bound}_plus'
+
+    def __initialize_schema(self) -> None:
+        with self.__lock:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS aggregates ("
+                "granularity TEXT NOT NULL, "
+                "bucket_start REAL NOT NULL, "
+                "requester_login TEXT NOT NULL, "
+                "metric TEXT NOT NULL, "
+                "value INTEGER NOT NULL, "
+                "PRIMARY KEY "
+                "(granularity, bucket_start, requester_login, metric)"
+                ") WITHOUT ROWID"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS aggregates_by_login ON aggregates "
+                "(granularity, requester_login, bucket_start)"
+            )
+
+
+def _list_of(content: dict, key: str) -> list:
+    value = content.get(key) if isinstance(content, dict) else None
+    return value if isinstance(value, list) else []
@@ -1,6 +1,8 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from time import sleep
-from typing import Tuple, List
+from typing import Tuple, List, Optional
 
 import requests
 from flask import Flask, Response
@@ -9,9 +11,41 @@ from flask_restful import Api
 
 from .resources import InputRegistrationResource, \
     IntermediateResultRegistrationResource, IntermediateResultFetchingResource, \
-    InputFetchingResource, BatchFetchingResource
+    InputFetchingResource, BatchFetchingResource, BulkFetchingResource, \
+    RetentionStatsResource, ResultsWaitingResource, StorageUsageResource, \
+    ExportResource, AnalyticsResource
+from .analytics import AnalyticsAggregates
+from .cache import ResultsCache
+from .content_store import ContentAddressedStore
+from .derivatives import DerivativesCache
+from .export import RequestsExporter
+from .index import ResourcesIndex
+from .layout import PersistenceLayout
+from .notifications import ResultsNotifier
+from .packs import PackStore, ColdTierCompactor
+from .quotas import StorageQuota
+from .registration import InputRegistrar
+from .results import IntermediateResultsLoader
+from .results_codec import ResultsCodec
+from .results_store import create_results_store, result_resource_name
+from .retention import ResourcesEvictor, RetentionSweeper
+from .staging import InputStagingArea
 from .config import API_VERSION, SERVICE_NAME, SERVER_IDENTITY_URL, \
-    SERVICE_SECRET, DISCOVERY_URL
+    SERVICE_SECRET, DISCOVERY_URL, INDEX_DB_PATH, PERSISTENCE_DIR, \
+    PERSISTENCE_SHARD_LEVELS, PERSISTENCE_SHARD_WIDTH, CONTENT_STORE_DIR, \
+    INPUT_IMAGE_NAMES, INPUT_IMAGES_TTL, RESULTS_TTL, DISK_BUDGET_BYTES, \
+    RETENTION_SWEEP_INTERVAL, RETENTION_BATCH_SIZE, \
+    RETENTION_MAX_DELETIONS_PER_SECOND, RESULTS_CACHE_MAX_BYTES, \
+    RESULTS_CACHE_NEGATIVE_TTL, BULK_FETCH_WORKERS, RESULTS_STORAGE_ENGINE, \
+    RESULTS_DB_PATH, RESULTS_DB_COMMIT_BATCH_SIZE, RESULTS_ENCODING, \
+    RESULTS_COMPRESSION, INPUT_WRITE_BEHIND, \
+    INPUT_STAGING_MAX_BYTES, INPUT_FLUSH_DURABILITY, \
+    INPUT_STAGING_RETRY_BACKOFF, INPUT_STAGING_MAX_RETRY_BACKOFF, \
+    DERIVATIVES_CACHE_MAX_BYTES, LOGIN_STORAGE_QUOTA_BYTES, \
+    LOGIN_REQUESTS_QUOTA, PACKS_DIR, PACK_MAX_BYTES, COLD_TIER_AGE, \
+    COLD_TIER_COMPACTION_INTERVAL, COLD_TIER_BATCH_SIZE, \
+    PACK_MIN_LIVE_RATIO, REUSE_COMPLETION_MARKER, BATCH_STREAM_PAGE_SIZE, \
+    ANALYTICS_DB_PATH, ANALYTICS_GRANULARITIES, ANALYTICS_AGE_BUCKETS
 
 app = Flask(__name__)
 app.config['PROPAGATE_EXCEPTIONS'] = True
@@ -19,36 +53,250 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 jwt = JWTManager(app)
 INTER_SERVICES_TOKEN = None
+SERVICE_COMPONENTS = None
+
+
+@dataclass(frozen=True)
+class ServiceComponents:
+    layout: PersistenceLayout
+    results_loader: IntermediateResultsLoader
+    results_notifier: ResultsNotifier
+    input_staging: Optional[InputStagingArea]
+    input_registrar: InputRegistrar
 
 
 def create_api() -> Api:
-    global INTER_SERVICES_TOKEN
+    global INTER_SERVICES_TOKEN, SERVICE_COMPONENTS
     jwt_secret, INTER_SERVICES_TOKEN = _fetch_config_from_identity_service()
     app.config['JWT_SECRET_KEY'] = jwt_secret
     api = Api(app)
+    layout = PersistenceLayout(
+        persistence_dir=PERSISTENCE_DIR,
+        shard_levels=PERSISTENCE_SHARD_LEVELS,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    resources_index = _initialize_resources_index(layout=layout)
+    content_store = ContentAddressedStore(
+        objects_dir=CONTENT_STORE_DIR,
+        resources_index=resources_index,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    pack_store = PackStore(
+        packs_dir=PACKS_DIR,
+        resources_index=resources_index,
+        max_pack_bytes=PACK_MAX_BYTES
+    )
+    results_codec = ResultsCodec(
+        encoding=RESULTS_ENCODING,
+        compression=RESULTS_COMPRESSION
+    )
+    results_store = create_results_store(
+        engine=RESULTS_STORAGE_ENGINE,
+        layout=layout,
+        db_path=RESULTS_DB_PATH,
+        commit_batch_size=RESULTS_DB_COMMIT_BATCH_SIZE,
+        codec=results_codec,
+        pack_store=pack_store
+    )
+    results_cache = ResultsCache(
+        max_bytes=RESULTS_CACHE_MAX_BYTES,
+        negative_ttl=RESULTS_CACHE_NEGATIVE_TTL
+    )
+    input_staging = _initialize_input_staging(
+        content_store=content_store,
+        resources_index=resources_index
+    )
+    derivatives_cache = DerivativesCache(
+        max_bytes=DERIVATIVES_CACHE_MAX_BYTES
+    )
+    derivatives_cache.restore(layout=layout)
+    resources_evictor = ResourcesEvictor(
+        layout=layout,
+        resources_index=resources_index,
+        content_store=content_store,
+        results_store=results_store,
+        results_cache=results_cache,
+        input_images_names=set(INPUT_IMAGE_NAMES.values()),
+        input_staging=input_staging,
+        pack_store=pack_store,
+        derivatives_cache=derivatives_cache
+    )
+    retention_sweeper = RetentionSweeper(
+        resources_index=resources_index,
+        resources_evictor=resources_evictor,
+        input_staging=input_staging,
+        input_images_ttl=INPUT_IMAGES_TTL,
+        results_ttl=RESULTS_TTL,
+        disk_budget=DISK_BUDGET_BYTES,
+        sweep_interval=RETENTION_SWEEP_INTERVAL,
+        batch_size=RETENTION_BATCH_SIZE,
+        max_deletions_per_second=RETENTION_MAX_DELETIONS_PER_SECOND
+    )
+    retention_sweeper.start()
+    cold_tier_compactor = ColdTierCompactor(
+        layout=layout,
+        resources_index=resources_index,
+        content_store=content_store,
+        pack_store=pack_store,
+        input_images_names=set(INPUT_IMAGE_NAMES.values()),
+        completion_marker=result_resource_name(
+            result_type=REUSE_COMPLETION_MARKER
+        ),
+        cold_age=COLD_TIER_AGE,
+        compaction_interval=COLD_TIER_COMPACTION_INTERVAL,
+        batch_size=COLD_TIER_BATCH_SIZE,
+        min_live_ratio=PACK_MIN_LIVE_RATIO
+    )
+    cold_tier_compactor.start()
+    results_loader = IntermediateResultsLoader(
+        layout=layout,
+        results_store=results_store,
+        results_cache=results_cache,
+        pack_store=pack_store
+    )
+    results_notifier = ResultsNotifier()
+    analytics_aggregates = AnalyticsAggregates(
+        db_path=ANALYTICS_DB_PATH,
+        granularities=ANALYTICS_GRANULARITIES,
+        age_buckets=ANALYTICS_AGE_BUCKETS
+    )
+    storage_quota = StorageQuota(
+        resources_index=resources_index,
+        max_bytes=LOGIN_STORAGE_QUOTA_BYTES,
+        max_requests=LOGIN_REQUESTS_QUOTA
+    )
+    input_registrar = InputRegistrar(
+        layout=layout,
+        resources_index=resources_index,
+        content_store=content_store,
+        results_store=results_store,
+        input_staging=input_staging,
+        storage_quota=storage_quota
+    )
+    SERVICE_COMPONENTS = ServiceComponents(
+        layout=layout,
+        results_loader=results_loader,
+        results_notifier=results_notifier,
+        input_staging=input_staging,
+        input_registrar=input_registrar
+    )
     api.add_resource(
         InputRegistrationResource,
-        construct_api_url('/register_input_image')
+        construct_api_url('/register_input_image'),
+        resource_class_kwargs={'input_registrar': input_registrar}
     )
     api.add_resource(
         IntermediateResultRegistrationResource,
-        construct_api_url('/register_intermediate_result')
+        construct_api_url('/register_intermediate_result'),
+        resource_class_kwargs={
+            'resources_index': resources_index,
+            'results_store': results_store,
+            'results_cache': results_cache,
+            'results_notifier': results_notifier,
+            'analytics_aggregates': analytics_aggregates
+        }
     )
     api.add_resource(
         IntermediateResultFetchingResource,
-        construct_api_url('/fetch_intermediate_results')
+        construct_api_url('/fetch_intermediate_results'),
+        resource_class_kwargs={
+            'results_loader': results_loader,
+            'results_codec': results_codec
+        }
+    )
+    api.add_resource(
+        ResultsWaitingResource,
+        construct_api_url('/wait_for_results'),
+        resource_class_kwargs={
+            'results_loader': results_loader,
+            'results_notifier': results_notifier
+        }
     )
     api.add_resource(
         InputFetchingResource,
-        construct_api_url('/fetch_input_image')
+        construct_api_url('/fetch_input_image'),
+        resource_class_kwargs={
+            'layout': layout,
+            'input_staging': input_staging,
+            'derivatives_cache': derivatives_cache,
+            'pack_store': pack_store
+        }
     )
     api.add_resource(
         BatchFetchingResource,
-        construct_api_url('/fetch_resources_batch')
+        construct_api_url('/fetch_resources_batch'),
+        resource_class_kwargs={'resources_index': resources_index}
+    )
+    api.add_resource(
+        BulkFetchingResource,
+        construct_api_url('/fetch_resources_bulk'),
+        resource_class_kwargs={
+            'results_loader': results_loader,
+            'executor': ThreadPoolExecutor(max_workers=BULK_FETCH_WORKERS)
+        }
+    )
+    api.add_resource(
+        RetentionStatsResource,
+        construct_api_url('/retention_stats'),
+        resource_class_kwargs={'retention_sweeper': retention_sweeper}
+    )
+    api.add_resource(
+        ExportResource,
+        construct_api_url('/export_resources'),
+        resource_class_kwargs={
+            'requests_exporter': RequestsExporter(
+                layout=layout,
+                resources_index=resources_index,
+                results_store=results_store,
+                pack_store=pack_store,
+                input_images_names=set(INPUT_IMAGE_NAMES.values()),
+                page_size=BATCH_STREAM_PAGE_SIZE
+            )
+        }
+    )
+    api.add_resource(
+        AnalyticsResource,
+        construct_api_url('/analytics'),
+        resource_class_kwargs={'analytics_aggregates': analytics_aggregates}
+    )
+    api.add_resource(
+        StorageUsageResource,
+        construct_api_url('/storage_usage'),
+        resource_class_kwargs={
+            'resources_index': resources_index,
+            'storage_quota': storage_quota
+        }
     )
     return api
 
 
+def _initialize_resources_index(layout: PersistenceLayout) -> ResourcesIndex:
+    resources_index = ResourcesIndex(db_path=INDEX_DB_PATH)
+    if resources_index.is_empty():
+        requests_indexed = resources_index.rebuild(
+            requests_directories=layout.iterate_requests_directories()
+        )
+        logging.info(f'Resources index built for {requests_indexed} requests.')
+    return resources_index
+
+
+def _initialize_input_staging(content_store: ContentAddressedStore,
+                              resources_index: ResourcesIndex
+                              ) -> Optional[InputStagingArea]:
+    if not INPUT_WRITE_BEHIND:
+        return None
+    input_staging = InputStagingArea(
+        content_store=content_store,
+        resources_index=resources_index,
+        max_bytes=INPUT_STAGING_MAX_BYTES,
+        durability=INPUT_FLUSH_DURABILITY,
+        retry_backoff=INPUT_STAGING_RETRY_BACKOFF,
+        max_retry_backoff=INPUT_STAGING_MAX_RETRY_BACKOFF
+    )
+    input_staging.start()
+    return input_staging
+
+
 def construct_api_url(resource_postfix: str) -> str:
     return f'/{API_VERSION}/{SERVICE_NAME}{resource_postfix}'
 
@@ -0,0 +1,678 @@
+import asyncio
+import email.utils
+import hashlib
+import json
+import mimetypes
+import os
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Event
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import parse_qs
+from uuid import uuid4, UUID
+
+import uvicorn
+from asgiref.wsgi import WsgiToAsgi
+from flask import Response
+from flask_jwt_extended import verify_jwt_in_request
+from flask_restful import inputs
+from werkzeug.serving import make_ssl_devcert
+
+from . import app as service
+from .config import WAIT_MAX_TIMEOUT, WAIT_DEFAULT_TIMEOUT, \
+    WAIT_POLL_INTERVAL, ASYNC_IO_WORKERS, ASYNC_FILE_CHUNK_SIZE, \
+    MAX_IMAGE_HEADER_SIZE
+from .multipart import MultipartParser, MultipartEvent, parse_boundary, \
+    PART_STARTED, PART_DATA, PART_FINISHED
+from .registration import InputRegistrar, PersistedInput
+from .resources import locate_input_image
+
+Scope = dict
+Message = dict
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+Parameters = Dict[str, List[str]]
+Handler = Callable[[Scope, Parameters, Send], Awaitable[bool]]
+
+TRANSFORM_PARAMETERS = {'max_dimension', 'crop', 'image_format', 'quality'}
+SEND_FILE_MAX_AGE = 43200
+MAX_FORM_FIELD_SIZE = 64 * 1024
+
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=ASYNC_IO_WORKERS)
+
+
+class LoopBoundEvent(Event):
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__()
+        self.__loop = loop
+        self.__async_event = asyncio.Event()
+
+    def set(self) -> None:
+        super().set()
+        self.__loop.call_soon_threadsafe(self.__async_event.set)
+
+    async def wait_async(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self.__async_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.__async_event.clear()
+        self.clear()
+
+
+class UploadBody:
+
+    def __init__(self, receive: Receive, parser: MultipartParser):
+        self.__receive = receive
+        self.__parser = parser
+        self.__recorded: Optional[List[Message]] = []
+
+    def stop_recording(self) -> None:
+        self.__recorded = None
+
+    def replay(self) -> Receive:
+        pending = list(self.__recorded or [])
+
+        async def receive() -> Message:
+            if len(pending) > 0:
+                return pending.pop(0)
+            return await self.__receive()
+        return receive
+
+    async def events(self) -> AsyncIterator[MultipartEvent]:
+        while True:
+            message = await self.__receive()
+            if self.__recorded is not None:
+                self.__recorded.append(message)
+            for event in self.__parser.feed(message.get('body', b'')):
+                yield event
+            if not message.get('more_body', False):
+                break
+        if not self.__parser.finished:
+            raise ValueError('Multipart body ended unexpectedly.')
+
+
+class ResourcesManagerAsgiApp:
+
+    def __init__(self):
+        self.__wsgi_app = WsgiToAsgi(service.app)
+        self.__handlers: Dict[str, Handler] = {
+            service.construct_api_url('/wait_for_results'):
+                _wait_for_results,
+            service.construct_api_url('/fetch_input_image'):
+                _fetch_input_image
+        }
+        self.__upload_path = service.construct_api_url(
+            '/register_input_image'
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send
+                       ) -> None:
+        if scope['type'] == 'http' and scope['method'] == 'POST' and \
+                scope.get('path') == self.__upload_path:
+            await self.__register_input_image(
+                scope=scope,
+                receive=receive,
+                send=send
+            )
+            return None
+        handler = self.__handlers.get(scope.get('path'))
+        if scope['type'] != 'http' or scope['method'] != 'GET' or \
+                handler is None:
+            await self.__wsgi_app(scope, receive, send)
+            return None
+        body = await _read_body(receive=receive)
+        if not await _authorize(scope=scope, send=send):
+            return None
+        try:
+            parameters = _parse_parameters(scope=scope, body=body)
+        except ValueError:
+            await _send_json(
+                send=send,
+                content={'message': 'Failed to decode request body.'},
+                status=400
+            )
+            return None
+        if not await handler(scope, parameters, send):
+            await self.__wsgi_app(scope, _replay_body(body=body), send)
+
+    async def __register_input_image(self,
+                                     scope: Scope,
+                                     receive: Receive,
+                                     send: Send
+                                     ) -> None:
+        try:
+            boundary = parse_boundary(
+                content_type=_headers(scope=scope).get('content-type', '')
+            )
+        except ValueError:
+            await self.__wsgi_app(scope, receive, send)
+            return None
+        if not await _authorize(scope=scope, send=send):
+            return None
+        upload_body = UploadBody(
+            receive=receive,
+            parser=MultipartParser(boundary=boundary)
+        )
+        if not await _register_input_image(
+                scope=scope, upload_body=upload_body, send=send):
+            await self.__wsgi_app(scope, upload_body.replay(), send)
+
+
+async def _wait_for_results(scope: Scope, parameters: Parameters, send: Send
+                            ) -> bool:
+    missing_fields = [
+        field
+        for field in ('requester_login', 'resource_identifier',
+                      'resources_types')
+        if len(parameters.get(field, [])) == 0
+    ]
+    if len(missing_fields) > 0:
+        await _send_json(
+            send=send,
+            content={'message': {
+                field: f'Field "{field}" must be specified in this request.'
+                for field in missing_fields
+            }},
+            status=400
+        )
+        return True
+    try:
+        timeout = float(
+            _first(parameters, 'timeout') or WAIT_DEFAULT_TIMEOUT
+        )
+    except ValueError:
+        await _send_json(
+            send=send,
+            content={
+                'message': {'timeout': 'Field "timeout" must be a number.'}
+            },
+            status=400
+        )
+        return True
+    resources_types = parameters['resources_types']
+    awaited_types = parameters.get('awaited_types') or resources_types
+    key = (
+        _first(parameters, 'resource_identifier'),
+        _first(parameters, 'requester_login')
+    )
+    deadline = time.monotonic() + min(max(timeout, 0.0), WAIT_MAX_TIMEOUT)
+    loop = asyncio.get_event_loop()
+    components = service.SERVICE_COMPONENTS
+    event = LoopBoundEvent(loop=loop)
+    components.results_notifier.subscribe(key=key, event=event)
+    try:
+        while True:
+            resources = await loop.run_in_executor(
+                IO_EXECUTOR,
+                partial(
+                    components.results_loader.load,
+                    resource_identifier=key[0],
+                    requester_login=key[1],
+                    resources_types=list(set(resources_types + awaited_types))
+                )
+            )
+            if resources is None:
+                await _send_json(
+                    send=send,
+                    content={'msg': 'Incorrect resource identifiers.'},
+                    status=500
+                )
+                return True
+            completed = any(resources[t] is not None for t in awaited_types)
+            remaining = deadline - time.monotonic()
+            if completed or remaining <= 0:
+                await _send_json(
+                    send=send,
+                    content={'completed': completed, 'resources': resources},
+                    status=200
+                )
+                return True
+            await event.wait_async(
+                timeout=min(remaining, WAIT_POLL_INTERVAL)
+            )
+    finally:
+        components.results_notifier.unsubscribe(key=key, event=event)
+
+
+async def _register_input_image(scope: Scope,
+                                upload_body: UploadBody,
+                                send: Send
+                                ) -> bool:
+    events = upload_body.events()
+    try:
+        parameters = await _collect_form_fields(
+            scope=scope,
+            events=events
+        )
+        requester_login = _first(parameters, 'login')
+        resource_identifier = str(
+            UUID(_first(parameters, 'resource_identifier') or f'{uuid4()}')
+        )
+        transcode = inputs.boolean(_first(parameters, 'transcode') or False)
+        created_at = _first(parameters, 'created_at')
+        if created_at is not None:
+            created_at = float(created_at)
+    except ValueError:
+        return False
+    if parameters is None or requester_login is None:
+        return False
+    upload_body.stop_recording()
+    loop = asyncio.get_event_loop()
+    input_registrar = service.SERVICE_COMPONENTS.input_registrar
+    admitted = await loop.run_in_executor(
+        IO_EXECUTOR,
+        partial(
+            input_registrar.admits,
+            requester_login=requester_login,
+            incoming_bytes=_content_length(scope=scope)
+        )
+    )
+    if not admitted:
+        await _send_json(
+            send=send,
+            content={'msg': 'Storage quota exceeded for this login.'},
+            status=413
+        )
+        return True
+    registered = await loop.run_in_executor(
+        IO_EXECUTOR,
+        partial(
+            input_registrar.is_registered,
+            resource_identifier=resource_identifier
+        )
+    )
+    if registered:
+        await _send_json(
+            send=send,
+            content={'msg': 'Resource identifier is already registered.'},
+            status=409
+        )
+        return True
+    resources_dir = input_registrar.resources_dir(
+        resource_identifier=resource_identifier,
+        requester_login=requester_login
+    )
+    try:
+        persisted_input = await _persist_image_part(
+            events=events,
+            input_registrar=input_registrar,
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_dir=resources_dir,
+            transcode=transcode
+        )
+        async for _ in events:
+            pass
+    except ValueError:
+        await _send_json(
+            send=send,
+            content={'msg': 'Malformed multipart request body.'},
+            status=400
+        )
+        return True
+    if persisted_input is None:
+        await _send_json(
+            send=send,
+            content={'msg': 'Field called "image" must contain valid image'},
+            status=500
+        )
+        return True
+    content = await loop.run_in_executor(
+        IO_EXECUTOR,
+        partial(
+            input_registrar.complete,
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_dir=resources_dir,
+            persisted_input=persisted_input,
+            created_at=created_at
+        )
+    )
+    await _send_json(send=send, content=content, status=200)
+    return True
+
+
+async def _collect_form_fields(scope: Scope,
+                               events: AsyncIterator[MultipartEvent]
+                               ) -> Optional[Parameters]:
+    fields: Dict[str, bytes] = {}
+    field_name = None
+    async for kind, value in events:
+        if kind == PART_STARTED and value == 'image':
+            parameters = parse_qs(
+                scope.get('query_string', b'').decode('utf-8')
+            )
+            for name, content in fields.items():
+                parameters.setdefault(name, []).append(content.decode('utf-8'))
+            return parameters
+        if kind == PART_STARTED:
+            field_name = value
+            fields[field_name] = b''
+        elif kind == PART_DATA:
+            fields[field_name] += value
+            if len(fields[field_name]) > MAX_FORM_FIELD_SIZE:
+                raise ValueError(f'Field "{field_name}" is too large.')
+    return None
+
+
+async def _persist_image_part(events: AsyncIterator[MultipartEvent],
+                              input_registrar: InputRegistrar,
+                              resource_identifier: str,
+                              requester_login: str,
+                              resources_dir: str,
+                              transcode: bool
+                              ) -> Optional[PersistedInput]:
+    loop = asyncio.get_event_loop()
+    image_chunks = _part_chunks(events=events)
+    header = b''
+    input_image_name = None
+    async for chunk in image_chunks:
+        header += chunk
+        input_image_name = input_registrar.pass_through_name(
+            header=header,
+            transcode=transcode
+        )
+        if input_image_name is not None or \
+                len(header) >= MAX_IMAGE_HEADER_SIZE:
+            break
+    if input_image_name is None or input_registrar.stages_inputs:
+        async for chunk in image_chunks:
+            header += chunk
+        return await loop.run_in_executor(
+            IO_EXECUTOR,
+            partial(
+                input_registrar.persist_buffered,
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                raw_image=header,
+                transcode=transcode
+            )
+        )
+    writer = await loop.run_in_executor(
+        IO_EXECUTOR, input_registrar.open_writer
+    )
+    try:
+        await loop.run_in_executor(IO_EXECUTOR, writer.write, header)
+        async for chunk in image_chunks:
+            await loop.run_in_executor(IO_EXECUTOR, writer.write, chunk)
+    except BaseException:
+        await loop.run_in_executor(IO_EXECUTOR, writer.abort)
+        raise
+    return await loop.run_in_executor(
+        IO_EXECUTOR,
+        partial(
+            input_registrar.commit,
+            writer=writer,
+            resources_dir=resources_dir,
+            input_image_name=input_image_name
+        )
+    )
+
+
+async def _part_chunks(events: AsyncIterator[MultipartEvent]
+                       ) -> AsyncIterator[bytes]:
+    async for kind, value in events:
+        if kind == PART_FINISHED:
+            break
+        if kind == PART_DATA:
+            yield value
+
+
+async def _fetch_input_image(scope: Scope, parameters: Parameters, send: Send
+                             ) -> bool:
+    headers = _headers(scope=scope)
+    if TRANSFORM_PARAMETERS & set(parameters) or 'range' in headers:
+        return False
+    requester_login = _first(parameters, 'requester_login')
+    resource_identifier = _first(parameters, 'resource_identifier')
+    if requester_login is None or resource_identifier is None:
+        return False
+    components = service.SERVICE_COMPONENTS
+    if components.input_staging is not None:
+        staged_input = components.input_staging.get(
+            key=(resource_identifier, requester_login)
+        )
+        if staged_input is not None:
+            await _send_content(
+                send=send,
+                headers=headers,
+                file_name=staged_input.input_image_name,
+                content=staged_input.content
+            )
+            return True
+    loop = asyncio.get_event_loop()
+    resources_dir, input_image_name = await loop.run_in_executor(
+        IO_EXECUTOR,
+        partial(
+            locate_input_image,
+            layout=components.layout,
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+    )
+    if input_image_name is None:
+        return False
+    return await _send_file(
+        send=send,
+        headers=headers,
+        file_path=os.path.join(resources_dir, input_image_name)
+    )
+
+
+async def _send_content(send: Send,
+                        headers: Dict[str, str],
+                        file_name: str,
+                        content: bytes
+                        ) -> None:
+    etag = hashlib.md5(content).hexdigest()
+    response_headers = _file_headers(file_name=file_name, etag=etag)
+    if _etag_matches(headers=headers, etag=etag):
+        await _send_not_modified(send=send, headers=response_headers)
+        return None
+    response_headers.append((b'content-length', str(len(content)).encode()))
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': response_headers
+    })
+    await send({'type': 'http.response.body', 'body': content})
+
+
+async def _send_file(send: Send, headers: Dict[str, str], file_path: str
+                     ) -> bool:
+    loop = asyncio.get_event_loop()
+    try:
+        f = await loop.run_in_executor(IO_EXECUTOR, open, file_path, 'rb')
+    except FileNotFoundError:
+        return False
+    with f:
+        file_stat = await loop.run_in_executor(
+            IO_EXECUTOR, os.fstat, f.fileno()
+        )
+        checksum = zlib.adler32(file_path.encode('utf-8')) & 0xffffffff
+        etag = f'{file_stat.st_mtime}-{file_stat.st_size}-{checksum}'
+        response_headers = _file_headers(
+            file_name=os.path.basename(file_path),
+            etag=etag
+        )
+        response_headers.append((
+            b'last-modified',
+            email.utils.formatdate(file_stat.st_mtime, usegmt=True).encode()
+        ))
+        if _etag_matches(headers=headers, etag=etag):
+            await _send_not_modified(send=send, headers=response_headers)
+            return True
+        response_headers.append(
+            (b'content-length', str(file_stat.st_size).encode())
+        )
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': response_headers
+        })
+        while True:
+            chunk = await loop.run_in_executor(
+                IO_EXECUTOR, f.read, ASYNC_FILE_CHUNK_SIZE
+            )
+            await send({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': len(chunk) > 0
+            })
+            if len(chunk) == 0:
+                break
+    return True
+
+
+async def _send_not_modified(send: Send, headers: List[tuple]) -> None:
+    await send({
+        'type': 'http.response.start',
+        'status': 304,
+        'headers': headers
+    })
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _send_json(send: Send, content: dict, status: int) -> None:
+    body = json.dumps(content).encode('utf-8') + b'\n'
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode())
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def _send_response(send: Send, response: Response) -> None:
+    await send({
+        'type': 'http.response.start',
+        'status': response.status_code,
+        'headers': [
+            (name.lower().encode('latin-1'), value.encode('latin-1'))
+            for name, value in response.headers.items()
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': response.get_data()})
+
+
+async def _authorize(scope: Scope, send: Send) -> bool:
+    rejection = verify_access_token(
+        headers=list(_headers(scope=scope).items())
+    )
+    if rejection is None:
+        return True
+    await _send_response(send=send, response=rejection)
+    return False
+
+
+def verify_access_token(headers: List[tuple]) -> Optional[Response]:
+    with service.app.test_request_context(headers=headers):
+        try:
+            verify_jwt_in_request()
+        except Exception as e:
+            return service.app.make_response(
+                service.app.handle_user_exception(e)
+            )
+    return None
+
+
+async def _read_body(receive: Receive) -> bytes:
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body', False):
+            return body
+
+
+def _replay_body(body: bytes) -> Receive:
+    async def receive() -> Message:
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+    return receive
+
+
+def _parse_parameters(scope: Scope, body: bytes) -> Parameters:
+    parameters = parse_qs(scope.get('query_string', b'').decode('utf-8'))
+    content_type = _headers(scope=scope).get('content-type', '')
+    if content_type.startswith('application/x-www-form-urlencoded'):
+        for name, values in parse_qs(body.decode('utf-8')).items():
+            parameters.setdefault(name, []).extend(values)
+    elif content_type.startswith('application/json') and len(body) > 0:
+        content = json.loads(body)
+        if not isinstance(content, dict):
+            raise ValueError('JSON body must be an object.')
+        for name, value in content.items():
+            values = value if isinstance(value, list) else [value]
+            parameters.setdefault(name, []).extend(str(v) for v in values)
+    return parameters
+
+
+def _headers(scope: Scope) -> Dict[str, str]:
+    return {
+        name.decode('latin-1').lower(): value.decode('latin-1')
+        for name, value in scope.get('headers', [])
+    }
+
+
+def _file_headers(file_name: str, etag: str) -> List[tuple]:
+    mimetype = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+    return [
+        (b'content-type', mimetype.encode()),
+        (b'content-disposition', f'attachment; filename={file_name}'.encode()),
+        (b'etag', f'"{etag}"'.encode()),
+        (b'cache-control', f'public, max-age={SEND_FILE_MAX_AGE}'.encode())
+    ]
+
+
+def _etag_matches(headers: Dict[str, str], etag: str) -> bool:
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is None:
+        return False
+    candidates = {
+        candidate.strip().lstrip('W/').strip('"')
+        for candidate in if_none_match.split(',')
+    }
+    return etag in candidates or '*' in candidates
+
+
+def _content_length(scope: Scope) -> int:
+    try:
+        return int(_headers(scope=scope).get('content-length') or 0)
+    except ValueError:
+        return 0
+
+
+def _first(parameters: Parameters, name: str) -> Optional[str]:
+    values = parameters.get(name)
+    return values[0] if values else None
+
+
+def serve(port: int) -> None:
+    certificate_path, key_path = make_ssl_devcert(
+        os.path.join(tempfile.mkdtemp(), 'resources_manager'),
+        host='*'
+    )
+    uvicorn.run(
+        ResourcesManagerAsgiApp(),
+        host='0.0.0.0',
+        port=port,
+        ssl_certfile=certificate_path,
+        ssl_keyfile=key_path,
+        loop='asyncio'
+    )
+
+
+if __name__ == '__main__':
+    service.create_api()
+    service_port = service._fetch_port()
+    print(f"Fetched port: {service_port}")
+    serve(port=service_port)
@@ -0,0 +1,83 @@
+import logging
+import os
+
+from .analytics import AnalyticsAggregates, AGGREGATED_RESULTS
+from .config import INDEX_DB_PATH, PERSISTENCE_DIR, PERSISTENCE_SHARD_LEVELS, \
+    PERSISTENCE_SHARD_WIDTH, RESULTS_STORAGE_ENGINE, RESULTS_DB_PATH, \
+    RESULTS_DB_COMMIT_BATCH_SIZE, RESULTS_ENCODING, RESULTS_COMPRESSION, \
+    PACKS_DIR, PACK_MAX_BYTES, BATCH_STREAM_PAGE_SIZE, ANALYTICS_DB_PATH, \
+    ANALYTICS_GRANULARITIES, ANALYTICS_AGE_BUCKETS
+from .index import ResourcesIndex
+from .layout import PersistenceLayout
+from .packs import PackStore
+from .results_codec import ResultsCodec
+from .results_store import create_results_store, result_resource_name
+
+logging.getLogger().setLevel(logging.INFO)
+
+
+def build_analytics() -> None:
+    layout = PersistenceLayout(
+        persistence_dir=PERSISTENCE_DIR,
+        shard_levels=PERSISTENCE_SHARD_LEVELS,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    resources_index = ResourcesIndex(db_path=INDEX_DB_PATH)
+    results_store = create_results_store(
+        engine=RESULTS_STORAGE_ENGINE,
+        layout=layout,
+        db_path=RESULTS_DB_PATH,
+        commit_batch_size=RESULTS_DB_COMMIT_BATCH_SIZE,
+        codec=ResultsCodec(
+            encoding=RESULTS_ENCODING,
+            compression=RESULTS_COMPRESSION
+        ),
+        pack_store=PackStore(
+            packs_dir=PACKS_DIR,
+            resources_index=resources_index,
+            max_pack_bytes=PACK_MAX_BYTES
+        )
+    )
+    analytics_aggregates = AnalyticsAggregates(
+        db_path=ANALYTICS_DB_PATH,
+        granularities=ANALYTICS_GRANULARITIES,
+        age_buckets=ANALYTICS_AGE_BUCKETS
+    )
+    analytics_aggregates.reset()
+    aggregated_names = {
+        result_resource_name(result_type=result_type)
+        for result_type in AGGREGATED_RESULTS
+    }
+    requests_aggregated = 0
+    indexed_resources = resources_index.iterate_resources(
+        range_start=0.0,
+        range_end=float('inf'),
+        page_size=BATCH_STREAM_PAGE_SIZE
+    )
+    for indexed_resource in indexed_resources:
+        results_types = [
+            os.path.splitext(resource_name)[0]
+            for resource_name in indexed_resource.resources
+            if resource_name in aggregated_names
+        ]
+        stored_results = results_store.load(
+            resource_identifier=indexed_resource.resource_identifier,
+            requester_login=indexed_resource.requester_login,
+            resources_types=results_types
+        )
+        for result_type, (content, _) in stored_results.items():
+            analytics_aggregates.record(
+                key=(
+                    indexed_resource.resource_identifier,
+                    indexed_resource.requester_login,
+                    result_type
+                ),
+                created_at=indexed_resource.created_at,
+                content=content
+            )
+        requests_aggregated += 1
+    logging.info(f'Analytics built for {requests_aggregated} requests.')
+
+
+if __name__ == '__main__':
+    build_analytics()
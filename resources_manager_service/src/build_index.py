@@ -0,0 +1,25 @@
+import logging
+
+from .config import INDEX_DB_PATH, PERSISTENCE_DIR, PERSISTENCE_SHARD_LEVELS, \
+    PERSISTENCE_SHARD_WIDTH
+from .index import ResourcesIndex
+from .layout import PersistenceLayout
+
+logging.getLogger().setLevel(logging.INFO)
+
+
+def build_index() -> None:
+    layout = PersistenceLayout(
+        persistence_dir=PERSISTENCE_DIR,
+        shard_levels=PERSISTENCE_SHARD_LEVELS,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    resources_index = ResourcesIndex(db_path=INDEX_DB_PATH)
+    requests_indexed = resources_index.rebuild(
+        requests_directories=layout.iterate_requests_directories()
+    )
+    logging.info(f'Resources index built for {requests_indexed} requests.')
+
+
+if __name__ == '__main__':
+    build_index()
@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+
+ResultKey = Tuple[str, str, str]
+CacheLookup = Tuple[bool, Optional[dict]]
+
+NEGATIVE_ENTRY_SIZE = 64
+
+
+class ResultsCache:
+
+    def __init__(self, max_bytes: int, negative_ttl: float):
+        self.__max_bytes = max_bytes
+        self.__negative_ttl = negative_ttl
+        self.__entries = OrderedDict()
+        self.__current_bytes = 0
+        self.__generation = 0
+        self.__lock = Lock()
+
+    def get(self, key: ResultKey) -> CacheLookup:
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is None:
+                return False, None
+            content, _, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                self.__remove(key=key)
+                return False, None
+            self.__entries.move_to_end(key)
+            return True, content
+
+    @property
+    def generation(self) -> int:
+        with self.__lock:
+            return self.__generation
+
+    def put(self,
+            key: ResultKey,
+            content: dict,
+            size: int,
+            generation: Optional[int] = None
+            ) -> None:
+        self.__insert(
+            key=key,
+            entry=(content, size, None),
+            generation=generation
+        )
+
+    def put_missing(self, key: ResultKey, generation: int) -> None:
+        expires_at = time.monotonic() + self.__negative_ttl
+        self.__insert(
+            key=key,
+            entry=(None, NEGATIVE_ENTRY_SIZE, expires_at),
+            generation=generation
+        )
+
+    def invalidate(self, key: ResultKey) -> None:
+        with self.__lock:
+            self.__generation += 1
+            self.__remove(key=key)
+
+    def __insert(self,
+                 key: ResultKey,
+                 entry: tuple,
+                 generation: Optional[int]
+                 ) -> None:
+        size = entry[1]
+        with self.__lock:
+            if generation is None:
+                self.__generation += 1
+            elif generation != self.__generation:
+                return None
+            self.__remove(key=key)
+            if size > self.__max_bytes:
+                return None
+            self.__entries[key] = entry
+            self.__current_bytes += size
+            while self.__current_bytes > self.__max_bytes:
+                oldest_key = next(iter(self.__entries))
+                self.__remove(key=oldest_key)
+
+    def __remove(self, key: ResultKey) -> None:
+        entry = self.__entries.pop(key, None)
+        if entry is not None:
+            self.__current_bytes -= entry[1]
@@ -19,3 +19,63 @@ SERVICE_SECRET = os.environ['RESOURCES_MANAGER_SERVICE_SECRET']
 PERSISTENCE_DIR = "./persistence"
 INPUT_IMAGE_NAME = "input.jpg"
 DATE_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+INDEX_DB_PATH = os.path.join(PERSISTENCE_DIR, "resources_index.db")
+BATCH_FETCH_MAX_PAGE_SIZE = 1000
+PERSISTENCE_SHARD_LEVELS = 2
+PERSISTENCE_SHARD_WIDTH = 2
+RESULTS_STORAGE_ENGINE = os.environ.get('RESULTS_STORAGE_ENGINE', 'files')
+RESULTS_DB_PATH = os.path.join(PERSISTENCE_DIR, "results.db")
+RESULTS_DB_COMMIT_BATCH_SIZE = 256
+RESULTS_ENCODING = 'binary'
+RESULTS_COMPRESSION = 'zlib'
+INPUT_IMAGE_NAMES = {
+    'jpeg': INPUT_IMAGE_NAME,
+    'png': 'input.png',
+    'bmp': 'input.bmp',
+    'webp': 'input.webp'
+}
+INPUT_PASS_THROUGH = True
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_IMAGE_HEADER_SIZE = 1024 * 1024
+CONTENT_STORE_DIR = os.path.join(PERSISTENCE_DIR, "_objects")
+REUSABLE_RESULTS = ['people_detection', 'faces_detection', 'age_estimation']
+REUSE_COMPLETION_MARKER = 'age_estimation'
+INPUT_IMAGES_TTL = 7 * 24 * 60 * 60
+RESULTS_TTL = 30 * 24 * 60 * 60
+DISK_BUDGET_BYTES = 50 * 1024 ** 3
+RETENTION_SWEEP_INTERVAL = 60
+RETENTION_BATCH_SIZE = 500
+RETENTION_MAX_DELETIONS_PER_SECOND = 200
+RESULTS_CACHE_MAX_BYTES = 64 * 1024 ** 2
+RESULTS_CACHE_NEGATIVE_TTL = 2.0
+BATCH_FETCH_DEFAULT_PAGE_SIZE = 100
+BATCH_STREAM_PAGE_SIZE = 100
+BULK_FETCH_MAX_REQUESTS = 1000
+BULK_FETCH_WORKERS = 8
+WAIT_MAX_TIMEOUT = 60.0
+WAIT_DEFAULT_TIMEOUT = 30.0
+WAIT_POLL_INTERVAL = 2.0
+RESOURCES_MANAGER_NODES = os.environ.get(
+    'RESOURCES_MANAGER_NODES', SERVICE_NAME
+).split(',')
+REBALANCE_BATCH_SIZE = 100
+INPUT_WRITE_BEHIND = False
+INPUT_STAGING_MAX_BYTES = 256 * 1024 * 1024
+INPUT_STAGING_RETRY_BACKOFF = 1.0
+INPUT_STAGING_MAX_RETRY_BACKOFF = 60.0
+INPUT_FLUSH_DURABILITY = 'flush'
+DERIVATIVES_CACHE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_DERIVATIVE_FORMAT = 'jpeg'
+ASYNC_IO_WORKERS = 32
+ASYNC_FILE_CHUNK_SIZE = 256 * 1024
+LOGIN_STORAGE_QUOTA_BYTES = None
+LOGIN_REQUESTS_QUOTA = None
+PACKS_DIR = os.path.join(PERSISTENCE_DIR, "_packs")
+PACK_MAX_BYTES = 1024 ** 3
+COLD_TIER_AGE = 3 * 24 * 60 * 60
+COLD_TIER_COMPACTION_INTERVAL = 10 * 60
+COLD_TIER_BATCH_SIZE = 200
+PACK_MIN_LIVE_RATIO = 0.5
+ANALYTICS_DB_PATH = os.path.join(PERSISTENCE_DIR, "analytics.db")
+ANALYTICS_GRANULARITIES = {'hour': 60 * 60, 'day': 24 * 60 * 60}
+ANALYTICS_AGE_BUCKETS = [0, 13, 18, 25, 35, 45, 55, 65]
@@ -0,0 +1,114 @@
+import hashlib
+import os
+import shutil
+from threading import Lock
+from typing import Iterable, Tuple
+from uuid import uuid4
+
+from .index import ResourcesIndex
+
+DURABILITY_NONE = 'none'
+DURABILITY_FLUSH = 'flush'
+DURABILITY_FSYNC = 'fsync'
+
+
+def link_or_copy(source_path: str, target_path: str) -> None:
+    try:
+        os.link(source_path, target_path)
+    except OSError:
+        shutil.copyfile(source_path, target_path)
+
+
+class ContentWriter:
+
+    def __init__(self, temporary_path: str, durability: str):
+        self.__temporary_path = temporary_path
+        self.__durability = durability
+        self.__hasher = hashlib.sha256()
+        self.__size = 0
+        self.__file = open(temporary_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.__hasher.update(chunk)
+        self.__file.write(chunk)
+        self.__size += len(chunk)
+
+    def close(self) -> Tuple[str, str, int]:
+        try:
+            if self.__durability != DURABILITY_NONE:
+                self.__file.flush()
+            if self.__durability == DURABILITY_FSYNC:
+                os.fsync(self.__file.fileno())
+        finally:
+            self.__file.close()
+        return self.__temporary_path, self.__hasher.hexdigest(), self.__size
+
+    def abort(self) -> None:
+        self.__file.close()
+        if os.path.exists(self.__temporary_path):
+            os.remove(self.__temporary_path)
+
+
+class ContentAddressedStore:
+
+    def __init__(self,
+                 objects_dir: str,
+                 resources_index: ResourcesIndex,
+                 shard_width: int):
+        self.__objects_dir = os.path.abspath(objects_dir)
+        self.__temporary_dir = os.path.join(self.__objects_dir, 'tmp')
+        self.__resources_index = resources_index
+        self.__shard_width = shard_width
+        self.__lock = Lock()
+        os.makedirs(self.__temporary_dir, exist_ok=True)
+
+    def persist(self,
+                chunks: Iterable[bytes],
+                target_path: str,
+                durability: str = DURABILITY_NONE
+                ) -> str:
+        writer = self.open_writer(durability=durability)
+        try:
+            for chunk in chunks:
+                writer.write(chunk=chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return self.commit(writer=writer, target_path=target_path)
+
+    def open_writer(self, durability: str = DURABILITY_NONE) -> ContentWriter:
+        return ContentWriter(
+            temporary_path=os.path.join(self.__temporary_dir, uuid4().hex),
+            durability=durability
+        )
+
+    def commit(self, writer: ContentWriter, target_path: str) -> str:
+        temporary_path, digest, size = writer.close()
+        object_path = self.object_path(digest=digest)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        with self.__lock:
+            if os.path.exists(object_path):
+                os.remove(temporary_path)
+            else:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.replace(temporary_path, object_path)
+            link_or_copy(source_path=object_path, target_path=target_path)
+            self.__resources_index.acquire_object(digest=digest, size=size)
+        return digest
+
+    def release(self, digest: str) -> None:
+        with self.__lock:
+            reference_count = self.__resources_index.release_object(
+                digest=digest
+            )
+            object_path = self.object_path(digest=digest)
+            if reference_count <= 0 and os.path.exists(object_path):
+                os.remove(object_path)
+
+    def object_path(self, digest: str) -> str:
+        return os.path.join(
+            self.__objects_dir,
+            digest[:self.__shard_width],
+            digest[self.__shard_width:2 * self.__shard_width],
+            digest
+        )
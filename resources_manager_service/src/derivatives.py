@@ -0,0 +1,114 @@
+import os
+import shutil
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Set
+from uuid import uuid4
+
+from .images import ImageTransform
+from .layout import PersistenceLayout
+
+DERIVATIVES_DIR_NAME = '_derivatives'
+
+
+def derivatives_dir(resources_dir: str) -> str:
+    return os.path.join(resources_dir, DERIVATIVES_DIR_NAME)
+
+
+class DerivativesCache:
+
+    def __init__(self, max_bytes: int):
+        self.__max_bytes = max_bytes
+        self.__entries = OrderedDict()
+        self.__directories: Dict[str, Set[str]] = {}
+        self.__current_bytes = 0
+        self.__lock = Lock()
+
+    def restore(self, layout: PersistenceLayout) -> None:
+        derivatives = []
+        for _, _, resources_dir in layout.iterate_requests_directories():
+            target_dir = derivatives_dir(resources_dir=resources_dir)
+            if not os.path.isdir(target_dir):
+                continue
+            for entry in os.scandir(target_dir):
+                if entry.name.startswith('.'):
+                    os.remove(entry.path)
+                elif entry.is_file():
+                    stat = entry.stat()
+                    derivatives.append(
+                        (stat.st_mtime, entry.path, stat.st_size)
+                    )
+        with self.__lock:
+            for _, derivative_path, size in sorted(derivatives):
+                if derivative_path not in self.__entries:
+                    self.__track(derivative_path=derivative_path, size=size)
+
+    def discard(self, resources_dir: str) -> None:
+        target_dir = derivatives_dir(resources_dir=resources_dir)
+        with self.__lock:
+            derivatives_paths = list(self.__directories.get(target_dir, ()))
+            for derivative_path in derivatives_paths:
+                self.__forget(derivative_path=derivative_path)
+        shutil.rmtree(target_dir, ignore_errors=True)
+
+    def get(self, resources_dir: str, transform: ImageTransform
+            ) -> Optional[str]:
+        derivative_path = os.path.join(
+            derivatives_dir(resources_dir=resources_dir),
+            transform.derivative_name
+        )
+        try:
+            size = os.path.getsize(derivative_path)
+        except OSError:
+            with self.__lock:
+                self.__forget(derivative_path=derivative_path)
+            return None
+        with self.__lock:
+            if derivative_path in self.__entries:
+                self.__entries.move_to_end(derivative_path)
+            else:
+                self.__track(derivative_path=derivative_path, size=size)
+        return derivative_path
+
+    def put(self,
+            resources_dir: str,
+            transform: ImageTransform,
+            content: bytes
+            ) -> str:
+        target_dir = derivatives_dir(resources_dir=resources_dir)
+        os.makedirs(target_dir, exist_ok=True)
+        derivative_path = os.path.join(target_dir, transform.derivative_name)
+        temporary_path = os.path.join(target_dir, f'.{uuid4().hex}')
+        with open(temporary_path, "wb") as f:
+            f.write(content)
+        os.replace(temporary_path, derivative_path)
+        with self.__lock:
+            self.__forget(derivative_path=derivative_path)
+            self.__track(derivative_path=derivative_path, size=len(content))
+        return derivative_path
+
+    def __track(self, derivative_path: str, size: int) -> None:
+        self.__entries[derivative_path] = size
+        self.__directories.setdefault(
+            os.path.dirname(derivative_path), set()
+        ).add(derivative_path)
+        self.__current_bytes += size
+        while self.__current_bytes > self.__max_bytes and \
+                len(self.__entries) > 1:
+            oldest_path = next(iter(self.__entries))
+            self.__forget(derivative_path=oldest_path)
+            try:
+                os.remove(oldest_path)
+            except FileNotFoundError:
+                pass
+
+    def __forget(self, derivative_path: str) -> None:
+        size = self.__entries.pop(derivative_path, None)
+        if size is None:
+            return None
+        self.__current_bytes -= size
+        target_dir = os.path.dirname(derivative_path)
+        directory_entries = self.__directories[target_dir]
+        directory_entries.discard(derivative_path)
+        if len(directory_entries) == 0:
+            del self.__directories[target_dir]
@@ -0,0 +1,336 @@
+import argparse
+import base64
+import io
+import json
+import logging
+import os
+import tarfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+from .config import INDEX_DB_PATH, PERSISTENCE_DIR, PERSISTENCE_SHARD_LEVELS, \
+    PERSISTENCE_SHARD_WIDTH, INPUT_IMAGE_NAMES, RESULTS_STORAGE_ENGINE, \
+    RESULTS_DB_PATH, RESULTS_DB_COMMIT_BATCH_SIZE, RESULTS_ENCODING, \
+    RESULTS_COMPRESSION, PACKS_DIR, PACK_MAX_BYTES, BATCH_STREAM_PAGE_SIZE, \
+    DATE_TIME_FORMAT
+from .index import ResourcesIndex, IndexedResource
+from .layout import PersistenceLayout
+from .packs import PackStore, PackedContent
+from .pagination import BatchQuery
+from .results_codec import ResultsCodec
+from .results_store import ResultsStore, create_results_store
+
+NDJSON_FORMAT = 'ndjson'
+TAR_FORMAT = 'tar'
+EXPORT_MIMETYPES = {
+    NDJSON_FORMAT: 'application/x-ndjson',
+    TAR_FORMAT: 'application/x-tar'
+}
+CURSOR_PAX_HEADER = 'MAAS.cursor'
+
+
+@dataclass(frozen=True)
+class ExportedRequest:
+    indexed_resource: IndexedResource
+    cursor: str
+    results: Dict[str, dict]
+    input_image: Optional[PackedContent]
+
+    def to_ndjson(self) -> bytes:
+        content = {
+            **self.indexed_resource.to_dict(),
+            'created_at': self.indexed_resource.created_at,
+            'results': self.results,
+            'cursor': self.cursor
+        }
+        if self.input_image is not None:
+            input_image_name, input_image = self.input_image
+            content['input_image'] = {
+                'name': input_image_name,
+                'content': base64.b64encode(input_image).decode('ascii')
+            }
+        return f'{json.dumps(content)}\n'.encode('utf-8')
+
+    def write_to_tar(self, archive: tarfile.TarFile) -> None:
+        members_dir = f'{self.indexed_resource.resource_identifier}/' \
+            f'{self.indexed_resource.requester_login}'
+        members = [
+            (f'{result_type}.json', json.dumps(content).encode('utf-8'))
+            for result_type, content in sorted(self.results.items())
+        ]
+        if self.input_image is not None:
+            members.append(self.input_image)
+        for member_name, content in members:
+            member = tarfile.TarInfo(name=f'{members_dir}/{member_name}')
+            member.size = len(content)
+            member.mtime = int(self.indexed_resource.created_at)
+            member.pax_headers = {CURSOR_PAX_HEADER: self.cursor}
+            archive.addfile(member, io.BytesIO(content))
+
+
+@dataclass(frozen=True)
+class ExportCheckpoint:
+    cursor: str
+    offset: int
+
+
+class ChunksBuffer:
+
+    def __init__(self):
+        self.__chunks: List[bytes] = []
+
+    def write(self, chunk: bytes) -> int:
+        self.__chunks.append(bytes(chunk))
+        return len(chunk)
+
+    def drain(self) -> bytes:
+        drained = b''.join(self.__chunks)
+        self.__chunks = []
+        return drained
+
+
+class RequestsExporter:
+
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 resources_index: ResourcesIndex,
+                 results_store: ResultsStore,
+                 pack_store: Optional[PackStore],
+                 input_images_names: Set[str],
+                 page_size: int):
+        self.__layout = layout
+        self.__resources_index = resources_index
+        self.__results_store = results_store
+        self.__pack_store = pack_store
+        self.__input_images_names = input_images_names
+        self.__page_size = page_size
+
+    def iterate(self, batch_query: BatchQuery, include_inputs: bool
+                ) -> Iterator[ExportedRequest]:
+        indexed_resources = self.__resources_index.iterate_resources(
+            range_start=batch_query.range_start,
+            range_end=batch_query.range_end,
+            requester_login=batch_query.requester_login,
+            start_after=batch_query.start_after,
+            page_size=self.__page_size
+        )
+        for indexed_resource in indexed_resources:
+            input_image = None
+            if include_inputs:
+                input_image = self.__load_input_image(
+                    indexed_resource=indexed_resource
+                )
+            yield ExportedRequest(
+                indexed_resource=indexed_resource,
+                cursor=batch_query.advance(
+                    start_after=indexed_resource.position
+                ).to_cursor(),
+                results=self.__load_results(indexed_resource=indexed_resource),
+                input_image=input_image
+            )
+
+    def stream(self,
+               batch_query: BatchQuery,
+               export_format: str,
+               include_inputs: bool
+               ) -> Iterator[bytes]:
+        exported_requests = self.iterate(
+            batch_query=batch_query,
+            include_inputs=include_inputs
+        )
+        if export_format == NDJSON_FORMAT:
+            for exported_request in exported_requests:
+                yield exported_request.to_ndjson()
+            return None
+        buffer = ChunksBuffer()
+        with tarfile.open(
+                fileobj=buffer, mode='w|', format=tarfile.PAX_FORMAT
+                ) as archive:
+            for exported_request in exported_requests:
+                exported_request.write_to_tar(archive=archive)
+                yield buffer.drain()
+        yield buffer.drain()
+
+    def __load_results(self, indexed_resource: IndexedResource
+                       ) -> Dict[str, dict]:
+        results_types = [
+            os.path.splitext(resource_name)[0]
+            for resource_name in indexed_resource.resources
+            if resource_name not in self.__input_images_names
+        ]
+        stored_results = self.__results_store.load(
+            resource_identifier=indexed_resource.resource_identifier,
+            requester_login=indexed_resource.requester_login,
+            resources_types=results_types
+        )
+        return {
+            result_type: content
+            for result_type, (content, _) in stored_results.items()
+        }
+
+    def __load_input_image(self, indexed_resource: IndexedResource
+                           ) -> Optional[PackedContent]:
+        input_image_name = next(
+            (
+                r for r in indexed_resource.resources
+                if r in self.__input_images_names
+            ),
+            None
+        )
+        if input_image_name is None:
+            return None
+        resources_dir = self.__layout.resources_dir(
+            resource_identifier=indexed_resource.resource_identifier,
+            requester_login=indexed_resource.requester_login
+        )
+        try:
+            with open(os.path.join(resources_dir, input_image_name), "rb") as f:
+                return input_image_name, f.read()
+        except OSError:
+            pass
+        if self.__pack_store is None:
+            return None
+        input_image = self.__pack_store.read(
+            resource_identifier=indexed_resource.resource_identifier,
+            requester_login=indexed_resource.requester_login,
+            resource_name=input_image_name
+        )
+        if input_image is None:
+            return None
+        return input_image_name, input_image
+
+
+def export(batch_query: BatchQuery,
+           export_format: str,
+           include_inputs: bool,
+           output_path: str,
+           resume: bool
+           ) -> None:
+    cursor_path = f'{output_path}.cursor'
+    checkpoint = None
+    if resume and os.path.isfile(cursor_path):
+        checkpoint = _load_checkpoint(cursor_path=cursor_path)
+    resume = checkpoint is not None
+    if resume:
+        batch_query = BatchQuery.from_cursor(cursor=checkpoint.cursor)
+        with open(output_path, 'r+b') as f:
+            f.truncate(checkpoint.offset)
+    exporter = _create_exporter()
+    exported_requests = exporter.iterate(
+        batch_query=batch_query,
+        include_inputs=include_inputs
+    )
+    exported = 0
+    with open(output_path, 'ab' if resume else 'wb') as f:
+        if export_format == NDJSON_FORMAT:
+            for exported_request in exported_requests:
+                f.write(exported_request.to_ndjson())
+                exported += 1
+                _save_cursor(
+                    output_file=f,
+                    cursor_path=cursor_path,
+                    cursor=exported_request.cursor
+                )
+        else:
+            with tarfile.open(
+                    fileobj=f, mode='w', format=tarfile.PAX_FORMAT
+                    ) as archive:
+                for exported_request in exported_requests:
+                    exported_request.write_to_tar(archive=archive)
+                    exported += 1
+                    _save_cursor(
+                        output_file=f,
+                        cursor_path=cursor_path,
+                        cursor=exported_request.cursor
+                    )
+    logging.info(f'Export finished. {exported} requests exported.')
+
+
+def _create_exporter() -> RequestsExporter:
+    layout = PersistenceLayout(
+        persistence_dir=PERSISTENCE_DIR,
+        shard_levels=PERSISTENCE_SHARD_LEVELS,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    resources_index = ResourcesIndex(db_path=INDEX_DB_PATH)
+    pack_store = PackStore(
+        packs_dir=PACKS_DIR,
+        resources_index=resources_index,
+        max_pack_bytes=PACK_MAX_BYTES
+    )
+    results_store = create_results_store(
+        engine=RESULTS_STORAGE_ENGINE,
+        layout=layout,
+        db_path=RESULTS_DB_PATH,
+        commit_batch_size=RESULTS_DB_COMMIT_BATCH_SIZE,
+        codec=ResultsCodec(
+            encoding=RESULTS_ENCODING,
+            compression=RESULTS_COMPRESSION
+        ),
+        pack_store=pack_store
+    )
+    return RequestsExporter(
+        layout=layout,
+        resources_index=resources_index,
+        results_store=results_store,
+        pack_store=pack_store,
+        input_images_names=set(INPUT_IMAGE_NAMES.values()),
+        page_size=BATCH_STREAM_PAGE_SIZE
+    )
+
+
+def _load_checkpoint(cursor_path: str) -> ExportCheckpoint:
+    with open(cursor_path) as f:
+        content = json.load(f)
+    return ExportCheckpoint(cursor=content['cursor'], offset=content['offset'])
+
+
+def _save_cursor(output_file, cursor_path: str, cursor: str) -> None:
+    output_file.flush()
+    checkpoint = {'cursor': cursor, 'offset': output_file.tell()}
+    temporary_path = f'{cursor_path}.tmp'
+    with open(temporary_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(temporary_path, cursor_path)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Exports stored requests into a single archive.'
+    )
+    parser.add_argument('--output', required=True)
+    parser.add_argument(
+        '--format', choices=list(EXPORT_MIMETYPES), default=TAR_FORMAT
+    )
+    parser.add_argument('--range_start', default=None)
+    parser.add_argument('--range_end', default=None)
+    parser.add_argument('--requester_login', default=None)
+    parser.add_argument('--include_inputs', action='store_true')
+    parser.add_argument('--resume', action='store_true')
+    return parser.parse_args()
+
+
+def _parse_timestamp(value: Optional[str], default: float) -> float:
+    if value is None:
+        return default
+    return datetime.strptime(value, DATE_TIME_FORMAT).timestamp()
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.INFO)
+    args = _parse_args()
+    export(
+        batch_query=BatchQuery(
+            range_start=_parse_timestamp(value=args.range_start, default=0.0),
+            range_end=_parse_timestamp(
+                value=args.range_end, default=time.time()
+            ),
+            requester_login=args.requester_login
+        ),
+        export_format=args.format,
+        include_inputs=args.include_inputs,
+        output_path=args.output,
+        resume=args.resume
+    )
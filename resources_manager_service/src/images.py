@@ -0,0 +1,210 @@
+import hashlib
+import struct
+from dataclasses import dataclass
+from typing import Optional, IO, Iterable, Tuple, List
+
+import cv2
+import numpy as np
+
+JPEG_SOF_MARKERS = {
+    0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF
+}
+BoundingBox = Tuple[int, int, int, int]
+
+ENCODING_EXTENSIONS = {
+    'jpeg': '.jpg',
+    'png': '.png',
+    'webp': '.webp'
+}
+
+
+@dataclass(frozen=True)
+class ImageTransform:
+    max_dimension: Optional[int]
+    crop: Optional[BoundingBox]
+    image_format: str
+    quality: Optional[int]
+
+    @property
+    def derivative_name(self) -> str:
+        parameters = f'{self.max_dimension}-{self.crop}-{self.quality}'
+        parameters_hash = hashlib.sha1(parameters.encode('utf-8'))
+        extension = ENCODING_EXTENSIONS[self.image_format]
+        return f'{parameters_hash.hexdigest()[:16]}{extension}'
+
+
+@dataclass(frozen=True)
+class ImageHeader:
+    image_format: str
+    width: int
+    height: int
+
+
+def sniff_image_header(header: bytes) -> Optional[ImageHeader]:
+    for sniffer in (_sniff_jpeg, _sniff_png, _sniff_bmp, _sniff_webp):
+        image_header = sniffer(header)
+        if image_header is not None:
+            return image_header
+    return None
+
+
+def read_image_header(stream: IO[bytes],
+                      chunk_size: int,
+                      max_header_size: int
+                      ) -> bytes:
+    header = b''
+    while len(header) < max_header_size:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        header += chunk
+        if sniff_image_header(header) is not None:
+            break
+    return header
+
+
+def iterate_stream(stream: IO[bytes],
+                   head: bytes,
+                   chunk_size: int
+                   ) -> Iterable[bytes]:
+    if head:
+        yield head
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def transcode_to_jpeg(raw_image: bytes) -> Optional[bytes]:
+    data = np.frombuffer(raw_image, dtype=np.uint8)
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    success, encoded_image = cv2.imencode('.jpg', image)
+    if not success:
+        return None
+    return encoded_image.tobytes()
+
+
+def transform_image(raw_image: bytes, transform: ImageTransform
+                    ) -> Optional[bytes]:
+    data = np.frombuffer(raw_image, dtype=np.uint8)
+    image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+    if image is None:
+        return None
+    if transform.crop is not None:
+        image = _crop_image(image=image, crop=transform.crop)
+        if image.size == 0:
+            return None
+    if transform.max_dimension is not None:
+        image = _limit_image_dimension(
+            image=image,
+            max_dimension=transform.max_dimension
+        )
+    success, encoded_image = cv2.imencode(
+        ENCODING_EXTENSIONS[transform.image_format],
+        image,
+        _encoding_params(transform=transform)
+    )
+    if not success:
+        return None
+    return encoded_image.tobytes()
+
+
+def _crop_image(image: np.ndarray, crop: BoundingBox) -> np.ndarray:
+    height, width = image.shape[:2]
+    x_min, y_min, x_max, y_max = crop
+    x_min, x_max = max(0, x_min), min(width, x_max)
+    y_min, y_max = max(0, y_min), min(height, y_max)
+    return image[y_min:y_max, x_min:x_max]
+
+
+def _limit_image_dimension(image: np.ndarray, max_dimension: int
+                           ) -> np.ndarray:
+    height, width = image.shape[:2]
+    scale = max_dimension / max(height, width)
+    if scale >= 1.0:
+        return image
+    target_size = max(1, round(width * scale)), max(1, round(height * scale))
+    return cv2.resize(image, target_size, interpolation=cv2.INTER_AREA)
+
+
+def _encoding_params(transform: ImageTransform) -> List[int]:
+    if transform.quality is None:
+        return []
+    if transform.image_format == 'jpeg':
+        return [int(cv2.IMWRITE_JPEG_QUALITY), transform.quality]
+    if transform.image_format == 'webp':
+        return [int(cv2.IMWRITE_WEBP_QUALITY), transform.quality]
+    return []
+
+
+def _sniff_jpeg(header: bytes) -> Optional[ImageHeader]:
+    if not header.startswith(b'\xff\xd8'):
+        return None
+    position = 2
+    while position + 9 < len(header):
+        if header[position] != 0xFF:
+            return None
+        marker = header[position + 1]
+        if marker == 0xFF:
+            position += 1
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(
+                '>HH', header[position + 5:position + 9]
+            )
+            return _valid_header('jpeg', width=width, height=height)
+        segment_length = struct.unpack(
+            '>H', header[position + 2:position + 4]
+        )[0]
+        position += 2 + segment_length
+    return None
+
+
+def _sniff_png(header: bytes) -> Optional[ImageHeader]:
+    if len(header) < 24 or not header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return None
+    if header[12:16] != b'IHDR':
+        return None
+    width, height = struct.unpack('>II', header[16:24])
+    return _valid_header('png', width=width, height=height)
+
+
+def _sniff_bmp(header: bytes) -> Optional[ImageHeader]:
+    if len(header) < 26 or not header.startswith(b'BM'):
+        return None
+    width, height = struct.unpack('<ii', header[18:26])
+    return _valid_header('bmp', width=width, height=abs(height))
+
+
+def _sniff_webp(header: bytes) -> Optional[ImageHeader]:
+    if len(header) < 30 or header[:4] != b'RIFF' or header[8:12] != b'WEBP':
+        return None
+    chunk_type = header[12:16]
+    if chunk_type == b'VP8 ':
+        width, height = struct.unpack('<HH', header[26:30])
+        return _valid_header(
+            'webp', width=width & 0x3FFF, height=height & 0x3FFF
+        )
+    if chunk_type == b'VP8L':
+        bits = struct.unpack('<I', header[21:25])[0]
+        width = (bits & 0x3FFF) + 1
+        height = ((bits >> 14) & 0x3FFF) + 1
+        return _valid_header('webp', width=width, height=height)
+    if chunk_type == b'VP8X':
+        width = int.from_bytes(header[24:27], 'little') + 1
+        height = int.from_bytes(header[27:30], 'little') + 1
+        return _valid_header('webp', width=width, height=height)
+    return None
+
+
+def _valid_header(image_format: str,
+                  width: int,
+                  height: int
+                  ) -> Optional[ImageHeader]:
+    if width <= 0 or height <= 0:
+        return None
+    return ImageHeader(image_format=image_format, width=width, height=height)
@@ -0,0 +1,716 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import List, Optional, Tuple, Iterable, Iterator
+
+from .layout import RequestDirectory
+
+ResourcePosition = Tuple[float, str, str]
+PackLocation = Tuple[int, int, int]
+PackedEntry = Tuple[str, int, int, int]
+PackMember = Tuple[str, str, str, int, int]
+RequestIdentifiers = Tuple[str, str]
+
+
+@dataclass
+class IndexedResource:
+    resource_identifier: str
+    requester_login: str
+    created_at: float
+    resources: List[str] = field(default_factory=list)
+
+    @property
+    def position(self) -> ResourcePosition:
+        return self.created_at, self.resource_identifier, self.requester_login
+
+    def to_dict(self) -> dict:
+        return {
+            "requester_login": self.requester_login,
+            "resource_identifier": self.resource_identifier,
+            "resources": self.resources
+        }
+
+
+@dataclass(frozen=True)
+class StoredResource:
+    resource_identifier: str
+    requester_login: str
+    resource_name: str
+    size: int
+
+
+@dataclass(frozen=True)
+class LoginUsage:
+    requester_login: str
+    stored_bytes: int = 0
+    resources_count: int = 0
+    requests_count: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "requester_login": self.requester_login,
+            "stored_bytes": self.stored_bytes,
+            "resources_count": self.resources_count,
+            "requests_count": self.requests_count
+        }
+
+
+class ResourcesIndex:
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.__lock = RLock()
+        self.__connection = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        self.__initialize_schema()
+
+    def register_request(self,
+                         resource_identifier: str,
+                         requester_login: str,
+                         created_at: Optional[float] = None
+                         ) -> None:
+        if created_at is None:
+            created_at = time.time()
+        with self.__transaction():
+            cursor = self.__connection.execute(
+                "INSERT OR IGNORE INTO requests "
+                "(resource_identifier, requester_login, created_at) "
+                "VALUES (?, ?, ?)",
+                (resource_identifier, requester_login, created_at)
+            )
+            if cursor.rowcount > 0:
+                self.__update_usage(
+                    requester_login=requester_login,
+                    requests_delta=1
+                )
+
+    def register_resource(self,
+                          resource_identifier: str,
+                          requester_login: str,
+                          resource_name: str,
+                          size: int
+                          ) -> bool:
+        with self.__transaction():
+            previous_size = self.__get_resource_size(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resource_name=resource_name
+            )
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO resources "
+                "(resource_identifier, requester_login, resource_name, size) "
+                "VALUES (?, ?, ?, ?)",
+                (resource_identifier, requester_login, resource_name, size)
+            )
+            self.__update_usage(
+                requester_login=requester_login,
+                bytes_delta=size - (previous_size or 0),
+                resources_delta=1 if previous_size is None else 0
+            )
+        return previous_size is None
+
+    def get_position(self,
+                     resource_identifier: str,
+                     requester_login: Optional[str] = None
+                     ) -> Optional[ResourcePosition]:
+        query = "SELECT created_at, resource_identifier, requester_login " \
+                "FROM requests WHERE resource_identifier = ?"
+        parameters = [resource_identifier]
+        if requester_login is not None:
+            query += " AND requester_login = ?"
+            parameters.append(requester_login)
+        with self.__lock:
+            row = self.__connection.execute(query, parameters).fetchone()
+        return tuple(row) if row is not None else None
+
+    def find_resources(self,
+                       range_start: float,
+                       range_end: float,
+                       requester_login: Optional[str] = None,
+                       start_after: Optional[ResourcePosition] = None,
+                       limit: Optional[int] = None
+                       ) -> List[IndexedResource]:
+        query = "SELECT resource_identifier, requester_login, created_at " \
+                "FROM requests WHERE created_at > ? AND created_at < ?"
+        parameters = [range_start, range_end]
+        if requester_login is not None:
+            query += " AND requester_login = ?"
+            parameters.append(requester_login)
+        if start_after is not None:
+            query += " AND (created_at, resource_identifier, " \
+                     "requester_login) > (?, ?, ?)"
+            parameters.extend(start_after)
+        query += " ORDER BY created_at, resource_identifier, requester_login"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        with self.__lock:
+            rows = self.__connection.execute(query, parameters).fetchall()
+            found = [IndexedResource(*row) for row in rows]
+            self.__attach_resources_names(indexed_resources=found)
+        return found
+
+    def register_input_digest(self,
+                              resource_identifier: str,
+                              requester_login: str,
+                              digest: str
+                              ) -> None:
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO input_digests "
+                "(resource_identifier, requester_login, digest) "
+                "VALUES (?, ?, ?)",
+                (resource_identifier, requester_login, digest)
+            )
+
+    def get_input_digest(self,
+                         resource_identifier: str,
+                         requester_login: str
+                         ) -> Optional[str]:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT digest FROM input_digests "
+                "WHERE resource_identifier = ? AND requester_login = ?",
+                (resource_identifier, requester_login)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def find_request_by_input_digest(self,
+                                     digest: str,
+                                     requester_login: str,
+                                     required_resource: str,
+                                     excluded_identifier: str
+                                     ) -> Optional[Tuple[str, str]]:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT d.resource_identifier, d.requester_login "
+                "FROM input_digests AS d JOIN resources AS r "
+                "ON d.resource_identifier = r.resource_identifier "
+                "AND d.requester_login = r.requester_login "
+                "WHERE d.digest = ? AND d.requester_login = ? "
+                "AND r.resource_name = ? AND d.resource_identifier != ? "
+                "LIMIT 1",
+                (
+                    digest, requester_login, required_resource,
+                    excluded_identifier
+                )
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def acquire_object(self, digest: str, size: int) -> None:
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT INTO objects (digest, size, reference_count) "
+                "VALUES (?, ?, 1) ON CONFLICT (digest) DO UPDATE "
+                "SET reference_count = reference_count + 1",
+                (digest, size)
+            )
+
+    def release_object(self, digest: str) -> int:
+        with self.__lock:
+            self.__connection.execute(
+                "UPDATE objects SET reference_count = reference_count - 1 "
+                "WHERE digest = ?",
+                (digest, )
+            )
+            row = self.__connection.execute(
+                "SELECT reference_count FROM objects WHERE digest = ?",
+                (digest, )
+            ).fetchone()
+            if row is None or row[0] <= 0:
+                self.__connection.execute(
+                    "DELETE FROM objects WHERE digest = ?", (digest, )
+                )
+                return 0
+        return row[0]
+
+    def find_resources_created_before(self,
+                                      created_before: float,
+                                      name_pattern: str,
+                                      limit: int
+                                      ) -> List[StoredResource]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT r.resource_identifier, r.requester_login, "
+                "r.resource_name, r.size "
+                "FROM requests AS q JOIN resources AS r "
+                "ON q.resource_identifier = r.resource_identifier "
+                "AND q.requester_login = r.requester_login "
+                "WHERE q.created_at < ? AND r.resource_name GLOB ? "
+                "ORDER BY q.created_at LIMIT ?",
+                (created_before, name_pattern, limit)
+            ).fetchall()
+        return [StoredResource(*row) for row in rows]
+
+    def find_request_resources(self,
+                               resource_identifier: str,
+                               requester_login: str
+                               ) -> List[StoredResource]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT resource_identifier, requester_login, "
+                "resource_name, size FROM resources "
+                "WHERE resource_identifier = ? AND requester_login = ?",
+                (resource_identifier, requester_login)
+            ).fetchall()
+        return [StoredResource(*row) for row in rows]
+
+    def remove_resource(self,
+                        resource_identifier: str,
+                        requester_login: str,
+                        resource_name: str
+                        ) -> None:
+        with self.__transaction():
+            size = self.__get_resource_size(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resource_name=resource_name
+            )
+            if size is None:
+                return None
+            self.__connection.execute(
+                "DELETE FROM resources WHERE resource_identifier = ? "
+                "AND requester_login = ? AND resource_name = ?",
+                (resource_identifier, requester_login, resource_name)
+            )
+            self.__update_usage(
+                requester_login=requester_login,
+                bytes_delta=-size,
+                resources_delta=-1
+            )
+
+    def remove_request(self,
+                       resource_identifier: str,
+                       requester_login: str
+                       ) -> None:
+        with self.__transaction():
+            stored_bytes, resources_count = self.__connection.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM resources "
+                "WHERE resource_identifier = ? AND requester_login = ?",
+                (resource_identifier, requester_login)
+            ).fetchone()
+            removed_requests = 0
+            for table in ('resources', 'input_digests', 'packed_resources',
+                          'packed_requests', 'requests'):
+                cursor = self.__connection.execute(
+                    f"DELETE FROM {table} WHERE resource_identifier = ? "
+                    "AND requester_login = ?",
+                    (resource_identifier, requester_login)
+                )
+                if table == 'requests':
+                    removed_requests = cursor.rowcount
+            self.__update_usage(
+                requester_login=requester_login,
+                bytes_delta=-stored_bytes,
+                resources_delta=-resources_count,
+                requests_delta=-removed_requests
+            )
+
+    def find_cold_requests(self,
+                           created_before: float,
+                           completion_marker: str,
+                           limit: int
+                           ) -> List[RequestIdentifiers]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT q.resource_identifier, q.requester_login "
+                "FROM requests AS q JOIN resources AS r "
+                "ON q.resource_identifier = r.resource_identifier "
+                "AND q.requester_login = r.requester_login "
+                "LEFT JOIN packed_requests AS p "
+                "ON q.resource_identifier = p.resource_identifier "
+                "AND q.requester_login = p.requester_login "
+                "WHERE q.created_at < ? AND r.resource_name = ? "
+                "AND p.resource_identifier IS NULL "
+                "ORDER BY q.created_at LIMIT ?",
+                (created_before, completion_marker, limit)
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def register_packed_resources(self,
+                                  resource_identifier: str,
+                                  requester_login: str,
+                                  packed_entries: List[PackedEntry]
+                                  ) -> None:
+        with self.__transaction():
+            self.__connection.executemany(
+                "INSERT OR REPLACE INTO packed_resources "
+                "(resource_identifier, requester_login, resource_name, "
+                "pack_id, offset, size) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (resource_identifier, requester_login, *packed_entry)
+                    for packed_entry in packed_entries
+                ]
+            )
+            self.__connection.execute(
+                "INSERT OR IGNORE INTO packed_requests "
+                "(resource_identifier, requester_login) VALUES (?, ?)",
+                (resource_identifier, requester_login)
+            )
+
+    def update_pack_size(self, pack_id: int, size: int) -> None:
+        with self.__lock:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO packs (pack_id, size) VALUES (?, ?)",
+                (pack_id, size)
+            )
+
+    def list_packs(self) -> List[Tuple[int, int]]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT pack_id, size FROM packs ORDER BY pack_id"
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def get_pack_live_bytes(self, pack_id: int) -> int:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM packed_resources "
+                "WHERE pack_id = ?",
+                (pack_id, )
+            ).fetchone()
+        return row[0]
+
+    def find_pack_members(self, pack_id: int) -> List[PackMember]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT resource_identifier, requester_login, resource_name, "
+                "offset, size FROM packed_resources WHERE pack_id = ? "
+                "ORDER BY offset",
+                (pack_id, )
+            ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def relocate_packed_resource(self,
+                                 pack_member: PackMember,
+                                 source_pack_id: int,
+                                 target_pack_id: int,
+                                 target_offset: int
+                                 ) -> None:
+        resource_identifier, requester_login, resource_name, offset, _ = \
+            pack_member
+        with self.__lock:
+            self.__connection.execute(
+                "UPDATE packed_resources SET pack_id = ?, offset = ? "
+                "WHERE resource_identifier = ? AND requester_login = ? "
+                "AND resource_name = ? AND pack_id = ? AND offset = ?",
+                (target_pack_id, target_offset, resource_identifier,
+                 requester_login, resource_name, source_pack_id, offset)
+            )
+
+    def remove_pack(self, pack_id: int) -> None:
+        with self.__lock:
+            self.__connection.execute(
+                "DELETE FROM packs WHERE pack_id = ?", (pack_id, )
+            )
+
+    def get_pack_location(self,
+                          resource_identifier: str,
+                          requester_login: str,
+                          resource_name: str
+                          ) -> Optional[PackLocation]:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT pack_id, offset, size FROM packed_resources "
+                "WHERE resource_identifier = ? AND requester_login = ? "
+                "AND resource_name = ?",
+                (resource_identifier, requester_login, resource_name)
+            ).fetchone()
+        return tuple(row) if row is not None else None
+
+    def is_request_packed(self,
+                          resource_identifier: str,
+                          requester_login: str
+                          ) -> bool:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT 1 FROM packed_requests "
+                "WHERE resource_identifier = ? AND requester_login = ?",
+                (resource_identifier, requester_login)
+            ).fetchone()
+        return row is not None
+
+    def remove_packed_resource(self,
+                               resource_identifier: str,
+                               requester_login: str,
+                               resource_name: str
+                               ) -> bool:
+        with self.__lock:
+            cursor = self.__connection.execute(
+                "DELETE FROM packed_resources WHERE resource_identifier = ? "
+                "AND requester_login = ? AND resource_name = ?",
+                (resource_identifier, requester_login, resource_name)
+            )
+        return cursor.rowcount > 0
+
+    def stored_bytes(self) -> int:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT "
+                "(SELECT COALESCE(SUM(r.size), 0) FROM resources AS r "
+                "LEFT JOIN packed_resources AS p "
+                "ON r.resource_identifier = p.resource_identifier "
+                "AND r.requester_login = p.requester_login "
+                "AND r.resource_name = p.resource_name "
+                "WHERE p.resource_identifier IS NULL) + "
+                "(SELECT COALESCE(SUM(size), 0) FROM packs)"
+            ).fetchone()
+        return row[0]
+
+    def physical_bytes(self, input_name_pattern: str) -> int:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT "
+                "(SELECT COALESCE(SUM(r.size), 0) FROM resources AS r "
+                "LEFT JOIN packed_resources AS p "
+                "ON r.resource_identifier = p.resource_identifier "
+                "AND r.requester_login = p.requester_login "
+                "AND r.resource_name = p.resource_name "
+                "LEFT JOIN input_digests AS d "
+                "ON r.resource_identifier = d.resource_identifier "
+                "AND r.requester_login = d.requester_login "
+                "AND r.resource_name GLOB ? "
+                "WHERE p.resource_identifier IS NULL "
+                "AND d.resource_identifier IS NULL) + "
+                "(SELECT COALESCE(SUM(size), 0) FROM objects) + "
+                "(SELECT COALESCE(SUM(size), 0) FROM packs)",
+                (input_name_pattern, )
+            ).fetchone()
+        return row[0]
+
+    def get_login_usage(self, requester_login: str) -> LoginUsage:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT requester_login, stored_bytes, resources_count, "
+                "requests_count FROM login_usage WHERE requester_login = ?",
+                (requester_login, )
+            ).fetchone()
+        if row is None:
+            return LoginUsage(requester_login=requester_login)
+        return LoginUsage(*row)
+
+    def list_logins_usage(self) -> List[LoginUsage]:
+        with self.__lock:
+            rows = self.__connection.execute(
+                "SELECT requester_login, stored_bytes, resources_count, "
+                "requests_count FROM login_usage ORDER BY requester_login"
+            ).fetchall()
+        return [LoginUsage(*row) for row in rows]
+
+    def iterate_resources(self,
+                          range_start: float,
+                          range_end: float,
+                          requester_login: Optional[str] = None,
+                          start_after: Optional[ResourcePosition] = None,
+                          page_size: int = 100
+                          ) -> Iterator[IndexedResource]:
+        while True:
+            page = self.find_resources(
+                range_start=range_start,
+                range_end=range_end,
+                requester_login=requester_login,
+                start_after=start_after,
+                limit=page_size
+            )
+            yield from page
+            if len(page) < page_size:
+                break
+            start_after = page[-1].position
+
+    def is_empty(self) -> bool:
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT 1 FROM requests LIMIT 1"
+            ).fetchone()
+        return row is None
+
+    def rebuild(self, requests_directories: Iterable[RequestDirectory]) -> int:
+        requests_indexed = 0
+        for resource_identifier, requester_login, resources_dir in \
+                requests_directories:
+            resources = [
+                (entry.name, entry.stat().st_size)
+                for entry in os.scandir(resources_dir) if entry.is_file()
+            ]
+            self.register_request(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                created_at=os.path.getmtime(resources_dir)
+            )
+            for resource_name, size in resources:
+                self.register_resource(
+                    resource_identifier=resource_identifier,
+                    requester_login=requester_login,
+                    resource_name=resource_name,
+                    size=size
+                )
+            requests_indexed += 1
+        return requests_indexed
+
+    @contextmanager
+    def __transaction(self) -> Iterator[None]:
+        with self.__lock:
+            self.__connection.execute("BEGIN")
+            try:
+                yield None
+            except Exception:
+                self.__connection.execute("ROLLBACK")
+                raise
+            self.__connection.execute("COMMIT")
+
+    def __get_resource_size(self,
+                            resource_identifier: str,
+                            requester_login: str,
+                            resource_name: str
+                            ) -> Optional[int]:
+        row = self.__connection.execute(
+            "SELECT size FROM resources WHERE resource_identifier = ? "
+            "AND requester_login = ? AND resource_name = ?",
+            (resource_identifier, requester_login, resource_name)
+        ).fetchone()
+        return row[0] if row is not None else None
+
+    def __update_usage(self,
+                       requester_login: str,
+                       bytes_delta: int = 0,
+                       resources_delta: int = 0,
+                       requests_delta: int = 0
+                       ) -> None:
+        self.__connection.execute(
+            "INSERT INTO login_usage (requester_login, stored_bytes, "
+            "resources_count, requests_count) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (requester_login) DO UPDATE SET "
+            "stored_bytes = stored_bytes + excluded.stored_bytes, "
+            "resources_count = resources_count + excluded.resources_count, "
+            "requests_count = requests_count + excluded.requests_count",
+            (requester_login, bytes_delta, resources_delta, requests_delta)
+        )
+
+    def __attach_resources_names(self,
+                                 indexed_resources: List[IndexedResource]
+                                 ) -> None:
+        if len(indexed_resources) == 0:
+            return None
+        by_key = {
+            (r.resource_identifier, r.requester_login): r
+            for r in indexed_resources
+        }
+        placeholders = ", ".join("?" for _ in indexed_resources)
+        rows = self.__connection.execute(
+            "SELECT resource_identifier, requester_login, resource_name "
+            "FROM resources "
+            f"WHERE resource_identifier IN ({placeholders}) "
+            "ORDER BY resource_name",
+            [r.resource_identifier for r in indexed_resources]
+        ).fetchall()
+        for resource_identifier, requester_login, resource_name in rows:
+            indexed_resource = by_key.get(
+                (resource_identifier, requester_login)
+            )
+            if indexed_resource is not None:
+                indexed_resource.resources.append(resource_name)
+
+    def __initialize_schema(self) -> None:
+        with self.__lock:
+            self.__connection.execute("PRAGMA journal_mode=WAL")
+            self.__connection.execute("PRAGMA synchronous=NORMAL")
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS requests ("
+                "resource_identifier TEXT NOT NULL, "
+                "requester_login TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "PRIMARY KEY (resource_identifier, requester_login))"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS requests_by_time ON requests "
+                "(created_at, resource_identifier, requester_login)"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS requests_by_login ON requests "
+                "(requester_login, created_at, resource_identifier)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS resources ("
+                "resource_identifier TEXT NOT NULL, "
+                "requester_login TEXT NOT NULL, "
+                "resource_name TEXT NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "PRIMARY KEY "
+                "(resource_identifier, requester_login, resource_name))"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS input_digests ("
+                "resource_identifier TEXT NOT NULL, "
+                "requester_login TEXT NOT NULL, "
+                "digest TEXT NOT NULL, "
+                "PRIMARY KEY (resource_identifier, requester_login))"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS input_digests_by_digest "
+                "ON input_digests (digest)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS objects ("
+                "digest TEXT PRIMARY KEY, "
+                "size INTEGER NOT NULL, "
+                "reference_count INTEGER NOT NULL)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS login_usage ("
+                "requester_login TEXT PRIMARY KEY, "
+                "stored_bytes INTEGER NOT NULL, "
+                "resources_count INTEGER NOT NULL, "
+                "requests_count INTEGER NOT NULL)"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS packed_resources ("
+                "resource_identifier TEXT NOT NULL, "
+                "requester_login TEXT NOT NULL, "
+                "resource_name TEXT NOT NULL, "
+                "pack_id INTEGER NOT NULL, "
+                "offset INTEGER NOT NULL, "
+                "size INTEGER NOT NULL, "
+                "PRIMARY KEY "
+                "(resource_identifier, requester_login, resource_name))"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS packed_requests ("
+                "resource_identifier TEXT NOT NULL, "
+                "requester_login TEXT NOT NULL, "
+                "PRIMARY KEY (resource_identifier, requester_login))"
+            )
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS packs ("
+                "pack_id INTEGER PRIMARY KEY, "
+                "size INTEGER NOT NULL)"
+            )
+            self.__connection.execute(
+                "CREATE INDEX IF NOT EXISTS packed_resources_by_pack "
+                "ON packed_resources (pack_id, offset)"
+            )
+            self.__backfill_login_usage()
+
+    def __backfill_login_usage(self) -> None:
+        row = self.__connection.execute(
+            "SELECT 1 FROM login_usage LIMIT 1"
+        ).fetchone()
+        if row is not None:
+            return None
+        self.__connection.execute(
+            "INSERT INTO login_usage (requester_login, stored_bytes, "
+            "resources_count, requests_count) "
+            "SELECT q.requester_login, COALESCE(r.stored_bytes, 0), "
+            "COALESCE(r.resources_count, 0), q.requests_count FROM "
+            "(SELECT requester_login, COUNT(*) AS requests_count "
+            "FROM requests GROUP BY requester_login) AS q LEFT JOIN "
+            "(SELECT requester_login, SUM(size) AS stored_bytes, "
+            "COUNT(*) AS resources_count "
+            "FROM resources GROUP BY requester_login) AS r "
+            "ON q.requester_login = r.requester_login"
+        )
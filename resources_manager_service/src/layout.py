@@ -0,0 +1,137 @@
+import os
+from typing import Iterable, Optional, Tuple
+
+RequestDirectory = Tuple[str, str, str]
+RESERVED_ENTRY_PREFIX = '_'
+
+
+class PersistenceLayout:
+
+    def __init__(self,
+                 persistence_dir: str,
+                 shard_levels: int,
+                 shard_width: int):
+        self.__persistence_dir = os.path.abspath(persistence_dir)
+        self.__shard_levels = shard_levels
+        self.__shard_width = shard_width
+
+    @property
+    def persistence_dir(self) -> str:
+        return self.__persistence_dir
+
+    def request_dir(self, resource_identifier: str) -> str:
+        return os.path.join(
+            self.__persistence_dir,
+            *self.__shards_of(resource_identifier=resource_identifier),
+            resource_identifier
+        )
+
+    def legacy_request_dir(self, resource_identifier: str) -> str:
+        return os.path.join(self.__persistence_dir, resource_identifier)
+
+    def resources_dir(self,
+                      resource_identifier: str,
+                      requester_login: str
+                      ) -> str:
+        sharded_dir = self.__sharded_resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if os.path.isdir(sharded_dir):
+            return sharded_dir
+        legacy_dir = self.__legacy_resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if os.path.isdir(legacy_dir):
+            return legacy_dir
+        return sharded_dir
+
+    def alternate_resources_dir(self,
+                                resource_identifier: str,
+                                requester_login: str,
+                                resources_dir: str
+                                ) -> Optional[str]:
+        sharded_dir = self.__sharded_resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if resources_dir != sharded_dir:
+            alternate_dir = sharded_dir
+        else:
+            alternate_dir = self.__legacy_resources_dir(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login
+            )
+        return alternate_dir if os.path.isdir(alternate_dir) else None
+
+    def is_legacy_entry(self, entry_name: str) -> bool:
+        return len(entry_name) > self.__shard_width and \
+            not entry_name.startswith(RESERVED_ENTRY_PREFIX)
+
+    def iterate_legacy_requests(self) -> Iterable[os.DirEntry]:
+        if not os.path.isdir(self.__persistence_dir):
+            return None
+        for entry in os.scandir(self.__persistence_dir):
+            if entry.is_dir() and self.is_legacy_entry(entry_name=entry.name):
+                yield entry
+
+    def iterate_requests_directories(self) -> Iterable[RequestDirectory]:
+        for request_entry in self.iterate_legacy_requests():
+            yield from self.__iterate_logins(request_entry=request_entry)
+        for request_entry in self.__iterate_sharded_requests(
+                directory=self.__persistence_dir,
+                level=0):
+            yield from self.__iterate_logins(request_entry=request_entry)
+
+    def __iterate_sharded_requests(self,
+                                   directory: str,
+                                   level: int
+                                   ) -> Iterable[os.DirEntry]:
+        for entry in os.scandir(directory):
+            if not entry.is_dir():
+                continue
+            if level == self.__shard_levels:
+                yield entry
+            elif self.__is_shard_entry(entry_name=entry.name):
+                yield from self.__iterate_sharded_requests(
+                    directory=entry.path,
+                    level=level + 1
+                )
+
+    def __iterate_logins(self,
+                         request_entry: os.DirEntry
+                         ) -> Iterable[RequestDirectory]:
+        for login_entry in os.scandir(request_entry.path):
+            if login_entry.is_dir():
+                yield request_entry.name, login_entry.name, login_entry.path
+
+    def __sharded_resources_dir(self,
+                                resource_identifier: str,
+                                requester_login: str
+                                ) -> str:
+        return os.path.join(
+            self.request_dir(resource_identifier=resource_identifier),
+            requester_login
+        )
+
+    def __legacy_resources_dir(self,
+                               resource_identifier: str,
+                               requester_login: str
+                               ) -> str:
+        return os.path.join(
+            self.legacy_request_dir(resource_identifier=resource_identifier),
+            requester_login
+        )
+
+    def __is_shard_entry(self, entry_name: str) -> bool:
+        return len(entry_name) == self.__shard_width and \
+            not entry_name.startswith(RESERVED_ENTRY_PREFIX)
+
+    def __shards_of(self, resource_identifier: str) -> Tuple[str, ...]:
+        return tuple(
+            resource_identifier[
+                level * self.__shard_width:(level + 1) * self.__shard_width
+            ]
+            for level in range(self.__shard_levels)
+        )
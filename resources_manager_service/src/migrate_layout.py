@@ -0,0 +1,96 @@
+import argparse
+import logging
+import os
+import time
+from itertools import islice
+from typing import Set
+
+from .config import PERSISTENCE_DIR, PERSISTENCE_SHARD_LEVELS, \
+    PERSISTENCE_SHARD_WIDTH
+from .layout import PersistenceLayout
+
+logging.getLogger().setLevel(logging.INFO)
+
+
+def migrate_layout(batch_size: int, pause: float) -> None:
+    layout = PersistenceLayout(
+        persistence_dir=PERSISTENCE_DIR,
+        shard_levels=PERSISTENCE_SHARD_LEVELS,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    migrated = 0
+    skipped: Set[str] = set()
+    while True:
+        pending_requests = (
+            request_entry
+            for request_entry in layout.iterate_legacy_requests()
+            if request_entry.name not in skipped
+        )
+        batch = list(islice(pending_requests, batch_size))
+        if len(batch) == 0:
+            break
+        for request_entry in batch:
+            try:
+                _migrate_request(layout=layout, request_entry=request_entry)
+                migrated += 1
+            except OSError as e:
+                logging.warning(f'Cannot migrate {request_entry.path}: {e}')
+                skipped.add(request_entry.name)
+        logging.info(f'Migrated {migrated} requests to sharded layout.')
+        time.sleep(pause)
+    logging.info(
+        f'Migration finished. {migrated} requests moved, '
+        f'{len(skipped)} skipped.'
+    )
+
+
+def _migrate_request(layout: PersistenceLayout,
+                     request_entry: os.DirEntry
+                     ) -> None:
+    target_dir = layout.request_dir(resource_identifier=request_entry.name)
+    os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+    if not os.path.exists(target_dir):
+        try:
+            os.rename(request_entry.path, target_dir)
+            return None
+        except FileNotFoundError:
+            return None
+        except OSError:
+            pass
+    _merge_directories(source_dir=request_entry.path, target_dir=target_dir)
+
+
+def _merge_directories(source_dir: str, target_dir: str) -> None:
+    os.makedirs(target_dir, exist_ok=True)
+    for entry in os.scandir(source_dir):
+        target_path = os.path.join(target_dir, entry.name)
+        try:
+            if entry.is_dir():
+                _merge_directories(
+                    source_dir=entry.path,
+                    target_dir=target_path
+                )
+            elif not os.path.exists(target_path):
+                os.replace(entry.path, target_path)
+            else:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            continue
+    try:
+        os.rmdir(source_dir)
+    except FileNotFoundError:
+        pass
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Moves requests directories into sharded layout.'
+    )
+    parser.add_argument('--batch_size', type=int, default=1000)
+    parser.add_argument('--pause', type=float, default=1.0)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    migrate_layout(batch_size=args.batch_size, pause=args.pause)
@@ -0,0 +1,127 @@
+from typing import List, Tuple, Union
+
+from werkzeug.http import parse_options_header
+
+PART_STARTED = 'part_started'
+PART_DATA = 'part_data'
+PART_FINISHED = 'part_finished'
+BODY_FINISHED = 'body_finished'
+
+MAX_PART_HEADERS_SIZE = 16 * 1024
+
+MultipartEvent = Tuple[str, Union[str, bytes, None]]
+
+_PREAMBLE = 'preamble'
+_DELIMITER = 'delimiter'
+_HEADERS = 'headers'
+_BODY = 'body'
+_EPILOGUE = 'epilogue'
+
+
+class MultipartParser:
+
+    def __init__(self, boundary: bytes):
+        self.__delimiter = b'\r\n--' + boundary
+        self.__buffer = b'\r\n'
+        self.__state = _PREAMBLE
+
+    @property
+    def finished(self) -> bool:
+        return self.__state == _EPILOGUE
+
+    def feed(self, chunk: bytes) -> List[MultipartEvent]:
+        self.__buffer += chunk
+        events = []
+        while self.__advance(events=events):
+            pass
+        return events
+
+    def __advance(self, events: List[MultipartEvent]) -> bool:
+        if self.__state == _PREAMBLE:
+            return self.__skip_preamble()
+        if self.__state == _DELIMITER:
+            return self.__read_delimiter_tail(events=events)
+        if self.__state == _HEADERS:
+            return self.__read_headers(events=events)
+        if self.__state == _BODY:
+            return self.__read_body(events=events)
+        self.__buffer = b''
+        return False
+
+    def __skip_preamble(self) -> bool:
+        position = self.__buffer.find(self.__delimiter)
+        if position < 0:
+            self.__buffer = self.__buffer[-len(self.__delimiter):]
+            return False
+        self.__buffer = self.__buffer[position + len(self.__delimiter):]
+        self.__state = _DELIMITER
+        return True
+
+    def __read_delimiter_tail(self, events: List[MultipartEvent]) -> bool:
+        if len(self.__buffer) < 2:
+            return False
+        if self.__buffer.startswith(b'--'):
+            events.append((BODY_FINISHED, None))
+            self.__state = _EPILOGUE
+            return True
+        position = self.__buffer.find(b'\r\n')
+        if position < 0:
+            self.__check_headers_size()
+            return False
+        if self.__buffer[:position].strip(b' \t') != b'':
+            raise ValueError('Malformed multipart delimiter.')
+        self.__buffer = self.__buffer[position + 2:]
+        self.__state = _HEADERS
+        return True
+
+    def __read_headers(self, events: List[MultipartEvent]) -> bool:
+        if self.__buffer.startswith(b'\r\n'):
+            raw_headers, position = b'', 0
+        else:
+            position = self.__buffer.find(b'\r\n\r\n')
+            if position < 0:
+                self.__check_headers_size()
+                return False
+            raw_headers, position = self.__buffer[:position], position + 2
+        self.__buffer = self.__buffer[position + 2:]
+        events.append((PART_STARTED, _parse_part_name(raw_headers)))
+        self.__state = _BODY
+        return True
+
+    def __read_body(self, events: List[MultipartEvent]) -> bool:
+        position = self.__buffer.find(self.__delimiter)
+        if position < 0:
+            safe_length = len(self.__buffer) - len(self.__delimiter) + 1
+            if safe_length > 0:
+                events.append((PART_DATA, self.__buffer[:safe_length]))
+                self.__buffer = self.__buffer[safe_length:]
+            return False
+        if position > 0:
+            events.append((PART_DATA, self.__buffer[:position]))
+        events.append((PART_FINISHED, None))
+        self.__buffer = self.__buffer[position + len(self.__delimiter):]
+        self.__state = _DELIMITER
+        return True
+
+    def __check_headers_size(self) -> None:
+        if len(self.__buffer) > MAX_PART_HEADERS_SIZE:
+            raise ValueError('Multipart part headers are too large.')
+
+
+def parse_boundary(content_type: str) -> bytes:
+    mimetype, options = parse_options_header(content_type)
+    boundary = options.get('boundary')
+    if mimetype != 'multipart/form-data' or not boundary:
+        raise ValueError('Request body is not multipart/form-data.')
+    return boundary.encode('latin-1')
+
+
+def _parse_part_name(raw_headers: bytes) -> str:
+    for line in raw_headers.decode('latin-1').split('\r\n'):
+        name, _, value = line.partition(':')
+        if name.strip().lower() != 'content-disposition':
+            continue
+        _, options = parse_options_header(value.strip())
+        if 'name' in options:
+            return options['name']
+    raise ValueError('Multipart part has no form field name.')
@@ -0,0 +1,34 @@
+from threading import Lock, Event
+from typing import Dict, Optional, Set, Tuple
+
+RequestKey = Tuple[str, str]
+
+
+class ResultsNotifier:
+
+    def __init__(self):
+        self.__lock = Lock()
+        self.__waiters: Dict[RequestKey, Set[Event]] = {}
+
+    def subscribe(self, key: RequestKey, event: Optional[Event] = None
+                  ) -> Event:
+        if event is None:
+            event = Event()
+        with self.__lock:
+            self.__waiters.setdefault(key, set()).add(event)
+        return event
+
+    def unsubscribe(self, key: RequestKey, event: Event) -> None:
+        with self.__lock:
+            waiters = self.__waiters.get(key)
+            if waiters is None:
+                return None
+            waiters.discard(event)
+            if len(waiters) == 0:
+                del self.__waiters[key]
+
+    def notify(self, key: RequestKey) -> None:
+        with self.__lock:
+            waiters = list(self.__waiters.get(key, ()))
+        for event in waiters:
+            event.set()
@@ -0,0 +1,337 @@
+import logging
+import mmap
+import os
+import shutil
+import time
+from threading import Thread, Lock
+from typing import Dict, List, Optional, Set, Tuple
+
+from .content_store import ContentAddressedStore
+from .derivatives import derivatives_dir
+from .index import ResourcesIndex, PackedEntry, PackLocation
+from .layout import PersistenceLayout
+
+PACK_FILE_EXTENSION = '.pack'
+
+PackedContent = Tuple[str, bytes]
+
+
+class PackStore:
+
+    def __init__(self,
+                 packs_dir: str,
+                 resources_index: ResourcesIndex,
+                 max_pack_bytes: int):
+        self.__packs_dir = os.path.abspath(packs_dir)
+        self.__resources_index = resources_index
+        self.__max_pack_bytes = max_pack_bytes
+        self.__write_lock = Lock()
+        self.__maps_lock = Lock()
+        self.__maps: Dict[int, mmap.mmap] = {}
+        os.makedirs(self.__packs_dir, exist_ok=True)
+        self.__active_pack_id = self.__register_existing_packs()
+
+    def append(self,
+               resource_identifier: str,
+               requester_login: str,
+               resources: List[PackedContent]
+               ) -> None:
+        with self.__write_lock:
+            packed_entries = self.__write_entries(resources=resources)
+            self.__resources_index.register_packed_resources(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                packed_entries=packed_entries
+            )
+
+    def read(self,
+             resource_identifier: str,
+             requester_login: str,
+             resource_name: str
+             ) -> Optional[bytes]:
+        for _ in range(2):
+            location = self.__resources_index.get_pack_location(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resource_name=resource_name
+            )
+            if location is None:
+                return None
+            try:
+                return self.__read_location(location=location)
+            except FileNotFoundError:
+                continue
+        return None
+
+    def read_first(self,
+                   resource_identifier: str,
+                   requester_login: str,
+                   resources_names: List[str]
+                   ) -> Optional[PackedContent]:
+        for resource_name in resources_names:
+            content = self.read(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resource_name=resource_name
+            )
+            if content is not None:
+                return resource_name, content
+        return None
+
+    def is_packed(self, resource_identifier: str, requester_login: str
+                  ) -> bool:
+        return self.__resources_index.is_request_packed(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+
+    def remove(self,
+               resource_identifier: str,
+               requester_login: str,
+               resource_name: str
+               ) -> bool:
+        location = self.__resources_index.get_pack_location(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resource_name=resource_name
+        )
+        removed = self.__resources_index.remove_packed_resource(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resource_name=resource_name
+        )
+        if removed and location is not None:
+            pack_id, _, _ = location
+            with self.__write_lock:
+                self.__delete_pack_if_empty(pack_id=pack_id)
+        return removed
+
+    def compact(self, min_live_ratio: float) -> int:
+        packs_reclaimed = 0
+        for pack_id, size in self.__resources_index.list_packs():
+            with self.__write_lock:
+                if pack_id == self.__active_pack_id:
+                    continue
+                if self.__delete_pack_if_empty(pack_id=pack_id):
+                    packs_reclaimed += 1
+                    continue
+                live_bytes = self.__resources_index.get_pack_live_bytes(
+                    pack_id=pack_id
+                )
+                if live_bytes < size * min_live_ratio:
+                    self.__rewrite_pack(pack_id=pack_id)
+                    packs_reclaimed += 1
+        return packs_reclaimed
+
+    def __write_entries(self, resources: List[PackedContent]
+                        ) -> List[PackedEntry]:
+        pack_path = self.__pack_path(pack_id=self.__active_pack_id)
+        offset = os.path.getsize(pack_path) \
+            if os.path.exists(pack_path) else 0
+        if offset >= self.__max_pack_bytes:
+            self.__active_pack_id += 1
+            pack_path = self.__pack_path(pack_id=self.__active_pack_id)
+            offset = 0
+        packed_entries = []
+        with open(pack_path, "ab") as f:
+            for resource_name, content in resources:
+                f.write(content)
+                packed_entries.append(
+                    (resource_name, self.__active_pack_id, offset,
+                     len(content))
+                )
+                offset += len(content)
+            f.flush()
+            os.fsync(f.fileno())
+        self.__resources_index.update_pack_size(
+            pack_id=self.__active_pack_id,
+            size=offset
+        )
+        return packed_entries
+
+    def __rewrite_pack(self, pack_id: int) -> None:
+        pack_members = self.__resources_index.find_pack_members(
+            pack_id=pack_id
+        )
+        contents = []
+        for pack_member in pack_members:
+            _, _, resource_name, offset, size = pack_member
+            contents.append((
+                resource_name,
+                self.__read_location(location=(pack_id, offset, size))
+            ))
+        packed_entries = self.__write_entries(resources=contents)
+        for pack_member, packed_entry in zip(pack_members, packed_entries):
+            _, target_pack_id, target_offset, _ = packed_entry
+            self.__resources_index.relocate_packed_resource(
+                pack_member=pack_member,
+                source_pack_id=pack_id,
+                target_pack_id=target_pack_id,
+                target_offset=target_offset
+            )
+        self.__delete_pack(pack_id=pack_id)
+
+    def __delete_pack_if_empty(self, pack_id: int) -> bool:
+        if pack_id == self.__active_pack_id:
+            return False
+        live_bytes = self.__resources_index.get_pack_live_bytes(
+            pack_id=pack_id
+        )
+        if live_bytes > 0:
+            return False
+        self.__delete_pack(pack_id=pack_id)
+        return True
+
+    def __delete_pack(self, pack_id: int) -> None:
+        with self.__maps_lock:
+            pack_map = self.__maps.pop(pack_id, None)
+            if pack_map is not None:
+                pack_map.close()
+        try:
+            os.remove(self.__pack_path(pack_id=pack_id))
+        except FileNotFoundError:
+            pass
+        self.__resources_index.remove_pack(pack_id=pack_id)
+
+    def __read_location(self, location: PackLocation) -> bytes:
+        pack_id, offset, size = location
+        if size == 0:
+            return b''
+        with self.__maps_lock:
+            pack_map = self.__map_pack(
+                pack_id=pack_id,
+                required_size=offset + size
+            )
+            return pack_map[offset:offset + size]
+
+    def __map_pack(self, pack_id: int, required_size: int) -> mmap.mmap:
+        pack_map = self.__maps.get(pack_id)
+        if pack_map is not None and len(pack_map) >= required_size:
+            return pack_map
+        if pack_map is not None:
+            pack_map.close()
+        with open(self.__pack_path(pack_id=pack_id), "rb") as f:
+            pack_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.__maps[pack_id] = pack_map
+        return pack_map
+
+    def __register_existing_packs(self) -> int:
+        packs_ids = []
+        for entry in os.scandir(self.__packs_dir):
+            if not entry.name.endswith(PACK_FILE_EXTENSION):
+                continue
+            pack_id = int(entry.name[:-len(PACK_FILE_EXTENSION)])
+            self.__resources_index.update_pack_size(
+                pack_id=pack_id,
+                size=entry.stat().st_size
+            )
+            packs_ids.append(pack_id)
+        return max(packs_ids, default=0)
+
+    def __pack_path(self, pack_id: int) -> str:
+        return os.path.join(
+            self.__packs_dir, f'{pack_id:08d}{PACK_FILE_EXTENSION}'
+        )
+
+
+class ColdTierCompactor(Thread):
+
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 resources_index: ResourcesIndex,
+                 content_store: ContentAddressedStore,
+                 pack_store: PackStore,
+                 input_images_names: Set[str],
+                 completion_marker: str,
+                 cold_age: float,
+                 compaction_interval: float,
+                 batch_size: int,
+                 min_live_ratio: float):
+        super().__init__(daemon=True)
+        self.__layout = layout
+        self.__resources_index = resources_index
+        self.__content_store = content_store
+        self.__pack_store = pack_store
+        self.__input_images_names = input_images_names
+        self.__completion_marker = completion_marker
+        self.__cold_age = cold_age
+        self.__compaction_interval = compaction_interval
+        self.__batch_size = batch_size
+        self.__min_live_ratio = min_live_ratio
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.compact()
+            except Exception as e:
+                logging.error(f'Cold tier compaction failed: {e}')
+            time.sleep(self.__compaction_interval)
+
+    def compact(self) -> int:
+        requests_packed = 0
+        while True:
+            cold_requests = self.__resources_index.find_cold_requests(
+                created_before=time.time() - self.__cold_age,
+                completion_marker=self.__completion_marker,
+                limit=self.__batch_size
+            )
+            for resource_identifier, requester_login in cold_requests:
+                self.pack_request(
+                    resource_identifier=resource_identifier,
+                    requester_login=requester_login
+                )
+            requests_packed += len(cold_requests)
+            if len(cold_requests) < self.__batch_size:
+                break
+        self.__pack_store.compact(min_live_ratio=self.__min_live_ratio)
+        return requests_packed
+
+    def pack_request(self,
+                     resource_identifier: str,
+                     requester_login: str
+                     ) -> None:
+        resources_dir = self.__layout.resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        resources = []
+        if os.path.isdir(resources_dir):
+            for entry in os.scandir(resources_dir):
+                if entry.is_file():
+                    with open(entry.path, "rb") as f:
+                        resources.append((entry.name, f.read()))
+        self.__pack_store.append(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources=resources
+        )
+        for resource_name, _ in resources:
+            os.remove(os.path.join(resources_dir, resource_name))
+            if resource_name in self.__input_images_names:
+                self.__release_input_object(
+                    resource_identifier=resource_identifier,
+                    requester_login=requester_login
+                )
+        self.__remove_empty_directories(resources_dir=resources_dir)
+
+    def __release_input_object(self,
+                               resource_identifier: str,
+                               requester_login: str
+                               ) -> None:
+        digest = self.__resources_index.get_input_digest(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if digest is not None:
+            self.__content_store.release(digest=digest)
+
+    def __remove_empty_directories(self, resources_dir: str) -> None:
+        shutil.rmtree(
+            derivatives_dir(resources_dir=resources_dir),
+            ignore_errors=True
+        )
+        try:
+            os.rmdir(resources_dir)
+            os.rmdir(os.path.dirname(resources_dir))
+        except OSError:
+            pass
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass, replace
+from typing import Optional
+
+from .index import ResourcePosition
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class BatchQuery:
+    range_start: float
+    range_end: float
+    requester_login: Optional[str] = None
+    start_after: Optional[ResourcePosition] = None
+
+    def advance(self, start_after: ResourcePosition) -> BatchQuery:
+        return replace(self, start_after=tuple(start_after))
+
+    def to_cursor(self) -> str:
+        serialized = json.dumps({
+            'range_start': self.range_start,
+            'range_end': self.range_end,
+            'requester_login': self.requester_login,
+            'start_after': self.start_after
+        }).encode('utf-8')
+        return base64.urlsafe_b64encode(serialized).decode('ascii')
+
+    @classmethod
+    def from_cursor(cls, cursor: str) -> BatchQuery:
+        try:
+            serialized = base64.urlsafe_b64decode(cursor.encode('ascii'))
+            content = json.loads(serialized)
+            start_after = content['start_after']
+            return cls(
+                range_start=float(content['range_start']),
+                range_end=float(content['range_end']),
+                requester_login=content['requester_login'],
+                start_after=tuple(start_after) if start_after else None
+            )
+        except (binascii.Error, ValueError, KeyError, TypeError) as e:
+            raise InvalidCursor(f'Cursor cannot be decoded: {e}')
@@ -0,0 +1,33 @@
+from typing import Optional
+
+from .index import ResourcesIndex
+
+
+class StorageQuota:
+
+    def __init__(self,
+                 resources_index: ResourcesIndex,
+                 max_bytes: Optional[int],
+                 max_requests: Optional[int]):
+        self.__resources_index = resources_index
+        self.__max_bytes = max_bytes
+        self.__max_requests = max_requests
+
+    @property
+    def limits(self) -> dict:
+        return {
+            "max_bytes": self.__max_bytes,
+            "max_requests": self.__max_requests
+        }
+
+    def admits(self, requester_login: str, incoming_bytes: int) -> bool:
+        if self.__max_bytes is None and self.__max_requests is None:
+            return True
+        usage = self.__resources_index.get_login_usage(
+            requester_login=requester_login
+        )
+        if self.__max_requests is not None and \
+                usage.requests_count + 1 > self.__max_requests:
+            return False
+        return self.__max_bytes is None or \
+            usage.stored_bytes + incoming_bytes <= self.__max_bytes
@@ -0,0 +1,249 @@
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Dict, List
+
+import requests
+from pipeline_sdk.routing import HashRing
+from pipeline_sdk.utils import compose_relative_resource_url
+
+from .cache import ResultsCache
+from .config import INDEX_DB_PATH, PERSISTENCE_DIR, PERSISTENCE_SHARD_LEVELS, \
+    PERSISTENCE_SHARD_WIDTH, CONTENT_STORE_DIR, INPUT_IMAGE_NAMES, \
+    API_VERSION, SERVICE_NAME, SERVICE_SECRET, SERVER_IDENTITY_URL, \
+    DISCOVERY_URL, RESOURCES_MANAGER_NODES, REBALANCE_BATCH_SIZE, \
+    RESULTS_STORAGE_ENGINE, RESULTS_DB_PATH, RESULTS_DB_COMMIT_BATCH_SIZE, \
+    RESULTS_ENCODING, RESULTS_COMPRESSION, PACKS_DIR, PACK_MAX_BYTES
+from .content_store import ContentAddressedStore
+from .index import ResourcesIndex, IndexedResource
+from .layout import PersistenceLayout
+from .packs import PackStore
+from .results_codec import ResultsCodec
+from .results_store import ResultsStore, create_results_store
+from .retention import ResourcesEvictor
+
+logging.getLogger().setLevel(logging.INFO)
+
+
+def rebalance(batch_size: int, pause: float) -> None:
+    inter_services_token = _fetch_inter_services_token()
+    ring = HashRing(nodes=RESOURCES_MANAGER_NODES)
+    nodes_urls = _fetch_nodes_urls(inter_services_token=inter_services_token)
+    unknown_nodes = set(ring.nodes) - set(nodes_urls) - {SERVICE_NAME}
+    if len(unknown_nodes) > 0:
+        raise RuntimeError(
+            f'Discovery service does not know nodes: {sorted(unknown_nodes)}.'
+        )
+    layout = PersistenceLayout(
+        persistence_dir=PERSISTENCE_DIR,
+        shard_levels=PERSISTENCE_SHARD_LEVELS,
+        shard_width=PERSISTENCE_SHARD_WIDTH
+    )
+    resources_index = ResourcesIndex(db_path=INDEX_DB_PATH)
+    pack_store = PackStore(
+        packs_dir=PACKS_DIR,
+        resources_index=resources_index,
+        max_pack_bytes=PACK_MAX_BYTES
+    )
+    results_codec = ResultsCodec(
+        encoding=RESULTS_ENCODING,
+        compression=RESULTS_COMPRESSION
+    )
+    results_store = create_results_store(
+        engine=RESULTS_STORAGE_ENGINE,
+        layout=layout,
+        db_path=RESULTS_DB_PATH,
+        commit_batch_size=RESULTS_DB_COMMIT_BATCH_SIZE,
+        codec=results_codec,
+        pack_store=pack_store
+    )
+    resources_evictor = ResourcesEvictor(
+        layout=layout,
+        resources_index=resources_index,
+        content_store=ContentAddressedStore(
+            objects_dir=CONTENT_STORE_DIR,
+            resources_index=resources_index,
+            shard_width=PERSISTENCE_SHARD_WIDTH
+        ),
+        results_store=results_store,
+        results_cache=ResultsCache(max_bytes=0, negative_ttl=0.0),
+        input_images_names=set(INPUT_IMAGE_NAMES.values()),
+        pack_store=pack_store
+    )
+    moved = 0
+    indexed_resources = resources_index.iterate_resources(
+        range_start=0.0,
+        range_end=float('inf'),
+        page_size=batch_size
+    )
+    for indexed_resource in indexed_resources:
+        owner = ring.node_for(key=indexed_resource.resource_identifier)
+        if owner == SERVICE_NAME:
+            continue
+        _move_request(
+            layout=layout,
+            results_store=results_store,
+            pack_store=pack_store,
+            indexed_resource=indexed_resource,
+            target_node=owner,
+            target_url=nodes_urls[owner],
+            inter_services_token=inter_services_token
+        )
+        resources_evictor.evict_request(
+            resource_identifier=indexed_resource.resource_identifier,
+            requester_login=indexed_resource.requester_login
+        )
+        moved += 1
+        if moved % batch_size == 0:
+            logging.info(f'Moved {moved} requests to their owning nodes.')
+            time.sleep(pause)
+    logging.info(f'Rebalance finished. {moved} requests moved.')
+
+
+def _move_request(layout: PersistenceLayout,
+                  results_store: ResultsStore,
+                  pack_store: PackStore,
+                  indexed_resource: IndexedResource,
+                  target_node: str,
+                  target_url: str,
+                  inter_services_token: str
+                  ) -> None:
+    resources_dir = layout.resources_dir(
+        resource_identifier=indexed_resource.resource_identifier,
+        requester_login=indexed_resource.requester_login
+    )
+    headers = {'Authorization': f'Bearer {inter_services_token}'}
+    input_images_names = set(INPUT_IMAGE_NAMES.values())
+    input_image_name = next(
+        (r for r in indexed_resource.resources if r in input_images_names),
+        None
+    )
+    if input_image_name is not None:
+        payload = {
+            'login': indexed_resource.requester_login,
+            'resource_identifier': indexed_resource.resource_identifier,
+            'created_at': indexed_resource.created_at
+        }
+        url = _node_resource_url(
+            target_node=target_node,
+            target_url=target_url,
+            path_postfix='register_input_image'
+        )
+        input_image = _read_input_image(
+            resources_dir=resources_dir,
+            input_image_name=input_image_name,
+            pack_store=pack_store,
+            indexed_resource=indexed_resource
+        )
+        response = requests.post(
+            url, params={'login': indexed_resource.requester_login},
+            files={'image': (input_image_name, input_image)},
+            data=payload, headers=headers, verify=False
+        )
+        if response.status_code not in {200, 409}:
+            raise RuntimeError(
+                f'Could not move {indexed_resource.resource_identifier}.'
+            )
+    results_types = [
+        os.path.splitext(resource_name)[0]
+        for resource_name in indexed_resource.resources
+        if resource_name not in input_images_names
+    ]
+    stored_results = results_store.load(
+        resource_identifier=indexed_resource.resource_identifier,
+        requester_login=indexed_resource.requester_login,
+        resources_types=results_types
+    )
+    for result_type, (content, _) in stored_results.items():
+        payload = {
+            'requester_login': indexed_resource.requester_login,
+            'resource_identifier': indexed_resource.resource_identifier,
+            'result_type': result_type
+        }
+        url = _node_resource_url(
+            target_node=target_node,
+            target_url=target_url,
+            path_postfix='register_intermediate_result'
+        )
+        files = {'resource_content': json.dumps(content)}
+        response = requests.post(
+            url, files=files, data=payload, headers=headers, verify=False
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                f'Could not move {indexed_resource.resource_identifier}.'
+            )
+
+
+def _node_resource_url(target_node: str,
+                       target_url: str,
+                       path_postfix: str
+                       ) -> str:
+    relative_resource_url = compose_relative_resource_url(
+        service_name=target_node,
+        service_version=API_VERSION,
+        path_postfix=path_postfix
+    )
+    return f'{target_url}{relative_resource_url}'
+
+
+def _read_input_image(resources_dir: str,
+                      input_image_name: str,
+                      pack_store: PackStore,
+                      indexed_resource: IndexedResource
+                      ) -> bytes:
+    input_image_path = os.path.join(resources_dir, input_image_name)
+    if os.path.isfile(input_image_path):
+        with open(input_image_path, 'rb') as f:
+            return f.read()
+    input_image = pack_store.read(
+        resource_identifier=indexed_resource.resource_identifier,
+        requester_login=indexed_resource.requester_login,
+        resource_name=input_image_name
+    )
+    if input_image is None:
+        raise RuntimeError(
+            f'Could not read input of {indexed_resource.resource_identifier}.'
+        )
+    return input_image
+
+
+def _fetch_inter_services_token() -> str:
+    payload = {'service_name': SERVICE_NAME, 'password': SERVICE_SECRET}
+    response = requests.get(
+        SERVER_IDENTITY_URL, json=payload, verify=False
+    )
+    if response.status_code != 200:
+        raise RuntimeError('Cannot obtain inter services token.')
+    return response.json()['service_access_token']
+
+
+def _fetch_nodes_urls(inter_services_token: str) -> Dict[str, str]:
+    headers = {'Authorization': f'Bearer {inter_services_token}'}
+    payload = {'service_names': RESOURCES_MANAGER_NODES}
+    response = requests.get(
+        DISCOVERY_URL, headers=headers, json=payload, verify=False
+    )
+    if response.status_code != 200:
+        raise RuntimeError('Cannot get proper response from discovery service.')
+    services_found: List[dict] = response.json().get('services_found', [])
+    return {
+        s['service_name']: f"{s['service_address']}:{s['service_port']}"
+        for s in services_found
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description='Moves requests not owned by this node to their owners.'
+    )
+    parser.add_argument('--batch_size', type=int, default=REBALANCE_BATCH_SIZE)
+    parser.add_argument('--pause', type=float, default=1.0)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = _parse_args()
+    rebalance(batch_size=args.batch_size, pause=args.pause)
@@ -0,0 +1,264 @@
+import hashlib
+import os
+from typing import IO, List, Optional, Tuple
+
+from .config import INPUT_IMAGE_NAME, INPUT_IMAGE_NAMES, INPUT_PASS_THROUGH, \
+    UPLOAD_CHUNK_SIZE, MAX_IMAGE_HEADER_SIZE, REUSABLE_RESULTS, \
+    REUSE_COMPLETION_MARKER
+from .content_store import ContentAddressedStore, ContentWriter
+from .images import read_image_header, sniff_image_header, iterate_stream, \
+    transcode_to_jpeg
+from .index import ResourcesIndex
+from .layout import PersistenceLayout
+from .quotas import StorageQuota
+from .results_store import ResultsStore, result_resource_name
+from .staging import InputStagingArea, StagedInput
+
+PersistedInput = Tuple[str, str]
+
+
+class InputRegistrar:
+
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 resources_index: ResourcesIndex,
+                 content_store: ContentAddressedStore,
+                 results_store: ResultsStore,
+                 input_staging: Optional[InputStagingArea],
+                 storage_quota: StorageQuota):
+        self.__layout = layout
+        self.__resources_index = resources_index
+        self.__content_store = content_store
+        self.__results_store = results_store
+        self.__input_staging = input_staging
+        self.__storage_quota = storage_quota
+
+    @property
+    def stages_inputs(self) -> bool:
+        return self.__input_staging is not None
+
+    def admits(self, requester_login: str, incoming_bytes: int) -> bool:
+        return self.__storage_quota.admits(
+            requester_login=requester_login,
+            incoming_bytes=incoming_bytes
+        )
+
+    def is_registered(self, resource_identifier: str) -> bool:
+        registered_position = self.__resources_index.get_position(
+            resource_identifier=resource_identifier
+        )
+        return registered_position is not None
+
+    def resources_dir(self, resource_identifier: str, requester_login: str
+                      ) -> str:
+        return os.path.join(
+            self.__layout.request_dir(resource_identifier=resource_identifier),
+            requester_login
+        )
+
+    def pass_through_name(self, header: bytes, transcode: bool
+                          ) -> Optional[str]:
+        image_header = sniff_image_header(header=header)
+        if transcode or not INPUT_PASS_THROUGH or image_header is None:
+            return None
+        return INPUT_IMAGE_NAMES[image_header.image_format]
+
+    def open_writer(self) -> ContentWriter:
+        return self.__content_store.open_writer()
+
+    def commit(self,
+               writer: ContentWriter,
+               resources_dir: str,
+               input_image_name: str
+               ) -> PersistedInput:
+        digest = self.__content_store.commit(
+            writer=writer,
+            target_path=os.path.join(resources_dir, input_image_name)
+        )
+        return input_image_name, digest
+
+    def persist_stream(self,
+                       resources_dir: str,
+                       stream: IO[bytes],
+                       transcode: bool
+                       ) -> Optional[PersistedInput]:
+        header = read_image_header(
+            stream=stream,
+            chunk_size=UPLOAD_CHUNK_SIZE,
+            max_header_size=MAX_IMAGE_HEADER_SIZE
+        )
+        input_image_name = self.pass_through_name(
+            header=header,
+            transcode=transcode
+        )
+        if input_image_name is None:
+            return self.__transcode_input_image(
+                resources_dir=resources_dir,
+                raw_image=header + stream.read()
+            )
+        digest = self.__content_store.persist(
+            chunks=iterate_stream(
+                stream=stream,
+                head=header,
+                chunk_size=UPLOAD_CHUNK_SIZE
+            ),
+            target_path=os.path.join(resources_dir, input_image_name)
+        )
+        return input_image_name, digest
+
+    def persist_buffered(self,
+                         resource_identifier: str,
+                         requester_login: str,
+                         resources_dir: str,
+                         raw_image: bytes,
+                         transcode: bool
+                         ) -> Optional[PersistedInput]:
+        if self.__input_staging is not None:
+            return self.__stage_input_image(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                raw_image=raw_image,
+                transcode=transcode
+            )
+        input_image_name = self.pass_through_name(
+            header=raw_image,
+            transcode=transcode
+        )
+        if input_image_name is None:
+            return self.__transcode_input_image(
+                resources_dir=resources_dir,
+                raw_image=raw_image
+            )
+        digest = self.__content_store.persist(
+            chunks=[raw_image],
+            target_path=os.path.join(resources_dir, input_image_name)
+        )
+        return input_image_name, digest
+
+    def complete(self,
+                 resource_identifier: str,
+                 requester_login: str,
+                 resources_dir: str,
+                 persisted_input: PersistedInput,
+                 created_at: Optional[float] = None
+                 ) -> dict:
+        input_image_name, digest = persisted_input
+        self.__resources_index.register_request(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            created_at=created_at
+        )
+        if self.__input_staging is None:
+            self.__register_input_image(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                input_image_name=input_image_name,
+                digest=digest
+            )
+        reused_results = self.__reuse_results(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            digest=digest
+        )
+        return {
+            "requester_login": requester_login,
+            "request_identifier": resource_identifier,
+            "reused_results": reused_results
+        }
+
+    def __transcode_input_image(self,
+                                resources_dir: str,
+                                raw_image: bytes
+                                ) -> Optional[PersistedInput]:
+        encoded_image = transcode_to_jpeg(raw_image=raw_image)
+        if encoded_image is None:
+            return None
+        digest = self.__content_store.persist(
+            chunks=[encoded_image],
+            target_path=os.path.join(resources_dir, INPUT_IMAGE_NAME)
+        )
+        return INPUT_IMAGE_NAME, digest
+
+    def __stage_input_image(self,
+                            resource_identifier: str,
+                            requester_login: str,
+                            resources_dir: str,
+                            raw_image: bytes,
+                            transcode: bool
+                            ) -> Optional[PersistedInput]:
+        input_image_name = self.pass_through_name(
+            header=raw_image,
+            transcode=transcode
+        )
+        if input_image_name is None:
+            input_image_name = INPUT_IMAGE_NAME
+            content = transcode_to_jpeg(raw_image=raw_image)
+            if content is None:
+                return None
+        else:
+            content = raw_image
+        os.makedirs(resources_dir, exist_ok=True)
+        self.__input_staging.stage(
+            staged_input=StagedInput(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                input_image_name=input_image_name,
+                content=content
+            )
+        )
+        return input_image_name, hashlib.sha256(content).hexdigest()
+
+    def __register_input_image(self,
+                               resource_identifier: str,
+                               requester_login: str,
+                               resources_dir: str,
+                               input_image_name: str,
+                               digest: str
+                               ) -> None:
+        self.__resources_index.register_resource(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resource_name=input_image_name,
+            size=os.path.getsize(os.path.join(resources_dir, input_image_name))
+        )
+        self.__resources_index.register_input_digest(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            digest=digest
+        )
+
+    def __reuse_results(self,
+                        resource_identifier: str,
+                        requester_login: str,
+                        digest: str
+                        ) -> List[str]:
+        completed_request = self.__resources_index.find_request_by_input_digest(
+            digest=digest,
+            requester_login=requester_login,
+            required_resource=result_resource_name(
+                result_type=REUSE_COMPLETION_MARKER
+            ),
+            excluded_identifier=resource_identifier
+        )
+        if completed_request is None:
+            return []
+        source_identifier, source_login = completed_request
+        reused_results = []
+        for result_type in REUSABLE_RESULTS:
+            size = self.__results_store.copy(
+                source_key=(source_identifier, source_login, result_type),
+                target_key=(resource_identifier, requester_login, result_type)
+            )
+            if size is None:
+                continue
+            self.__resources_index.register_resource(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resource_name=result_resource_name(result_type=result_type),
+                size=size
+            )
+            reused_results.append(result_type)
+        return reused_results
@@ -1,73 +1,178 @@
-import io
 import json
+import mimetypes
 import os
 import time
 from datetime import datetime
-from functools import reduce, partial
-from glob import glob
-from typing import List, Union, Dict, Optional, Tuple
-from uuid import uuid4
-
-import numpy as np
-import cv2
-from flask import Response, request, make_response, send_from_directory
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from threading import Event
+from typing import List, Optional, Iterator, Tuple
+from uuid import uuid4, UUID
+
+from flask import Response, request, make_response, send_from_directory, \
+    stream_with_context
 from flask_jwt_extended import jwt_required
-from flask_restful import Resource, reqparse
+from flask_restful import Resource, reqparse, inputs
+from werkzeug.exceptions import NotFound
 
-from .config import PERSISTENCE_DIR, INPUT_IMAGE_NAME, DATE_TIME_FORMAT
+from .config import DATE_TIME_FORMAT, BATCH_FETCH_MAX_PAGE_SIZE, \
+    BATCH_FETCH_DEFAULT_PAGE_SIZE, BATCH_STREAM_PAGE_SIZE, INPUT_IMAGE_NAMES, \
+    BULK_FETCH_MAX_REQUESTS, WAIT_MAX_TIMEOUT, WAIT_DEFAULT_TIMEOUT, \
+    WAIT_POLL_INTERVAL, DEFAULT_DERIVATIVE_FORMAT
+from .analytics import AnalyticsAggregates
+from .cache import ResultsCache
+from .derivatives import DerivativesCache
+from .images import transform_image, ImageTransform, BoundingBox, \
+    ENCODING_EXTENSIONS
+from .index import ResourcesIndex
+from .layout import PersistenceLayout
+from .notifications import ResultsNotifier, RequestKey
+from .export import RequestsExporter, EXPORT_MIMETYPES, TAR_FORMAT
+from .packs import PackStore, PackedContent
+from .pagination import BatchQuery, InvalidCursor
+from .quotas import StorageQuota
+from .registration import InputRegistrar
+from .results import IntermediateResultsLoader
+from .results_codec import ResultsCodec, BINARY_RESULTS_MIMETYPE
+from .results_store import ResultsStore, result_resource_name
+from .retention import RetentionSweeper
+from .staging import InputStagingArea
 
-RawResourceDescription = Tuple[str, List[str]]
-ResourceDescription = Dict[str, Union[str, List[str]]]
-ResourcesDescription = List[ResourceDescription]
 
+def find_input_image_name(resources_dir: str) -> Optional[str]:
+    for input_image_name in INPUT_IMAGE_NAMES.values():
+        if os.path.isfile(os.path.join(resources_dir, input_image_name)):
+            return input_image_name
+    return None
 
-def persist_json_result(target_path: str, content: dict) -> None:
-    with open(target_path, "w") as f:
-        json.dump(content, f)
 
+def locate_input_image(layout: PersistenceLayout,
+                       resource_identifier: str,
+                       requester_login: str
+                       ) -> Tuple[str, Optional[str]]:
+    resources_dir = layout.resources_dir(
+        resource_identifier=resource_identifier,
+        requester_login=requester_login
+    )
+    input_image_name = find_input_image_name(resources_dir=resources_dir)
+    if input_image_name is not None:
+        return resources_dir, input_image_name
+    alternate_dir = layout.alternate_resources_dir(
+        resource_identifier=resource_identifier,
+        requester_login=requester_login,
+        resources_dir=resources_dir
+    )
+    if alternate_dir is None:
+        return resources_dir, None
+    return alternate_dir, find_input_image_name(resources_dir=alternate_dir)
 
-def safe_load_json(path: str) -> Optional[dict]:
-    try:
-        with open(path, "r") as f:
-            return json.load(f)
-    except Exception:
-        return None
+
+def _parse_uuid(value: str) -> str:
+    return str(UUID(value))
+
+
+def _parse_bounding_box(value: str) -> BoundingBox:
+    x_min, y_min, x_max, y_max = (int(v) for v in value.split(','))
+    if x_min >= x_max or y_min >= y_max:
+        raise ValueError('Bounding box must have positive area.')
+    return x_min, y_min, x_max, y_max
+
+
+def _is_list_of(value, item_type: type) -> bool:
+    return isinstance(value, list) and \
+        all(isinstance(item, item_type) for item in value)
+
+
+def _create_batch_query(data: dict) -> BatchQuery:
+    if data['cursor'] is not None:
+        return BatchQuery.from_cursor(cursor=data['cursor'])
+    if data['range_start'] is None:
+        raise ValueError(
+            'Field "range_start" or "cursor" must be specified '
+            'in this request.'
+        )
+    range_start = datetime.strptime(data['range_start'], DATE_TIME_FORMAT)
+    range_end = data.get('range_end', None)
+    if range_end is not None:
+        range_end = datetime.strptime(range_end, DATE_TIME_FORMAT)
+    else:
+        range_end = datetime.now()
+    return BatchQuery(
+        range_start=range_start.timestamp(),
+        range_end=range_end.timestamp(),
+        requester_login=data['requester_login']
+    )
 
 
 class InputRegistrationResource(Resource):
 
-    def __init__(self):
+    def __init__(self, input_registrar: InputRegistrar):
+        self.__input_registrar = input_registrar
         self.__parser = self.__initialize_request_parser()
 
     @jwt_required
     def post(self) -> Response:
+        announced_login = request.args.get('login')
+        if announced_login is not None and \
+                not self.__quota_admits(requester_login=announced_login):
+            return self.__quota_exceeded()
         if 'image' not in request.files:
             return make_response(
                 {'msg': 'Field called "image" must be specified'}, 500
             )
         data = self.__parser.parse_args()
         requester_login = data['login']
-        resource_identifier = f'{uuid4()}'
-        target_path = os.path.join(
-            PERSISTENCE_DIR,
-            resource_identifier,
-            requester_login,
-            INPUT_IMAGE_NAME
-        )
-        os.makedirs(os.path.dirname(target_path), exist_ok=True)
-        input_image = self.__decode_input_image()
-        cv2.imwrite(target_path, input_image)
+        resource_identifier = data['resource_identifier'] or f'{uuid4()}'
+        if requester_login != announced_login and \
+                not self.__quota_admits(requester_login=requester_login):
+            return self.__quota_exceeded()
+        if self.__input_registrar.is_registered(
+                resource_identifier=resource_identifier):
+            return make_response(
+                {'msg': 'Resource identifier is already registered.'}, 409
+            )
+        resources_dir = self.__input_registrar.resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if self.__input_registrar.stages_inputs:
+            persisted_input = self.__input_registrar.persist_buffered(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                raw_image=request.files['image'].read(),
+                transcode=data['transcode']
+            )
+        else:
+            persisted_input = self.__input_registrar.persist_stream(
+                resources_dir=resources_dir,
+                stream=request.files['image'].stream,
+                transcode=data['transcode']
+            )
+        if persisted_input is None:
+            return make_response(
+                {'msg': 'Field called "image" must contain valid image'}, 500
+            )
         return make_response(
-            {
-                "requester_login": requester_login,
-                "request_identifier": resource_identifier
-            },
+            self.__input_registrar.complete(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                persisted_input=persisted_input,
+                created_at=data['created_at']
+            ),
             200
         )
 
-    def __decode_input_image(self) -> np.ndarray:
-        data = np.fromstring(request.files['image'].read(), dtype=np.uint8)
-        return cv2.imdecode(data, cv2.IMREAD_COLOR)
+    def __quota_admits(self, requester_login: str) -> bool:
+        return self.__input_registrar.admits(
+            requester_login=requester_login,
+            incoming_bytes=request.content_length or 0
+        )
+
+    def __quota_exceeded(self) -> Response:
+        return make_response(
+            {'msg': 'Storage quota exceeded for this login.'}, 413
+        )
 
     def __initialize_request_parser(self) -> reqparse.RequestParser:
         parser = reqparse.RequestParser()
@@ -76,12 +181,41 @@ class InputRegistrationResource(Resource):
             help='Field "login" must be specified in this request.',
             required=True
         )
+        parser.add_argument(
+            'transcode',
+            help='Field "transcode" must be a boolean.',
+            type=inputs.boolean,
+            default=False,
+            required=False
+        )
+        parser.add_argument(
+            'resource_identifier',
+            help='Field "resource_identifier" must be a valid UUID.',
+            type=_parse_uuid,
+            required=False
+        )
+        parser.add_argument(
+            'created_at',
+            help='Field "created_at" must be a timestamp.',
+            type=float,
+            required=False
+        )
         return parser
 
 
 class IntermediateResultRegistrationResource(Resource):
 
-    def __init__(self):
+    def __init__(self,
+                 resources_index: ResourcesIndex,
+                 results_store: ResultsStore,
+                 results_cache: ResultsCache,
+                 results_notifier: ResultsNotifier,
+                 analytics_aggregates: AnalyticsAggregates):
+        self.__resources_index = resources_index
+        self.__results_store = results_store
+        self.__results_cache = results_cache
+        self.__results_notifier = results_notifier
+        self.__analytics_aggregates = analytics_aggregates
         self.__parser = self.__initialize_request_parser()
 
     @jwt_required
@@ -94,18 +228,34 @@ class IntermediateResultRegistrationResource(Resource):
         requester_login = data['requester_login']
         resource_identifier = data['resource_identifier']
         result_type = data['result_type']
-        target_path = os.path.join(
-            PERSISTENCE_DIR,
-            resource_identifier,
-            requester_login,
-            f'{result_type}.json'
+        registered_position = self.__resources_index.get_position(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
         )
-        if not os.path.isdir(os.path.dirname(target_path)):
+        if registered_position is None:
             return make_response(
                 {'msg': 'Wrong resource identifier or requester login'}, 500
             )
         content = json.load(request.files['resource_content'])
-        persist_json_result(target_path=target_path, content=content)
+        key = (resource_identifier, requester_login, result_type)
+        resource_name = result_resource_name(result_type=result_type)
+        size = self.__results_store.save(key=key, content=content)
+        first_registration = self.__resources_index.register_resource(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resource_name=resource_name,
+            size=size
+        )
+        if first_registration:
+            self.__analytics_aggregates.record(
+                key=key,
+                created_at=registered_position[0],
+                content=content
+            )
+        self.__results_cache.put(key=key, content=content, size=size)
+        self.__results_notifier.notify(
+            key=(resource_identifier, requester_login)
+        )
         return make_response({"msg": "OK"}, 200)
 
     def __initialize_request_parser(self) -> reqparse.RequestParser:
@@ -131,40 +281,117 @@ class IntermediateResultRegistrationResource(Resource):
 
 class IntermediateResultFetchingResource(Resource):
 
-    def __init__(self):
+    def __init__(self,
+                 results_loader: IntermediateResultsLoader,
+                 results_codec: ResultsCodec):
+        self.__results_loader = results_loader
+        self.__results_codec = results_codec
         self.__parser = self.__initialize_request_parser()
 
     @jwt_required
     def get(self) -> Response:
         data = self.__parser.parse_args()
-        requester_login = data['requester_login']
-        resource_identifier = data['resource_identifier']
-        resources_dir = os.path.join(
-            PERSISTENCE_DIR, resource_identifier, requester_login
+        resources_types = data['resources_types']
+        if type(resources_types) is str:
+            resources_types = [resources_types]
+        resources = self.__results_loader.load(
+            resource_identifier=data['resource_identifier'],
+            requester_login=data['requester_login'],
+            resources_types=resources_types
         )
-        if not os.path.isdir(resources_dir):
+        if resources is None:
             return make_response(
                 {'msg': 'Incorrect resource identifiers.'}, 500
             )
-        resources = self.__load_resources(
-            resources_types=data['resources_types'],
-            resources_dir=resources_dir
+        accepted_mimetype = request.accept_mimetypes.best_match(
+            ['application/json', BINARY_RESULTS_MIMETYPE]
         )
-        return make_response(resources, 200)
+        if accepted_mimetype == BINARY_RESULTS_MIMETYPE:
+            response = make_response(
+                self.__results_codec.encode_results(resources=resources), 200
+            )
+            response.mimetype = BINARY_RESULTS_MIMETYPE
+        else:
+            response = make_response(resources, 200)
+        response.add_etag()
+        return response.make_conditional(request)
 
-    def __load_resources(self,
-                         resources_types: Union[str, List[str]],
-                         resources_dir: str
-                         ) -> Dict[str, Union[None, dict, np.ndarray]]:
-        if type(resources_types) is str:
-            resources_types = [resources_types]
-        result = {}
-        for resource_type in resources_types:
-            resource_content = safe_load_json(
-                os.path.join(resources_dir, f'{resource_type}.json')
+    def __initialize_request_parser(self) -> reqparse.RequestParser:
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'requester_login',
+            help='Field "requester_login" must be specified in this request.',
+            required=True
+        )
+        parser.add_argument(
+            'resource_identifier',
+            help='Field "resource_identifier" must '
+                 'be specified in this request.',
+            required=True
+        )
+        parser.add_argument(
+            'resources_types',
+            help='Field "resources_types" must be specified in this request.',
+            required=True,
+            action='append'
+        )
+        return parser
+
+
+class ResultsWaitingResource(Resource):
+
+    def __init__(self,
+                 results_loader: IntermediateResultsLoader,
+                 results_notifier: ResultsNotifier):
+        self.__results_loader = results_loader
+        self.__results_notifier = results_notifier
+        self.__parser = self.__initialize_request_parser()
+
+    @jwt_required
+    def get(self) -> Response:
+        data = self.__parser.parse_args()
+        resources_types = data['resources_types']
+        awaited_types = data['awaited_types'] or resources_types
+        timeout = min(max(data['timeout'], 0.0), WAIT_MAX_TIMEOUT)
+        key = (data['resource_identifier'], data['requester_login'])
+        event = self.__results_notifier.subscribe(key=key)
+        try:
+            return self.__wait_for_results(
+                key=key,
+                resources_types=list(set(resources_types + awaited_types)),
+                awaited_types=awaited_types,
+                deadline=time.monotonic() + timeout,
+                event=event
             )
-            result[resource_type] = resource_content
-        return result
+        finally:
+            self.__results_notifier.unsubscribe(key=key, event=event)
+
+    def __wait_for_results(self,
+                           key: RequestKey,
+                           resources_types: List[str],
+                           awaited_types: List[str],
+                           deadline: float,
+                           event: Event
+                           ) -> Response:
+        resource_identifier, requester_login = key
+        while True:
+            resources = self.__results_loader.load(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_types=resources_types
+            )
+            if resources is None:
+                return make_response(
+                    {'msg': 'Incorrect resource identifiers.'}, 500
+                )
+            completed = any(resources[t] is not None for t in awaited_types)
+            remaining = deadline - time.monotonic()
+            if completed or remaining <= 0:
+                return make_response(
+                    {'completed': completed, 'resources': resources}, 200
+                )
+            event.wait(timeout=min(remaining, WAIT_POLL_INTERVAL))
+            event.clear()
 
     def __initialize_request_parser(self) -> reqparse.RequestParser:
         parser = reqparse.RequestParser()
@@ -185,12 +412,33 @@ class IntermediateResultFetchingResource(Resource):
             required=True,
             action='append'
         )
+        parser.add_argument(
+            'awaited_types',
+            help='Field "awaited_types" is optional.',
+            required=False,
+            action='append'
+        )
+        parser.add_argument(
+            'timeout',
+            help='Field "timeout" must be a number.',
+            type=float,
+            default=WAIT_DEFAULT_TIMEOUT,
+            required=False
+        )
         return parser
 
 
 class InputFetchingResource(Resource):
 
-    def __init__(self):
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 input_staging: Optional[InputStagingArea],
+                 derivatives_cache: DerivativesCache,
+                 pack_store: Optional[PackStore]):
+        self.__layout = layout
+        self.__input_staging = input_staging
+        self.__derivatives_cache = derivatives_cache
+        self.__pack_store = pack_store
         self.__parser = self.__initialize_request_parser()
 
     @jwt_required
@@ -198,39 +446,177 @@ class InputFetchingResource(Resource):
         data = self.__parser.parse_args()
         requester_login = data['requester_login']
         resource_identifier = data['resource_identifier']
-        resources_dir = os.path.join(
-            os.path.abspath(PERSISTENCE_DIR),
-            resource_identifier,
-            requester_login
+        transform = self.__parse_transform(data=data)
+        staged_input = None
+        if self.__input_staging is not None:
+            staged_input = self.__input_staging.get(
+                key=(resource_identifier, requester_login)
+            )
+        if staged_input is not None and transform is None:
+            return self.__send_content(
+                file_name=staged_input.input_image_name,
+                content=staged_input.content
+            )
+        resources_dir, input_image_name = locate_input_image(
+            layout=self.__layout,
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
         )
-        if not os.path.isdir(resources_dir):
+        packed_input = None
+        if input_image_name is None and staged_input is None:
+            packed_input = self.__find_packed_input(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login
+            )
+        if not os.path.isdir(resources_dir) and packed_input is None:
             return make_response(
                 {'msg': 'Incorrect resource identifiers.'}, 500
             )
+        if transform is not None:
+            preloaded_image = staged_input.content \
+                if staged_input is not None else None
+            if packed_input is not None:
+                _, preloaded_image = packed_input
+            return self.__send_derivative(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir,
+                preloaded_image=preloaded_image,
+                transform=transform
+            )
+        if packed_input is not None:
+            packed_image_name, content = packed_input
+            return self.__send_content(
+                file_name=packed_image_name,
+                content=content
+            )
+        if input_image_name is None:
+            return make_response(
+                {'msg': 'There is no input file detected.'}, 500
+            )
         try:
             return send_from_directory(
                 directory=resources_dir,
-                filename=INPUT_IMAGE_NAME,
-                as_attachment=True
+                filename=input_image_name,
+                as_attachment=True,
+                conditional=True
             )
-        except FileNotFoundError:
+        except NotFound:
+            resources_dir, input_image_name = locate_input_image(
+                layout=self.__layout,
+                resource_identifier=resource_identifier,
+                requester_login=requester_login
+            )
+        if input_image_name is None:
             return make_response(
                 {'msg': 'There is no input file detected.'}, 500
             )
+        return send_from_directory(
+            directory=resources_dir,
+            filename=input_image_name,
+            as_attachment=True,
+            conditional=True
+        )
 
-    def __load_resources(self,
-                         resources_types: Union[str, List[str]],
-                         resources_dir: str
-                         ) -> Dict[str, Union[None, dict, np.ndarray]]:
-        if type(resources_types) is str:
-            resources_types = [resources_types]
-        result = {}
-        for resource_type in resources_types:
-            resource_content = safe_load_json(
-                os.path.join(resources_dir, f'{resource_type}.json')
+    def __send_content(self, file_name: str, content: bytes) -> Response:
+        response = make_response(content)
+        response.mimetype = mimetypes.guess_type(file_name)[0] or \
+            'application/octet-stream'
+        response.headers['Content-Disposition'] = \
+            f'attachment; filename={file_name}'
+        response.add_etag()
+        return response.make_conditional(request)
+
+    def __find_packed_input(self,
+                            resource_identifier: str,
+                            requester_login: str
+                            ) -> Optional[PackedContent]:
+        if self.__pack_store is None:
+            return None
+        return self.__pack_store.read_first(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_names=list(INPUT_IMAGE_NAMES.values())
+        )
+
+    def __send_derivative(self,
+                          resource_identifier: str,
+                          requester_login: str,
+                          resources_dir: str,
+                          preloaded_image: Optional[bytes],
+                          transform: ImageTransform
+                          ) -> Response:
+        derivative_path = self.__derivatives_cache.get(
+            resources_dir=resources_dir,
+            transform=transform
+        )
+        if derivative_path is None:
+            raw_image = self.__load_input_image(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                preloaded_image=preloaded_image
             )
-            result[resource_type] = resource_content
-        return result
+            if raw_image is None:
+                return make_response(
+                    {'msg': 'There is no input file detected.'}, 500
+                )
+            derivative = transform_image(
+                raw_image=raw_image,
+                transform=transform
+            )
+            if derivative is None:
+                return make_response(
+                    {'msg': 'Requested transform cannot be applied.'}, 400
+                )
+            derivative_path = self.__derivatives_cache.put(
+                resources_dir=resources_dir,
+                transform=transform,
+                content=derivative
+            )
+        return send_from_directory(
+            directory=os.path.dirname(derivative_path),
+            filename=os.path.basename(derivative_path),
+            as_attachment=True,
+            conditional=True
+        )
+
+    def __load_input_image(self,
+                           resource_identifier: str,
+                           requester_login: str,
+                           preloaded_image: Optional[bytes]
+                           ) -> Optional[bytes]:
+        if preloaded_image is not None:
+            return preloaded_image
+        for _ in range(2):
+            resources_dir, input_image_name = locate_input_image(
+                layout=self.__layout,
+                resource_identifier=resource_identifier,
+                requester_login=requester_login
+            )
+            if input_image_name is None:
+                return None
+            try:
+                with open(
+                        os.path.join(resources_dir, input_image_name), "rb"
+                        ) as f:
+                    return f.read()
+            except FileNotFoundError:
+                continue
+        return None
+
+    def __parse_transform(self, data: dict) -> Optional[ImageTransform]:
+        transform_parameters = (
+            data['max_dimension'], data['crop'],
+            data['image_format'], data['quality']
+        )
+        if all(parameter is None for parameter in transform_parameters):
+            return None
+        return ImageTransform(
+            max_dimension=data['max_dimension'],
+            crop=data['crop'],
+            image_format=data['image_format'] or DEFAULT_DERIVATIVE_FORMAT,
+            quality=data['quality']
+        )
 
     def __initialize_request_parser(self) -> reqparse.RequestParser:
         parser = reqparse.RequestParser()
@@ -245,125 +631,330 @@ class InputFetchingResource(Resource):
                  'be specified in this request.',
             required=True
         )
+        parser.add_argument(
+            'max_dimension',
+            help='Field "max_dimension" must be a positive integer.',
+            type=inputs.positive,
+            required=False
+        )
+        parser.add_argument(
+            'crop',
+            help='Field "crop" must be in format "x_min,y_min,x_max,y_max".',
+            type=_parse_bounding_box,
+            required=False
+        )
+        parser.add_argument(
+            'image_format',
+            help='Field "image_format" must be one of: '
+                 f'{", ".join(ENCODING_EXTENSIONS)}.',
+            choices=list(ENCODING_EXTENSIONS),
+            required=False
+        )
+        parser.add_argument(
+            'quality',
+            help='Field "quality" must be an integer in range [1; 100].',
+            type=inputs.int_range(1, 100),
+            required=False
+        )
         return parser
 
 
 class BatchFetchingResource(Resource):
 
-    def __init__(self):
+    def __init__(self, resources_index: ResourcesIndex):
+        self.__resources_index = resources_index
         self.__parser = self.__initialize_request_parser()
 
     @jwt_required
     def get(self) -> Response:
         data = self.__parser.parse_args()
-        range_start = datetime.strptime(data['range_start'], DATE_TIME_FORMAT)
-        range_end = data.get('range_end', None)
-        if range_end is not None:
-            range_end = datetime.strptime(range_end, DATE_TIME_FORMAT)
-        else:
-            range_end = datetime.now()
-        resources_description = self.__get_resources_description_from_range(
-            range_start=range_start,
-            range_end=range_end
+        try:
+            batch_query = _create_batch_query(data=data)
+        except (InvalidCursor, ValueError) as e:
+            return make_response({'msg': f'{e}'}, 500)
+        if data['stream']:
+            return Response(
+                stream_with_context(
+                    self.__stream_resources_description(batch_query=batch_query)
+                ),
+                mimetype='application/x-ndjson'
+            )
+        limit = data['limit'] or BATCH_FETCH_DEFAULT_PAGE_SIZE
+        limit = max(min(limit, BATCH_FETCH_MAX_PAGE_SIZE), 1)
+        indexed_resources = self.__resources_index.find_resources(
+            range_start=batch_query.range_start,
+            range_end=batch_query.range_end,
+            requester_login=batch_query.requester_login,
+            start_after=batch_query.start_after,
+            limit=limit
         )
+        next_cursor = None
+        if len(indexed_resources) == limit:
+            next_cursor = batch_query.advance(
+                start_after=indexed_resources[-1].position
+            ).to_cursor()
         return make_response(
-            {'resources_description': resources_description}, 200
+            {
+                'resources_description': [
+                    r.to_dict() for r in indexed_resources
+                ],
+                'next_cursor': next_cursor
+            },
+            200
         )
 
-    def __get_resources_description_from_range(self,
-                                               range_start: datetime,
-                                               range_end: datetime
-                                               ) -> ResourcesDescription:
-        subdir_content = self.__flatten_subdir_content(
-            start_dir=PERSISTENCE_DIR,
-            level=2
+    def __stream_resources_description(self,
+                                       batch_query: BatchQuery
+                                       ) -> Iterator[str]:
+        indexed_resources = self.__resources_index.iterate_resources(
+            range_start=batch_query.range_start,
+            range_end=batch_query.range_end,
+            requester_login=batch_query.requester_login,
+            start_after=batch_query.start_after,
+            page_size=BATCH_STREAM_PAGE_SIZE
+        )
+        for indexed_resource in indexed_resources:
+            yield f'{json.dumps(indexed_resource.to_dict())}\n'
+
+    def __initialize_request_parser(self) -> reqparse.RequestParser:
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'range_start',
+            help='Field "range_start" is required unless "cursor" is given.',
+            required=False
         )
-        grouped_subdir_content = self.__group_files_by_directory(
-            to_be_grouped=subdir_content
+        parser.add_argument(
+            'range_end',
+            help='Field "range_end" is optional.',
+            required=False
+        )
+        parser.add_argument(
+            'requester_login',
+            help='Field "requester_login" is optional.',
+            required=False
+        )
+        parser.add_argument(
+            'limit',
+            help='Field "limit" must be an integer.',
+            type=int,
+            required=False
+        )
+        parser.add_argument(
+            'cursor',
+            help='Field "cursor" is optional.',
+            required=False
         )
-        directory_in_range = partial(
-            self.__is_directory_in_range,
-            range_start=range_start,
-            range_end=range_end
+        parser.add_argument(
+            'stream',
+            help='Field "stream" must be a boolean.',
+            type=inputs.boolean,
+            default=False,
+            required=False
+        )
+        return parser
+
+
+class BulkFetchingResource(Resource):
+
+    def __init__(self,
+                 results_loader: IntermediateResultsLoader,
+                 executor: ThreadPoolExecutor):
+        self.__results_loader = results_loader
+        self.__executor = executor
+
+    @jwt_required
+    def post(self) -> Response:
+        content = request.get_json(silent=True)
+        if not isinstance(content, dict) or \
+                'requests' not in content or 'resources_types' not in content:
+            return make_response(
+                {'msg': 'Fields "requests" and "resources_types" '
+                        'must be specified in this request.'},
+                500
+            )
+        requests_identifiers = content['requests']
+        if not _is_list_of(requests_identifiers, dict) or any(
+                not isinstance(request_identifiers.get(field), str)
+                for request_identifiers in requests_identifiers
+                for field in ('resource_identifier', 'requester_login')):
+            return make_response(
+                {'msg': 'Field "requests" must be a list of objects with '
+                        'string "resource_identifier" and '
+                        '"requester_login".'},
+                400
+            )
+        if not _is_list_of(content['resources_types'], str):
+            return make_response(
+                {'msg': 'Field "resources_types" must be a list of strings.'},
+                400
+            )
+        if len(requests_identifiers) > BULK_FETCH_MAX_REQUESTS:
+            return make_response(
+                {'msg': f'At most {BULK_FETCH_MAX_REQUESTS} requests '
+                        f'can be fetched at once.'},
+                500
+            )
+        return Response(
+            stream_with_context(
+                self.__stream_results(
+                    requests_identifiers=requests_identifiers,
+                    resources_types=content['resources_types']
+                )
+            ),
+            mimetype='application/x-ndjson'
         )
-        filtered_directories = [
-            d for d in grouped_subdir_content if directory_in_range(d)
+
+    def __stream_results(self,
+                         requests_identifiers: List[dict],
+                         resources_types: List[str]
+                         ) -> Iterator[str]:
+        futures = [
+            self.__executor.submit(
+                self.__load_results,
+                request_identifiers=request_identifiers,
+                resources_types=resources_types
+            )
+            for request_identifiers in requests_identifiers
         ]
-        filtered_resources = {
-            d: grouped_subdir_content[d] for d in filtered_directories
+        for future in as_completed(futures):
+            yield f'{json.dumps(future.result())}\n'
+
+    def __load_results(self,
+                       request_identifiers: dict,
+                       resources_types: List[str]
+                       ) -> dict:
+        resource_identifier = request_identifiers['resource_identifier']
+        requester_login = request_identifiers['requester_login']
+        result = {
+            'resource_identifier': resource_identifier,
+            'requester_login': requester_login
         }
-        return self.__produce_resources_description(
-            resources=filtered_resources
-        )
-
-    def __flatten_subdir_content(self,
-                                 start_dir: str,
-                                 level: int,
-                                 files_only: bool = True
-                                 ) -> List[str]:
-        path_wild_card = start_dir
-        for _ in range(level + 1):
-            path_wild_card = os.path.join(
-                path_wild_card, "*"
-            )
-        content = glob(path_wild_card)
-        if files_only:
-            content = list(filter(os.path.isfile, content))
-        return content
-
-    def __group_files_by_directory(self,
-                                   to_be_grouped: List[str]
-                                   ) -> Dict[str, List[str]]:
-        to_be_grouped = list(map(os.path.split, to_be_grouped))
-        return reduce(
-            self.__collect_files_by_directory, to_be_grouped, {}
-        )
-
-    def __collect_files_by_directory(self,
-                                     already_collected: Dict[str, List[str]],
-                                     to_be_collected: Tuple[str, str]
-                                     ) -> Dict[str, List[str]]:
-        dir_name, file_name = to_be_collected
-        if dir_name in already_collected:
-            already_collected[dir_name].append(file_name)
+        resources = self.__results_loader.load(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_types=resources_types
+        )
+        if resources is None:
+            result['msg'] = 'Incorrect resource identifiers.'
         else:
-            already_collected[dir_name] = [file_name]
-        return already_collected
-
-    def __is_directory_in_range(self,
-                                dir_path: str,
-                                range_start: datetime,
-                                range_end: datetime
-                                ) -> bool:
-        dir_modification_time = self.__get_modification_modification_time(
-            path=dir_path
-        )
-        return range_start < dir_modification_time < range_end
-
-    def __get_modification_modification_time(self, path: str) -> datetime:
-        unix_time = time.ctime(os.path.getmtime(path))
-        return datetime.strptime(unix_time, "%a %b %d %H:%M:%S %Y")
-
-    def __produce_resources_description(self,
-                                        resources: Dict[str, List[str]]
-                                        ) -> ResourcesDescription:
-        flatten_resources = [(d, fs) for d, fs in resources.items()]
-        return list(map(self.__create_resource_description, flatten_resources))
-
-    def __create_resource_description(self,
-                                      raw_description: RawResourceDescription
-                                      ) -> ResourceDescription:
-        dir_name, directory_files = raw_description
-        parent_dir_name, requester_login = os.path.split(dir_name)
-        resource_identifier = os.path.basename(parent_dir_name)
-        return {
-            "requester_login": requester_login,
-            "resource_identifier": resource_identifier,
-            "resources": directory_files
-        }
+            result['resources'] = resources
+        return result
+
+
+class ExportResource(Resource):
+
+    def __init__(self, requests_exporter: RequestsExporter):
+        self.__requests_exporter = requests_exporter
+        self.__parser = self.__initialize_request_parser()
+
+    @jwt_required
+    def get(self) -> Response:
+        data = self.__parser.parse_args()
+        try:
+            batch_query = _create_batch_query(data=data)
+        except (InvalidCursor, ValueError) as e:
+            return make_response({'msg': f'{e}'}, 500)
+        return Response(
+            stream_with_context(
+                self.__requests_exporter.stream(
+                    batch_query=batch_query,
+                    export_format=data['format'],
+                    include_inputs=data['include_inputs']
+                )
+            ),
+            mimetype=EXPORT_MIMETYPES[data['format']]
+        )
 
     def __initialize_request_parser(self) -> reqparse.RequestParser:
         parser = reqparse.RequestParser()
+        parser.add_argument(
+            'range_start',
+            help='Field "range_start" is required unless "cursor" is given.',
+            required=False
+        )
+        parser.add_argument(
+            'range_end',
+            help='Field "range_end" is optional.',
+            required=False
+        )
+        parser.add_argument(
+            'requester_login',
+            help='Field "requester_login" is optional.',
+            required=False
+        )
+        parser.add_argument(
+            'cursor',
+            help='Field "cursor" is optional.',
+            required=False
+        )
+        parser.add_argument(
+            'format',
+            help='Field "format" must be one of: '
+                 f'{", ".join(EXPORT_MIMETYPES)}.',
+            choices=list(EXPORT_MIMETYPES),
+            default=TAR_FORMAT,
+            required=False
+        )
+        parser.add_argument(
+            'include_inputs',
+            help='Field "include_inputs" must be a boolean.',
+            type=inputs.boolean,
+            default=False,
+            required=False
+        )
+        return parser
+
+
+class AnalyticsResource(Resource):
+
+    def __init__(self, analytics_aggregates: AnalyticsAggregates):
+        self.__analytics_aggregates = analytics_aggregates
+        self.__parser = self.__initialize_request_parser()
+
+    @jwt_required
+    def get(self) -> Response:
+        data = self.__parser.parse_args()
+        try:
+            range_start = datetime.strptime(
+                data['range_start'], DATE_TIME_FORMAT
+            )
+            range_end = datetime.now() if data['range_end'] is None else \
+                datetime.strptime(data['range_end'], DATE_TIME_FORMAT)
+        except ValueError as e:
+            return make_response({'msg': f'{e}'}, 500)
+        buckets = self.__analytics_aggregates.query(
+            granularity=data['granularity'],
+            range_start=range_start.timestamp(),
+            range_end=range_end.timestamp(),
+            requester_login=data['requester_login'],
+            metrics=data['metrics']
+        )
+        return make_response(
+            {
+                'granularity': data['granularity'],
+                'buckets': [
+                    {
+                        'bucket_start': datetime.fromtimestamp(
+                            bucket.bucket_start
+                        ).strftime(DATE_TIME_FORMAT),
+                        'metrics': bucket.metrics
+                    }
+                    for bucket in buckets
+                ]
+            },
+            200
+        )
+
+    def __initialize_request_parser(self) -> reqparse.RequestParser:
+        parser = reqparse.RequestParser()
+        granularities = self.__analytics_aggregates.granularities
+        parser.add_argument(
+            'granularity',
+            help='Field "granularity" must be one of: '
+                 f'{", ".join(granularities)}.',
+            choices=granularities,
+            required=True
+        )
         parser.add_argument(
             'range_start',
             help='Field "range_start" must be specified in this request.',
@@ -374,4 +965,61 @@ class BatchFetchingResource(Resource):
             help='Field "range_end" is optional.',
             required=False
         )
+        parser.add_argument(
+            'requester_login',
+            help='Field "requester_login" is optional.',
+            required=False
+        )
+        parser.add_argument(
+            'metrics',
+            help='Field "metrics" is optional.',
+            required=False,
+            action='append'
+        )
+        return parser
+
+
+class StorageUsageResource(Resource):
+
+    def __init__(self,
+                 resources_index: ResourcesIndex,
+                 storage_quota: StorageQuota):
+        self.__resources_index = resources_index
+        self.__storage_quota = storage_quota
+        self.__parser = self.__initialize_request_parser()
+
+    @jwt_required
+    def get(self) -> Response:
+        data = self.__parser.parse_args()
+        if data['requester_login'] is not None:
+            usage = [self.__resources_index.get_login_usage(
+                requester_login=data['requester_login']
+            )]
+        else:
+            usage = self.__resources_index.list_logins_usage()
+        return make_response(
+            {
+                "quota": self.__storage_quota.limits,
+                "usage": [login_usage.to_dict() for login_usage in usage]
+            },
+            200
+        )
+
+    def __initialize_request_parser(self) -> reqparse.RequestParser:
+        parser = reqparse.RequestParser()
+        parser.add_argument(
+            'requester_login',
+            help='Field "requester_login" is optional.',
+            required=False
+        )
         return parser
+
+
+class RetentionStatsResource(Resource):
+
+    def __init__(self, retention_sweeper: RetentionSweeper):
+        self.__retention_sweeper = retention_sweeper
+
+    @jwt_required
+    def get(self) -> Response:
+        return make_response(self.__retention_sweeper.stats, 200)
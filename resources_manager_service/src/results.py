@@ -0,0 +1,108 @@
+import os
+from typing import List, Optional, Dict, Tuple
+
+from .cache import ResultsCache
+from .layout import PersistenceLayout
+from .packs import PackStore
+from .results_store import ResultsStore
+
+LoadedResources = Dict[str, Optional[dict]]
+
+
+class IntermediateResultsLoader:
+
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 results_store: ResultsStore,
+                 results_cache: ResultsCache,
+                 pack_store: Optional[PackStore] = None):
+        self.__layout = layout
+        self.__results_store = results_store
+        self.__results_cache = results_cache
+        self.__pack_store = pack_store
+
+    def load(self,
+             resource_identifier: str,
+             requester_login: str,
+             resources_types: List[str]
+             ) -> Optional[LoadedResources]:
+        resources, missing_types = self.__load_cached_resources(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_types=resources_types
+        )
+        if len(missing_types) == 0:
+            return resources
+        resources_dir = self.__layout.resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if not self.__exists(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login,
+                resources_dir=resources_dir):
+            return None
+        generation = self.__results_cache.generation
+        stored_results = self.__results_store.load(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_types=missing_types
+        )
+        for resource_type in missing_types:
+            key = (resource_identifier, requester_login, resource_type)
+            if resource_type not in stored_results:
+                self.__results_cache.put_missing(
+                    key=key,
+                    generation=generation
+                )
+                resources[resource_type] = None
+                continue
+            resource_content, size = stored_results[resource_type]
+            self.__results_cache.put(
+                key=key,
+                content=resource_content,
+                size=size,
+                generation=generation
+            )
+            resources[resource_type] = resource_content
+        return resources
+
+    def __exists(self,
+                 resource_identifier: str,
+                 requester_login: str,
+                 resources_dir: str
+                 ) -> bool:
+        if os.path.isdir(resources_dir):
+            return True
+        alternate_dir = self.__layout.alternate_resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_dir=resources_dir
+        )
+        return alternate_dir is not None or self.__is_packed(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+
+    def __is_packed(self, resource_identifier: str, requester_login: str
+                    ) -> bool:
+        return self.__pack_store is not None and self.__pack_store.is_packed(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+
+    def __load_cached_resources(self,
+                                resource_identifier: str,
+                                requester_login: str,
+                                resources_types: List[str]
+                                ) -> Tuple[LoadedResources, List[str]]:
+        resources, missing_types = {}, []
+        for resource_type in resources_types:
+            hit, resource_content = self.__results_cache.get(
+                key=(resource_identifier, requester_login, resource_type)
+            )
+            if hit:
+                resources[resource_type] = resource_content
+            else:
+                missing_types.append(resource_type)
+        return resources, missing_types
@@ -0,0 +1,215 @@
+import json
+import struct
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BINARY_RESULTS_MIMETYPE = 'application/x-maas-results'
+
+JSON_ENCODING = 'json'
+BINARY_ENCODING = 'binary'
+
+NO_COMPRESSION = 'none'
+ZLIB_COMPRESSION = 'zlib'
+ZSTD_COMPRESSION = 'zstd'
+COMPRESSION_IDS = {NO_COMPRESSION: 0, ZLIB_COMPRESSION: 1, ZSTD_COMPRESSION: 2}
+
+MAGIC = b'\x00MR'
+VERSION = 1
+HEADER = struct.Struct('<3sBB')
+LENGTH = struct.Struct('<I')
+NAME_LENGTH = struct.Struct('<H')
+MISSING_RESULT = 0xFFFFFFFF
+
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+BOUNDING_BOX_KEYS = {'left_top', 'right_bottom'}
+POINT_KEYS = {'x', 'y'}
+
+FieldSchema = dict
+Columns = List[bytes]
+
+
+class ResultsCodec:
+
+    def __init__(self, encoding: str, compression: str):
+        if encoding not in {JSON_ENCODING, BINARY_ENCODING}:
+            raise ValueError(f'Unknown results encoding: {encoding}.')
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f'Unknown results compression: {compression}.')
+        if compression == ZSTD_COMPRESSION and zstandard is None:
+            raise ValueError('zstd compression requires zstandard package.')
+        self.__encoding = encoding
+        self.__compression = compression
+
+    def encode(self, content: dict) -> bytes:
+        if self.__encoding == JSON_ENCODING:
+            return json.dumps(content).encode('utf-8')
+        schema, columns = {}, []
+        for key, value in content.items():
+            schema[key] = _encode_field(value=value, columns=columns)
+        raw_schema = json.dumps(schema).encode('utf-8')
+        body = LENGTH.pack(len(raw_schema)) + raw_schema + b''.join(columns)
+        compression = self.__compression
+        compressed_body = _compress(body=body, compression=compression)
+        if len(compressed_body) >= len(body):
+            compression, compressed_body = NO_COMPRESSION, body
+        header = HEADER.pack(MAGIC, VERSION, COMPRESSION_IDS[compression])
+        return header + compressed_body
+
+    def decode(self, payload: bytes) -> dict:
+        if not payload.startswith(MAGIC):
+            return json.loads(payload)
+        _, _, compression_id = HEADER.unpack_from(payload)
+        body = _decompress(
+            body=payload[HEADER.size:],
+            compression_id=compression_id
+        )
+        schema_length, = LENGTH.unpack_from(body)
+        offset = LENGTH.size
+        schema = json.loads(body[offset:offset + schema_length])
+        offset += schema_length
+        content = {}
+        for key, field_schema in schema.items():
+            content[key], offset = _decode_field(
+                field_schema=field_schema,
+                body=body,
+                offset=offset
+            )
+        return content
+
+    def encode_results(self, resources: Dict[str, Optional[dict]]) -> bytes:
+        frames = []
+        for resource_type, content in resources.items():
+            raw_name = resource_type.encode('utf-8')
+            frames.append(NAME_LENGTH.pack(len(raw_name)) + raw_name)
+            if content is None:
+                frames.append(LENGTH.pack(MISSING_RESULT))
+                continue
+            encoded = self.encode(content=content)
+            frames.append(LENGTH.pack(len(encoded)) + encoded)
+        return b''.join(frames)
+
+
+def _encode_field(value, columns: Columns) -> FieldSchema:
+    records = _as_records(value=value)
+    if records is None:
+        return {'kind': 'json', 'value': value}
+    box_field, scalar_fields = records
+    boxes = [
+        _box_coordinates(record if box_field is None else record[box_field])
+        for record in value
+    ]
+    columns.append(np.asarray(boxes, dtype='<i4').tobytes())
+    for scalar_field in scalar_fields:
+        scalars = [record[scalar_field] for record in value]
+        missing = [scalar is None for scalar in scalars]
+        columns.append(np.asarray(
+            [0 if scalar is None else scalar for scalar in scalars],
+            dtype='<i4'
+        ).tobytes())
+        columns.append(np.asarray(missing, dtype=np.uint8).tobytes())
+    return {
+        'kind': 'records',
+        'count': len(value),
+        'box_field': box_field,
+        'scalar_fields': scalar_fields
+    }
+
+
+def _decode_field(field_schema: FieldSchema, body: bytes, offset: int
+                  ) -> Tuple[object, int]:
+    if field_schema['kind'] == 'json':
+        return field_schema['value'], offset
+    count = field_schema['count']
+    boxes = np.frombuffer(body, dtype='<i4', count=count * 4, offset=offset)
+    offset += boxes.nbytes
+    records = [_box_dict(coordinates) for coordinates in boxes.reshape(-1, 4)]
+    box_field = field_schema['box_field']
+    if box_field is not None:
+        records = [{box_field: box} for box in records]
+    for scalar_field in field_schema['scalar_fields']:
+        scalars = np.frombuffer(body, dtype='<i4', count=count, offset=offset)
+        offset += scalars.nbytes
+        missing = np.frombuffer(
+            body, dtype=np.uint8, count=count, offset=offset
+        )
+        offset += missing.nbytes
+        for record, scalar, is_missing in zip(records, scalars, missing):
+            record[scalar_field] = None if is_missing else int(scalar)
+    return records, offset
+
+
+def _as_records(value) -> Optional[Tuple[Optional[str], List[str]]]:
+    if not isinstance(value, list) or len(value) == 0:
+        return None
+    if all(_is_bounding_box(record) for record in value):
+        return None, []
+    if not all(isinstance(record, dict) for record in value):
+        return None
+    keys = set(value[0].keys())
+    if any(set(record.keys()) != keys for record in value):
+        return None
+    box_fields = [
+        key for key in sorted(keys)
+        if all(_is_bounding_box(record[key]) for record in value)
+    ]
+    if len(box_fields) != 1:
+        return None
+    box_field = box_fields[0]
+    scalar_fields = sorted(keys - {box_field})
+    if not all(_is_int32(record[field]) or record[field] is None
+               for record in value for field in scalar_fields):
+        return None
+    return box_field, scalar_fields
+
+
+def _is_bounding_box(value) -> bool:
+    return isinstance(value, dict) and set(value.keys()) == BOUNDING_BOX_KEYS \
+        and all(_is_point(value[key]) for key in BOUNDING_BOX_KEYS)
+
+
+def _is_point(value) -> bool:
+    return isinstance(value, dict) and set(value.keys()) == POINT_KEYS \
+        and all(_is_int32(value[key]) for key in POINT_KEYS)
+
+
+def _is_int32(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) \
+        and INT32_MIN <= value <= INT32_MAX
+
+
+def _box_coordinates(box: dict) -> Tuple[int, int, int, int]:
+    left_top, right_bottom = box['left_top'], box['right_bottom']
+    return left_top['x'], left_top['y'], right_bottom['x'], right_bottom['y']
+
+
+def _box_dict(coordinates: np.ndarray) -> dict:
+    x_min, y_min, x_max, y_max = (int(c) for c in coordinates)
+    return {
+        'left_top': {'x': x_min, 'y': y_min},
+        'right_bottom': {'x': x_max, 'y': y_max}
+    }
+
+
+def _compress(body: bytes, compression: str) -> bytes:
+    if compression == ZLIB_COMPRESSION:
+        return zlib.compress(body)
+    if compression == ZSTD_COMPRESSION:
+        return zstandard.ZstdCompressor().compress(body)
+    return body
+
+
+def _decompress(body: bytes, compression_id: int) -> bytes:
+    if compression_id == COMPRESSION_IDS[ZLIB_COMPRESSION]:
+        return zlib.decompress(body)
+    if compression_id == COMPRESSION_IDS[ZSTD_COMPRESSION]:
+        if zstandard is None:
+            raise ValueError('zstd compression requires zstandard package.')
+        return zstandard.ZstdDecompressor().decompress(body)
+    return body
@@ -0,0 +1,297 @@
+import logging
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from queue import Queue, Empty
+from threading import Thread, Event, Lock
+from typing import Dict, List, Optional, Tuple, Union
+from uuid import uuid4
+
+from .cache import ResultKey
+from .content_store import link_or_copy
+from .layout import PersistenceLayout
+from .packs import PackStore
+from .results_codec import ResultsCodec
+
+StoredResult = Tuple[dict, int]
+StoredResults = Dict[str, StoredResult]
+
+FILES_ENGINE = 'files'
+SQLITE_ENGINE = 'sqlite'
+
+
+def result_resource_name(result_type: str) -> str:
+    return f'{result_type}.json'
+
+
+def _write_atomically(path: str, payload: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary_path = f'{path}.{uuid4().hex}.tmp'
+    with open(temporary_path, "wb") as f:
+        f.write(payload)
+    os.replace(temporary_path, path)
+
+
+def _read_file(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class FileResultsStore:
+
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 codec: ResultsCodec,
+                 pack_store: Optional[PackStore] = None):
+        self.__layout = layout
+        self.__codec = codec
+        self.__pack_store = pack_store
+
+    def save(self, key: ResultKey, content: dict) -> int:
+        payload = self.__codec.encode(content=content)
+        _write_atomically(path=self.__result_path(key=key), payload=payload)
+        return len(payload)
+
+    def load(self,
+             resource_identifier: str,
+             requester_login: str,
+             resources_types: List[str]
+             ) -> StoredResults:
+        stored_results = {}
+        for resource_type in resources_types:
+            payload = self.__read_payload(
+                key=(resource_identifier, requester_login, resource_type)
+            )
+            if payload is None:
+                continue
+            try:
+                stored_results[resource_type] = \
+                    self.__codec.decode(payload=payload), len(payload)
+            except Exception:
+                continue
+        return stored_results
+
+    def copy(self, source_key: ResultKey, target_key: ResultKey
+             ) -> Optional[int]:
+        target_path = self.__result_path(key=target_key)
+        try:
+            link_or_copy(
+                source_path=self.__result_path(key=source_key),
+                target_path=target_path
+            )
+        except FileNotFoundError:
+            payload = self.__read_payload(key=source_key)
+            if payload is None:
+                return None
+            _write_atomically(path=target_path, payload=payload)
+        return os.path.getsize(target_path)
+
+    def remove(self, key: ResultKey) -> None:
+        try:
+            os.remove(self.__result_path(key=key))
+        except FileNotFoundError:
+            pass
+
+    def __read_payload(self, key: ResultKey) -> Optional[bytes]:
+        resource_identifier, requester_login, result_type = key
+        resources_dir = self.__layout.resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        resource_name = result_resource_name(result_type=result_type)
+        payload = _read_file(path=os.path.join(resources_dir, resource_name))
+        if payload is not None:
+            return payload
+        alternate_dir = self.__layout.alternate_resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resources_dir=resources_dir
+        )
+        if alternate_dir is not None:
+            payload = _read_file(
+                path=os.path.join(alternate_dir, resource_name)
+            )
+        if payload is not None:
+            return payload
+        return self.__read_packed_payload(key=key)
+
+    def __read_packed_payload(self, key: ResultKey) -> Optional[bytes]:
+        if self.__pack_store is None:
+            return None
+        resource_identifier, requester_login, result_type = key
+        return self.__pack_store.read(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resource_name=result_resource_name(result_type=result_type)
+        )
+
+    def __result_path(self, key: ResultKey) -> str:
+        resource_identifier, requester_login, result_type = key
+        return os.path.join(
+            self.__layout.resources_dir(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login
+            ),
+            result_resource_name(result_type=result_type)
+        )
+
+
+@dataclass
+class PendingWrite:
+    statement: str
+    parameters: tuple
+    completed: Event = field(default_factory=Event)
+    error: Optional[Exception] = None
+
+
+class SQLiteResultsStore:
+
+    def __init__(self,
+                 db_path: str,
+                 commit_batch_size: int,
+                 codec: ResultsCodec):
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.__codec = codec
+        self.__commit_batch_size = commit_batch_size
+        self.__pending_writes = Queue()
+        self.__write_connection = self.__connect(db_path=db_path)
+        self.__initialize_schema()
+        self.__read_connection = self.__connect(db_path=db_path)
+        self.__read_lock = Lock()
+        self.__writer = Thread(target=self.__write_batches, daemon=True)
+        self.__writer.start()
+
+    def save(self, key: ResultKey, content: dict) -> int:
+        payload = self.__codec.encode(content=content)
+        self.__write(
+            statement="INSERT OR REPLACE INTO results "
+                      "(resource_identifier, requester_login, result_type, "
+                      "content) VALUES (?, ?, ?, ?)",
+            parameters=(*key, payload)
+        )
+        return len(payload)
+
+    def load(self,
+             resource_identifier: str,
+             requester_login: str,
+             resources_types: List[str]
+             ) -> StoredResults:
+        with self.__read_lock:
+            rows = self.__read_connection.execute(
+                "SELECT result_type, content FROM results "
+                "WHERE resource_identifier = ? AND requester_login = ?",
+                (resource_identifier, requester_login)
+            ).fetchall()
+        stored_results = {}
+        for result_type, payload in rows:
+            if result_type not in resources_types:
+                continue
+            if isinstance(payload, str):
+                payload = payload.encode('utf-8')
+            stored_results[result_type] = \
+                self.__codec.decode(payload=payload), len(payload)
+        return stored_results
+
+    def copy(self, source_key: ResultKey, target_key: ResultKey
+             ) -> Optional[int]:
+        source_identifier, source_login, result_type = source_key
+        stored_results = self.load(
+            resource_identifier=source_identifier,
+            requester_login=source_login,
+            resources_types=[result_type]
+        )
+        if result_type not in stored_results:
+            return None
+        content, _ = stored_results[result_type]
+        return self.save(key=target_key, content=content)
+
+    def remove(self, key: ResultKey) -> None:
+        self.__write(
+            statement="DELETE FROM results WHERE resource_identifier = ? "
+                      "AND requester_login = ? AND result_type = ?",
+            parameters=key
+        )
+
+    def __write(self, statement: str, parameters: tuple) -> None:
+        pending_write = PendingWrite(statement=statement, parameters=parameters)
+        self.__pending_writes.put(pending_write)
+        pending_write.completed.wait()
+        if pending_write.error is not None:
+            raise pending_write.error
+
+    def __write_batches(self) -> None:
+        while True:
+            batch = [self.__pending_writes.get()]
+            while len(batch) < self.__commit_batch_size:
+                try:
+                    batch.append(self.__pending_writes.get_nowait())
+                except Empty:
+                    break
+            error = self.__commit_batch(batch=batch)
+            for pending_write in batch:
+                pending_write.error = error
+                pending_write.completed.set()
+
+    def __commit_batch(self, batch: List[PendingWrite]
+                       ) -> Optional[Exception]:
+        try:
+            self.__write_connection.execute("BEGIN")
+            for pending_write in batch:
+                self.__write_connection.execute(
+                    pending_write.statement, pending_write.parameters
+                )
+            self.__write_connection.execute("COMMIT")
+            return None
+        except sqlite3.Error as e:
+            logging.error(f'Results batch commit failed: {e}')
+            if self.__write_connection.in_transaction:
+                self.__write_connection.execute("ROLLBACK")
+            return e
+
+    def __connect(self, db_path: str) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            db_path, check_same_thread=False, isolation_level=None
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def __initialize_schema(self) -> None:
+        self.__write_connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "resource_identifier TEXT NOT NULL, "
+            "requester_login TEXT NOT NULL, "
+            "result_type TEXT NOT NULL, "
+            "content BLOB NOT NULL, "
+            "PRIMARY KEY "
+            "(resource_identifier, requester_login, result_type)"
+            ") WITHOUT ROWID"
+        )
+
+
+ResultsStore = Union[FileResultsStore, SQLiteResultsStore]
+
+
+def create_results_store(engine: str,
+                         layout: PersistenceLayout,
+                         db_path: str,
+                         commit_batch_size: int,
+                         codec: ResultsCodec,
+                         pack_store: Optional[PackStore] = None
+                         ) -> ResultsStore:
+    if engine == FILES_ENGINE:
+        return FileResultsStore(
+            layout=layout,
+            codec=codec,
+            pack_store=pack_store
+        )
+    if engine == SQLITE_ENGINE:
+        return SQLiteResultsStore(
+            db_path=db_path,
+            commit_batch_size=commit_batch_size,
+            codec=codec
+        )
+    raise ValueError(f'Unknown results storage engine: {engine}.')
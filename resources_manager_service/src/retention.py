@@ -0,0 +1,294 @@
+import logging
+import os
+import shutil
+import time
+from threading import Thread, Lock
+from typing import List, Optional, Set
+
+from .cache import ResultsCache
+from .content_store import ContentAddressedStore
+from .derivatives import DerivativesCache, derivatives_dir
+from .index import ResourcesIndex, StoredResource
+from .layout import PersistenceLayout
+from .packs import PackStore
+from .results_store import ResultsStore
+from .staging import InputStagingArea
+
+INPUT_IMAGE_PATTERN = 'input.*'
+RESULTS_PATTERN = '*.json'
+
+
+class ResourcesEvictor:
+
+    def __init__(self,
+                 layout: PersistenceLayout,
+                 resources_index: ResourcesIndex,
+                 content_store: ContentAddressedStore,
+                 results_store: ResultsStore,
+                 results_cache: ResultsCache,
+                 input_images_names: Set[str],
+                 input_staging: Optional[InputStagingArea] = None,
+                 pack_store: Optional[PackStore] = None,
+                 derivatives_cache: Optional[DerivativesCache] = None):
+        self.__layout = layout
+        self.__resources_index = resources_index
+        self.__content_store = content_store
+        self.__results_store = results_store
+        self.__results_cache = results_cache
+        self.__input_images_names = input_images_names
+        self.__input_staging = input_staging
+        self.__pack_store = pack_store
+        self.__derivatives_cache = derivatives_cache
+
+    def evict_request(self,
+                      resource_identifier: str,
+                      requester_login: str
+                      ) -> List[StoredResource]:
+        stored_resources = self.__resources_index.find_request_resources(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if len(stored_resources) == 0:
+            self.__resources_index.remove_request(
+                resource_identifier=resource_identifier,
+                requester_login=requester_login
+            )
+        for stored_resource in stored_resources:
+            self.evict_resource(stored_resource=stored_resource)
+        return stored_resources
+
+    def evict_resource(self, stored_resource: StoredResource) -> None:
+        resources_dir = self.__layout.resources_dir(
+            resource_identifier=stored_resource.resource_identifier,
+            requester_login=stored_resource.requester_login
+        )
+        packed = self.__pack_store is not None and self.__pack_store.remove(
+            resource_identifier=stored_resource.resource_identifier,
+            requester_login=stored_resource.requester_login,
+            resource_name=stored_resource.resource_name
+        )
+        if stored_resource.resource_name in self.__input_images_names:
+            self.__remove_input_image(
+                stored_resource=stored_resource,
+                resources_dir=resources_dir,
+                packed=packed
+            )
+        else:
+            self.__remove_result(
+                stored_resource=stored_resource,
+                resources_dir=resources_dir
+            )
+        self.__resources_index.remove_resource(
+            resource_identifier=stored_resource.resource_identifier,
+            requester_login=stored_resource.requester_login,
+            resource_name=stored_resource.resource_name
+        )
+        remaining_resources = self.__resources_index.find_request_resources(
+            resource_identifier=stored_resource.resource_identifier,
+            requester_login=stored_resource.requester_login
+        )
+        if len(remaining_resources) == 0:
+            self.__resources_index.remove_request(
+                resource_identifier=stored_resource.resource_identifier,
+                requester_login=stored_resource.requester_login
+            )
+            self.__remove_empty_directories(resources_dir=resources_dir)
+
+    def __remove_input_image(self,
+                             stored_resource: StoredResource,
+                             resources_dir: str,
+                             packed: bool
+                             ) -> None:
+        try:
+            os.remove(
+                os.path.join(resources_dir, stored_resource.resource_name)
+            )
+        except FileNotFoundError:
+            pass
+        self.__remove_derivatives(resources_dir=resources_dir)
+        if self.__input_staging is not None:
+            self.__input_staging.discard(
+                key=(
+                    stored_resource.resource_identifier,
+                    stored_resource.requester_login
+                )
+            )
+        if packed:
+            return None
+        digest = self.__resources_index.get_input_digest(
+            resource_identifier=stored_resource.resource_identifier,
+            requester_login=stored_resource.requester_login
+        )
+        if digest is not None:
+            self.__content_store.release(digest=digest)
+
+    def __remove_result(self,
+                        stored_resource: StoredResource,
+                        resources_dir: str
+                        ) -> None:
+        result_type, _ = os.path.splitext(stored_resource.resource_name)
+        key = (
+            stored_resource.resource_identifier,
+            stored_resource.requester_login,
+            result_type
+        )
+        self.__results_store.remove(key=key)
+        self.__results_cache.invalidate(key=key)
+        if not self.__holds_input_image(stored_resource=stored_resource):
+            self.__remove_empty_directories(resources_dir=resources_dir)
+
+    def __holds_input_image(self, stored_resource: StoredResource) -> bool:
+        stored_resources = self.__resources_index.find_request_resources(
+            resource_identifier=stored_resource.resource_identifier,
+            requester_login=stored_resource.requester_login
+        )
+        return any(
+            resource.resource_name in self.__input_images_names
+            for resource in stored_resources
+        )
+
+    def __remove_derivatives(self, resources_dir: str) -> None:
+        if self.__derivatives_cache is not None:
+            self.__derivatives_cache.discard(resources_dir=resources_dir)
+            return None
+        shutil.rmtree(
+            derivatives_dir(resources_dir=resources_dir),
+            ignore_errors=True
+        )
+
+    def __remove_empty_directories(self, resources_dir: str) -> None:
+        self.__remove_derivatives(resources_dir=resources_dir)
+        try:
+            os.rmdir(resources_dir)
+            os.rmdir(os.path.dirname(resources_dir))
+        except OSError:
+            pass
+
+
+class RetentionSweeper(Thread):
+
+    def __init__(self,
+                 resources_index: ResourcesIndex,
+                 resources_evictor: ResourcesEvictor,
+                 input_staging: Optional[InputStagingArea],
+                 input_images_ttl: Optional[float],
+                 results_ttl: Optional[float],
+                 disk_budget: Optional[int],
+                 sweep_interval: float,
+                 batch_size: int,
+                 max_deletions_per_second: float):
+        super().__init__(daemon=True)
+        self.__resources_index = resources_index
+        self.__resources_evictor = resources_evictor
+        self.__input_staging = input_staging
+        self.__input_images_ttl = input_images_ttl
+        self.__results_ttl = results_ttl
+        self.__disk_budget = disk_budget
+        self.__sweep_interval = sweep_interval
+        self.__batch_size = batch_size
+        self.__deletion_pause = 1.0 / max_deletions_per_second
+        self.__stats_lock = Lock()
+        self.__bytes_reclaimed = 0
+        self.__entries_reclaimed = 0
+        self.__sweeps_completed = 0
+
+    @property
+    def stats(self) -> dict:
+        with self.__stats_lock:
+            return {
+                'bytes_reclaimed': self.__bytes_reclaimed,
+                'entries_reclaimed': self.__entries_reclaimed,
+                'sweeps_completed': self.__sweeps_completed
+            }
+
+    def run(self) -> None:
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                logging.error(f'Retention sweep failed: {e}')
+            time.sleep(self.__sweep_interval)
+
+    def sweep(self) -> None:
+        now = time.time()
+        if self.__input_images_ttl is not None:
+            self.__evict_expired(
+                created_before=now - self.__input_images_ttl,
+                name_pattern=INPUT_IMAGE_PATTERN
+            )
+        if self.__results_ttl is not None:
+            self.__evict_expired(
+                created_before=now - self.__results_ttl,
+                name_pattern=RESULTS_PATTERN
+            )
+        if self.__disk_budget is not None:
+            self.__enforce_disk_budget()
+        with self.__stats_lock:
+            self.__sweeps_completed += 1
+
+    def __evict_expired(self,
+                        created_before: float,
+                        name_pattern: str
+                        ) -> None:
+        while True:
+            expired = self.__resources_index.find_resources_created_before(
+                created_before=created_before,
+                name_pattern=name_pattern,
+                limit=self.__batch_size
+            )
+            for stored_resource in expired:
+                self.__evict_resource(stored_resource=stored_resource)
+            if len(expired) < self.__batch_size:
+                break
+
+    def __enforce_disk_budget(self) -> None:
+        while True:
+            stored_bytes = self.__physical_bytes()
+            if stored_bytes <= self.__disk_budget:
+                break
+            oldest_requests = self.__resources_index.find_resources(
+                range_start=0.0,
+                range_end=float('inf'),
+                limit=self.__batch_size
+            )
+            if len(oldest_requests) == 0:
+                break
+            for indexed_resource in oldest_requests:
+                stored_bytes -= self.__evict_request(
+                    resource_identifier=indexed_resource.resource_identifier,
+                    requester_login=indexed_resource.requester_login
+                )
+                if stored_bytes <= self.__disk_budget:
+                    break
+
+    def __physical_bytes(self) -> int:
+        stored_bytes = self.__resources_index.physical_bytes(
+            input_name_pattern=INPUT_IMAGE_PATTERN
+        )
+        if self.__input_staging is not None:
+            stored_bytes += self.__input_staging.pending_bytes
+        return stored_bytes
+
+    def __evict_request(self,
+                        resource_identifier: str,
+                        requester_login: str
+                        ) -> int:
+        stored_resources = self.__resources_evictor.evict_request(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        for stored_resource in stored_resources:
+            self.__record_eviction(stored_resource=stored_resource)
+        return sum(r.size for r in stored_resources)
+
+    def __evict_resource(self, stored_resource: StoredResource) -> None:
+        self.__resources_evictor.evict_resource(
+            stored_resource=stored_resource
+        )
+        self.__record_eviction(stored_resource=stored_resource)
+
+    def __record_eviction(self, stored_resource: StoredResource) -> None:
+        with self.__stats_lock:
+            self.__bytes_reclaimed += stored_resource.size
+            self.__entries_reclaimed += 1
+        time.sleep(self.__deletion_pause)
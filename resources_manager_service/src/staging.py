@@ -0,0 +1,148 @@
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from queue import Queue
+from threading import Thread, Lock, Timer
+from typing import Optional
+
+from .content_store import ContentAddressedStore
+from .index import ResourcesIndex
+from .notifications import RequestKey
+
+
+@dataclass
+class StagedInput:
+    resource_identifier: str
+    requester_login: str
+    resources_dir: str
+    input_image_name: str
+    content: bytes
+    flushed: bool = False
+    digest: Optional[str] = None
+    flush_attempts: int = 0
+
+    @property
+    def key(self) -> RequestKey:
+        return self.resource_identifier, self.requester_login
+
+
+class InputStagingArea(Thread):
+
+    def __init__(self,
+                 content_store: ContentAddressedStore,
+                 resources_index: ResourcesIndex,
+                 max_bytes: int,
+                 durability: str,
+                 retry_backoff: float,
+                 max_retry_backoff: float):
+        super().__init__(daemon=True)
+        self.__content_store = content_store
+        self.__resources_index = resources_index
+        self.__max_bytes = max_bytes
+        self.__durability = durability
+        self.__retry_backoff = retry_backoff
+        self.__max_retry_backoff = max_retry_backoff
+        self.__lock = Lock()
+        self.__entries = OrderedDict()
+        self.__current_bytes = 0
+        self.__pending_inputs = Queue()
+
+    @property
+    def pending_bytes(self) -> int:
+        with self.__lock:
+            return sum(
+                len(entry.content) for entry in self.__entries.values()
+                if not entry.flushed
+            )
+
+    def stage(self, staged_input: StagedInput) -> None:
+        if not self.__reserve(staged_input=staged_input):
+            self.__persist(staged_input=staged_input)
+            return None
+        self.__pending_inputs.put(staged_input)
+
+    def get(self, key: RequestKey) -> Optional[StagedInput]:
+        with self.__lock:
+            staged_input = self.__entries.get(key)
+            if staged_input is not None:
+                self.__entries.move_to_end(key)
+            return staged_input
+
+    def discard(self, key: RequestKey) -> None:
+        with self.__lock:
+            staged_input = self.__entries.get(key)
+            if staged_input is not None and staged_input.flushed:
+                self.__remove(key=key)
+
+    def run(self) -> None:
+        while True:
+            staged_input = self.__pending_inputs.get()
+            try:
+                self.__persist(staged_input=staged_input)
+            except Exception as e:
+                self.__schedule_retry(staged_input=staged_input, error=e)
+                continue
+            with self.__lock:
+                staged_input.flushed = True
+
+    def __schedule_retry(self,
+                         staged_input: StagedInput,
+                         error: Exception
+                         ) -> None:
+        staged_input.flush_attempts += 1
+        delay = min(
+            self.__retry_backoff * 2 ** (staged_input.flush_attempts - 1),
+            self.__max_retry_backoff
+        )
+        logging.error(
+            f'Could not flush staged input '
+            f'{staged_input.resource_identifier} '
+            f'(attempt {staged_input.flush_attempts}), '
+            f'retrying in {delay}s: {error}'
+        )
+        retry = Timer(delay, self.__pending_inputs.put, args=(staged_input, ))
+        retry.daemon = True
+        retry.start()
+
+    def __reserve(self, staged_input: StagedInput) -> bool:
+        size = len(staged_input.content)
+        with self.__lock:
+            flushed_keys = [
+                key for key, entry in self.__entries.items() if entry.flushed
+            ]
+            for key in flushed_keys:
+                if self.__current_bytes + size <= self.__max_bytes:
+                    break
+                self.__remove(key=key)
+            if self.__current_bytes + size > self.__max_bytes:
+                return False
+            self.__entries[staged_input.key] = staged_input
+            self.__current_bytes += size
+            return True
+
+    def __persist(self, staged_input: StagedInput) -> None:
+        if staged_input.digest is None:
+            staged_input.digest = self.__content_store.persist(
+                chunks=[staged_input.content],
+                target_path=os.path.join(
+                    staged_input.resources_dir, staged_input.input_image_name
+                ),
+                durability=self.__durability
+            )
+        self.__resources_index.register_resource(
+            resource_identifier=staged_input.resource_identifier,
+            requester_login=staged_input.requester_login,
+            resource_name=staged_input.input_image_name,
+            size=len(staged_input.content)
+        )
+        self.__resources_index.register_input_digest(
+            resource_identifier=staged_input.resource_identifier,
+            requester_login=staged_input.requester_login,
+            digest=staged_input.digest
+        )
+
+    def __remove(self, key: RequestKey) -> None:
+        staged_input = self.__entries.pop(key, None)
+        if staged_input is not None:
+            self.__current_bytes -= len(staged_input.content)
@@ -0,0 +1,13 @@
+import os
+
+for name, value in {
+    'SERVER_IDENTITY_SERVICE_HOST': 'https://localhost',
+    'SERVER_IDENTITY_SERVICE_PORT': '5000',
+    'SERVER_IDENTITY_SERVICE_PATH': 'v1/server_identity_service/login',
+    'DISCOVERY_SERVICE_HOST': 'https://localhost',
+    'DISCOVERY_SERVICE_PORT': '5001',
+    'DISCOVERY_SERVICE_PATH': 'v1/discovery_service/discover',
+    'RESOURCES_MANAGER_SERVICE_NAME': 'resources_manager_service',
+    'RESOURCES_MANAGER_SERVICE_SECRET': 'secret'
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,75 @@
+import os
+
+from src.derivatives import DerivativesCache, derivatives_dir
+from src.images import ImageTransform
+from src.layout import PersistenceLayout
+
+
+def _transform(max_dimension: int) -> ImageTransform:
+    return ImageTransform(
+        max_dimension=max_dimension,
+        crop=None,
+        image_format='jpeg',
+        quality=None
+    )
+
+
+def _create_layout(tmp_path) -> PersistenceLayout:
+    return PersistenceLayout(
+        persistence_dir=str(tmp_path),
+        shard_levels=2,
+        shard_width=2
+    )
+
+
+def test_restore_bounds_derivatives_left_by_previous_run(tmp_path):
+    layout = _create_layout(tmp_path=tmp_path)
+    previous_cache = DerivativesCache(max_bytes=1024)
+    derivatives_paths = []
+    for position, resource_identifier in enumerate(('aa000000', 'bb000000')):
+        derivative_path = previous_cache.put(
+            resources_dir=layout.resources_dir(
+                resource_identifier=resource_identifier,
+                requester_login='alice'
+            ),
+            transform=_transform(max_dimension=64),
+            content=b'x' * 100
+        )
+        os.utime(derivative_path, (position, position))
+        derivatives_paths.append(derivative_path)
+
+    derivatives_cache = DerivativesCache(max_bytes=150)
+    derivatives_cache.restore(layout=layout)
+
+    assert not os.path.exists(derivatives_paths[0])
+    assert os.path.exists(derivatives_paths[1])
+
+
+def test_discard_releases_tracked_bytes(tmp_path):
+    layout = _create_layout(tmp_path=tmp_path)
+    derivatives_cache = DerivativesCache(max_bytes=200)
+    resources_dirs = [
+        layout.resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login='alice'
+        )
+        for resource_identifier in ('aa000000', 'bb000000', 'cc000000')
+    ]
+    derivatives_paths = [
+        derivatives_cache.put(
+            resources_dir=resources_dir,
+            transform=_transform(max_dimension=64),
+            content=b'x' * 100
+        )
+        for resources_dir in resources_dirs[:2]
+    ]
+
+    derivatives_cache.discard(resources_dir=resources_dirs[1])
+    derivatives_cache.put(
+        resources_dir=resources_dirs[2],
+        transform=_transform(max_dimension=64),
+        content=b'x' * 100
+    )
+
+    assert not os.path.exists(derivatives_dir(resources_dir=resources_dirs[1]))
+    assert os.path.exists(derivatives_paths[0])
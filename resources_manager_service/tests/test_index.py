@@ -0,0 +1,64 @@
+from src.index import ResourcesIndex
+
+
+def _create_index(tmp_path) -> ResourcesIndex:
+    resources_index = ResourcesIndex(db_path=str(tmp_path / 'index.db'))
+    for position, requester_login in enumerate(['alice', 'bob'] * 5):
+        resource_identifier = f'{position:08d}'
+        resources_index.register_request(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            created_at=float(position)
+        )
+        resources_index.register_resource(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login,
+            resource_name='input.jpeg',
+            size=10
+        )
+    return resources_index
+
+
+def test_find_resources_paginates_in_creation_order(tmp_path):
+    resources_index = _create_index(tmp_path=tmp_path)
+    pages, start_after = [], None
+    while True:
+        page = resources_index.find_resources(
+            range_start=0.5,
+            range_end=8.5,
+            start_after=start_after,
+            limit=3
+        )
+        if len(page) == 0:
+            break
+        pages.append([found.resource_identifier for found in page])
+        start_after = page[-1].position
+
+    assert pages == [
+        ['00000001', '00000002', '00000003'],
+        ['00000004', '00000005', '00000006'],
+        ['00000007', '00000008']
+    ]
+
+
+def test_find_resources_filters_by_login(tmp_path):
+    resources_index = _create_index(tmp_path=tmp_path)
+
+    found = resources_index.find_resources(
+        range_start=-1.0,
+        range_end=100.0,
+        requester_login='bob'
+    )
+
+    assert [f.resource_identifier for f in found] == [
+        '00000001', '00000003', '00000005', '00000007', '00000009'
+    ]
+    assert all(f.resources == ['input.jpeg'] for f in found)
+    assert resources_index.get_login_usage(
+        requester_login='bob'
+    ).to_dict() == {
+        'requester_login': 'bob',
+        'stored_bytes': 50,
+        'resources_count': 5,
+        'requests_count': 5
+    }
@@ -0,0 +1,131 @@
+import os
+
+from src.cache import ResultsCache
+from src.layout import PersistenceLayout
+from src.migrate_layout import _migrate_request
+from src.resources import locate_input_image
+from src.results import IntermediateResultsLoader
+from src.results_codec import ResultsCodec
+from src.results_store import FileResultsStore
+
+RESOURCE_IDENTIFIER = '0123abcd-0000-0000-0000-000000000000'
+REQUESTER_LOGIN = 'alice'
+
+
+class MigratingLayout(PersistenceLayout):
+
+    def __init__(self, persistence_dir: str):
+        super().__init__(
+            persistence_dir=persistence_dir,
+            shard_levels=2,
+            shard_width=2
+        )
+        self.migrations_pending = 1
+
+    def resources_dir(self,
+                      resource_identifier: str,
+                      requester_login: str
+                      ) -> str:
+        resources_dir = super().resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=requester_login
+        )
+        if self.migrations_pending > 0:
+            self.migrations_pending -= 1
+            for request_entry in self.iterate_legacy_requests():
+                _migrate_request(layout=self, request_entry=request_entry)
+        return resources_dir
+
+
+def _create_legacy_request(layout: PersistenceLayout,
+                           resources: dict
+                           ) -> str:
+    legacy_dir = os.path.join(
+        layout.legacy_request_dir(resource_identifier=RESOURCE_IDENTIFIER),
+        REQUESTER_LOGIN
+    )
+    os.makedirs(legacy_dir)
+    for resource_name, content in resources.items():
+        with open(os.path.join(legacy_dir, resource_name), 'wb') as f:
+            f.write(content)
+    return legacy_dir
+
+
+def test_resources_dir_falls_back_to_legacy_layout(tmp_path):
+    layout = PersistenceLayout(
+        persistence_dir=str(tmp_path),
+        shard_levels=2,
+        shard_width=2
+    )
+    legacy_dir = _create_legacy_request(layout=layout, resources={})
+    sharded_dir = os.path.join(
+        str(tmp_path), '01', '23', RESOURCE_IDENTIFIER, REQUESTER_LOGIN
+    )
+    assert layout.resources_dir(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN
+    ) == legacy_dir
+    assert layout.alternate_resources_dir(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN,
+        resources_dir=legacy_dir
+    ) is None
+    os.makedirs(os.path.dirname(os.path.dirname(sharded_dir)))
+    os.rename(os.path.dirname(legacy_dir), os.path.dirname(sharded_dir))
+    assert layout.alternate_resources_dir(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN,
+        resources_dir=legacy_dir
+    ) == sharded_dir
+
+
+def test_results_store_reads_result_moved_after_resolve(tmp_path):
+    layout = MigratingLayout(persistence_dir=str(tmp_path))
+    codec = ResultsCodec(encoding='json', compression='none')
+    content = {'people': [[1, 2, 3, 4]]}
+    _create_legacy_request(
+        layout=layout,
+        resources={'people_detection.json': codec.encode(content=content)}
+    )
+    results_store = FileResultsStore(layout=layout, codec=codec)
+    stored_results = results_store.load(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN,
+        resources_types=['people_detection']
+    )
+    assert layout.migrations_pending == 0
+    assert stored_results['people_detection'][0] == content
+
+
+def test_results_loader_finds_request_moved_after_resolve(tmp_path):
+    layout = MigratingLayout(persistence_dir=str(tmp_path))
+    codec = ResultsCodec(encoding='json', compression='none')
+    _create_legacy_request(layout=layout, resources={})
+    results_loader = IntermediateResultsLoader(
+        layout=layout,
+        results_store=FileResultsStore(layout=layout, codec=codec),
+        results_cache=ResultsCache(max_bytes=1024, negative_ttl=1.0)
+    )
+    resources = results_loader.load(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN,
+        resources_types=['people_detection']
+    )
+    assert layout.migrations_pending == 0
+    assert resources == {'people_detection': None}
+
+
+def test_locate_input_image_after_move(tmp_path):
+    layout = MigratingLayout(persistence_dir=str(tmp_path))
+    _create_legacy_request(layout=layout, resources={'input.png': b'png'})
+    resources_dir, input_image_name = locate_input_image(
+        layout=layout,
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN
+    )
+    assert layout.migrations_pending == 0
+    assert input_image_name == 'input.png'
+    assert resources_dir == layout.resources_dir(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN
+    )
@@ -0,0 +1,132 @@
+import os
+
+from src.index import ResourcesIndex
+from src.packs import PackStore
+
+REQUESTER_LOGIN = 'alice'
+
+
+def _create_pack_store(tmp_path, max_pack_bytes: int):
+    resources_index = ResourcesIndex(db_path=str(tmp_path / 'index.db'))
+    pack_store = PackStore(
+        packs_dir=str(tmp_path / 'packs'),
+        resources_index=resources_index,
+        max_pack_bytes=max_pack_bytes
+    )
+    return resources_index, pack_store
+
+
+def _pack_request(resources_index: ResourcesIndex,
+                  pack_store: PackStore,
+                  resource_identifier: str,
+                  content: bytes
+                  ) -> None:
+    resources_index.register_request(
+        resource_identifier=resource_identifier,
+        requester_login=REQUESTER_LOGIN
+    )
+    resources_index.register_resource(
+        resource_identifier=resource_identifier,
+        requester_login=REQUESTER_LOGIN,
+        resource_name='input.jpeg',
+        size=len(content)
+    )
+    pack_store.append(
+        resource_identifier=resource_identifier,
+        requester_login=REQUESTER_LOGIN,
+        resources=[('input.jpeg', content)]
+    )
+
+
+def _remove_request(resources_index: ResourcesIndex,
+                    pack_store: PackStore,
+                    resource_identifier: str
+                    ) -> None:
+    pack_store.remove(
+        resource_identifier=resource_identifier,
+        requester_login=REQUESTER_LOGIN,
+        resource_name='input.jpeg'
+    )
+    resources_index.remove_request(
+        resource_identifier=resource_identifier,
+        requester_login=REQUESTER_LOGIN
+    )
+
+
+def _packs_files(tmp_path) -> list:
+    return sorted(os.listdir(str(tmp_path / 'packs')))
+
+
+def test_stored_bytes_counts_physical_pack_size(tmp_path):
+    resources_index, pack_store = _create_pack_store(
+        tmp_path=tmp_path,
+        max_pack_bytes=1024
+    )
+    for resource_identifier in ('a', 'b'):
+        _pack_request(
+            resources_index=resources_index,
+            pack_store=pack_store,
+            resource_identifier=resource_identifier,
+            content=b'x' * 100
+        )
+    _remove_request(
+        resources_index=resources_index,
+        pack_store=pack_store,
+        resource_identifier='a'
+    )
+
+    assert resources_index.stored_bytes() == 200
+
+
+def test_remove_deletes_pack_without_live_entries(tmp_path):
+    resources_index, pack_store = _create_pack_store(
+        tmp_path=tmp_path,
+        max_pack_bytes=100
+    )
+    for resource_identifier in ('a', 'b'):
+        _pack_request(
+            resources_index=resources_index,
+            pack_store=pack_store,
+            resource_identifier=resource_identifier,
+            content=b'x' * 100
+        )
+    assert len(_packs_files(tmp_path=tmp_path)) == 2
+
+    _remove_request(
+        resources_index=resources_index,
+        pack_store=pack_store,
+        resource_identifier='a'
+    )
+
+    assert len(_packs_files(tmp_path=tmp_path)) == 1
+    assert resources_index.stored_bytes() == 100
+
+
+def test_compact_rewrites_sparse_pack(tmp_path):
+    resources_index, pack_store = _create_pack_store(
+        tmp_path=tmp_path,
+        max_pack_bytes=300
+    )
+    for resource_identifier in ('a', 'b', 'c', 'd'):
+        _pack_request(
+            resources_index=resources_index,
+            pack_store=pack_store,
+            resource_identifier=resource_identifier,
+            content=resource_identifier.encode() * 100
+        )
+    for resource_identifier in ('a', 'b'):
+        _remove_request(
+            resources_index=resources_index,
+            pack_store=pack_store,
+            resource_identifier=resource_identifier
+        )
+
+    assert pack_store.compact(min_live_ratio=0.5) == 1
+    assert len(_packs_files(tmp_path=tmp_path)) == 1
+    assert resources_index.stored_bytes() == 200
+    for resource_identifier in ('c', 'd'):
+        assert pack_store.read(
+            resource_identifier=resource_identifier,
+            requester_login=REQUESTER_LOGIN,
+            resource_name='input.jpeg'
+        ) == resource_identifier.encode() * 100
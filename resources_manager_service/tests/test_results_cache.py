@@ -0,0 +1,87 @@
+import os
+
+from src.cache import ResultsCache
+from src.layout import PersistenceLayout
+from src.results import IntermediateResultsLoader
+
+RESOURCE_IDENTIFIER = '0123abcd-0000-0000-0000-000000000000'
+REQUESTER_LOGIN = 'alice'
+KEY = (RESOURCE_IDENTIFIER, REQUESTER_LOGIN, 'people_detection')
+
+
+class RacingResultsStore:
+
+    def __init__(self, results_cache: ResultsCache, stored_results: dict):
+        self.__results_cache = results_cache
+        self.__stored_results = stored_results
+
+    def load(self,
+             resource_identifier: str,
+             requester_login: str,
+             resources_types: list
+             ) -> dict:
+        self.__results_cache.put(key=KEY, content={'people': [1]}, size=16)
+        return self.__stored_results
+
+
+def _load_with_concurrent_registration(tmp_path, stored_results: dict):
+    layout = PersistenceLayout(
+        persistence_dir=str(tmp_path),
+        shard_levels=2,
+        shard_width=2
+    )
+    os.makedirs(layout.resources_dir(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN
+    ))
+    results_cache = ResultsCache(max_bytes=1024, negative_ttl=60.0)
+    results_loader = IntermediateResultsLoader(
+        layout=layout,
+        results_store=RacingResultsStore(
+            results_cache=results_cache,
+            stored_results=stored_results
+        ),
+        results_cache=results_cache
+    )
+    results_loader.load(
+        resource_identifier=RESOURCE_IDENTIFIER,
+        requester_login=REQUESTER_LOGIN,
+        resources_types=['people_detection']
+    )
+    return results_cache
+
+
+def test_store_miss_does_not_hide_concurrent_registration(tmp_path):
+    results_cache = _load_with_concurrent_registration(
+        tmp_path=tmp_path,
+        stored_results={}
+    )
+
+    assert results_cache.get(key=KEY) == (True, {'people': [1]})
+
+
+def test_stale_load_does_not_overwrite_concurrent_registration(tmp_path):
+    results_cache = _load_with_concurrent_registration(
+        tmp_path=tmp_path,
+        stored_results={'people_detection': ({'people': []}, 16)}
+    )
+
+    assert results_cache.get(key=KEY) == (True, {'people': [1]})
+
+
+def test_put_missing_is_cached_without_concurrent_writes():
+    results_cache = ResultsCache(max_bytes=1024, negative_ttl=60.0)
+
+    results_cache.put_missing(key=KEY, generation=results_cache.generation)
+
+    assert results_cache.get(key=KEY) == (True, None)
+
+
+def test_invalidate_discards_in_flight_put_missing():
+    results_cache = ResultsCache(max_bytes=1024, negative_ttl=60.0)
+    generation = results_cache.generation
+
+    results_cache.invalidate(key=KEY)
+    results_cache.put_missing(key=KEY, generation=generation)
+
+    assert results_cache.get(key=KEY) == (False, None)
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from src.results_codec import ResultsCodec, MAGIC
+
+PEOPLE_RESULTS = {
+    'people': [
+        {
+            'left_top': {'x': 10, 'y': 20},
+            'right_bottom': {'x': 110, 'y': 220}
+        },
+        {
+            'left_top': {'x': 0, 'y': 0},
+            'right_bottom': {'x': 5, 'y': 7}
+        }
+    ]
+}
+AGE_RESULTS = {
+    'age_estimation': [
+        {
+            'bounding_box': {
+                'left_top': {'x': 1, 'y': 2},
+                'right_bottom': {'x': 30, 'y': 40}
+            },
+            'age': 33
+        },
+        {
+            'bounding_box': {
+                'left_top': {'x': 50, 'y': 60},
+                'right_bottom': {'x': 70, 'y': 80}
+            },
+            'age': None
+        }
+    ],
+    'model': 'age_estimator_0.1.0'
+}
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib'])
+@pytest.mark.parametrize('content', [PEOPLE_RESULTS, AGE_RESULTS, {}])
+def test_binary_encoding_round_trip(compression, content):
+    codec = ResultsCodec(encoding='binary', compression=compression)
+
+    payload = codec.encode(content=content)
+
+    assert payload.startswith(MAGIC)
+    assert codec.decode(payload=payload) == content
+
+
+def test_binary_encoding_keeps_irregular_records_as_json():
+    codec = ResultsCodec(encoding='binary', compression='zlib')
+    content = {
+        'faces': [{'x': 1}, {'x': 2, 'y': 3}],
+        'ages': [2 ** 40],
+        'empty': []
+    }
+
+    assert codec.decode(payload=codec.encode(content=content)) == content
+
+
+def test_json_encoding_round_trip():
+    codec = ResultsCodec(encoding='json', compression='none')
+
+    payload = codec.encode(content=AGE_RESULTS)
+
+    assert json.loads(payload) == AGE_RESULTS
+    assert codec.decode(payload=payload) == AGE_RESULTS
+
+
+def test_binary_codec_decodes_legacy_json_payloads():
+    codec = ResultsCodec(encoding='binary', compression='zlib')
+
+    payload = json.dumps(PEOPLE_RESULTS).encode('utf-8')
+
+    assert codec.decode(payload=payload) == PEOPLE_RESULTS
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        ResultsCodec(encoding='xml', compression='none')
@@ -0,0 +1,250 @@
+import os
+
+from src.cache import ResultsCache
+from src.content_store import ContentAddressedStore
+from src.derivatives import DerivativesCache, derivatives_dir
+from src.images import ImageTransform
+from src.index import ResourcesIndex, StoredResource
+from src.layout import PersistenceLayout
+from src.packs import PackStore, ColdTierCompactor
+from src.results_codec import ResultsCodec
+from src.results_store import FileResultsStore, result_resource_name
+from src.retention import ResourcesEvictor, RetentionSweeper, \
+    INPUT_IMAGE_PATTERN
+
+REQUESTER_LOGIN = 'alice'
+INPUT_IMAGE_NAME = 'input.jpeg'
+COMPLETION_MARKER = result_resource_name(result_type='age_estimation')
+
+
+class Storage:
+
+    def __init__(self, persistence_dir: str, max_pack_bytes: int):
+        self.layout = PersistenceLayout(
+            persistence_dir=persistence_dir,
+            shard_levels=2,
+            shard_width=2
+        )
+        self.resources_index = ResourcesIndex(
+            db_path=os.path.join(persistence_dir, 'index.db')
+        )
+        self.content_store = ContentAddressedStore(
+            objects_dir=os.path.join(persistence_dir, '_objects'),
+            resources_index=self.resources_index,
+            shard_width=2
+        )
+        self.pack_store = PackStore(
+            packs_dir=os.path.join(persistence_dir, '_packs'),
+            resources_index=self.resources_index,
+            max_pack_bytes=max_pack_bytes
+        )
+        self.results_store = FileResultsStore(
+            layout=self.layout,
+            codec=ResultsCodec(encoding='json', compression='none'),
+            pack_store=self.pack_store
+        )
+        self.compactor = ColdTierCompactor(
+            layout=self.layout,
+            resources_index=self.resources_index,
+            content_store=self.content_store,
+            pack_store=self.pack_store,
+            input_images_names={INPUT_IMAGE_NAME},
+            completion_marker=COMPLETION_MARKER,
+            cold_age=0.0,
+            compaction_interval=60.0,
+            batch_size=10,
+            min_live_ratio=0.5
+        )
+        self.derivatives_cache = DerivativesCache(max_bytes=1024 ** 2)
+        self.resources_evictor = ResourcesEvictor(
+            layout=self.layout,
+            resources_index=self.resources_index,
+            content_store=self.content_store,
+            results_store=self.results_store,
+            results_cache=ResultsCache(max_bytes=1024, negative_ttl=1.0),
+            input_images_names={INPUT_IMAGE_NAME},
+            pack_store=self.pack_store,
+            derivatives_cache=self.derivatives_cache
+        )
+
+    def register(self, resource_identifier: str, content: bytes) -> None:
+        resources_dir = self.layout.resources_dir(
+            resource_identifier=resource_identifier,
+            requester_login=REQUESTER_LOGIN
+        )
+        digest = self.content_store.persist(
+            chunks=[content],
+            target_path=os.path.join(resources_dir, INPUT_IMAGE_NAME)
+        )
+        self.resources_index.register_request(
+            resource_identifier=resource_identifier,
+            requester_login=REQUESTER_LOGIN
+        )
+        self.resources_index.register_resource(
+            resource_identifier=resource_identifier,
+            requester_login=REQUESTER_LOGIN,
+            resource_name=INPUT_IMAGE_NAME,
+            size=len(content)
+        )
+        self.resources_index.register_input_digest(
+            resource_identifier=resource_identifier,
+            requester_login=REQUESTER_LOGIN,
+            digest=digest
+        )
+        size = self.results_store.save(
+            key=(resource_identifier, REQUESTER_LOGIN, 'age_estimation'),
+            content={'age': resource_identifier}
+        )
+        self.resources_index.register_resource(
+            resource_identifier=resource_identifier,
+            requester_login=REQUESTER_LOGIN,
+            resource_name=COMPLETION_MARKER,
+            size=size
+        )
+
+    def physical_bytes(self) -> int:
+        files_sizes = {}
+        persistence_dir = self.layout.persistence_dir
+        for directory, _, files_names in os.walk(persistence_dir):
+            for file_name in files_names:
+                if file_name.startswith('index.db'):
+                    continue
+                stat = os.stat(os.path.join(directory, file_name))
+                files_sizes[stat.st_ino] = stat.st_size
+        return sum(files_sizes.values())
+
+    def create_sweeper(self, disk_budget: int) -> RetentionSweeper:
+        return RetentionSweeper(
+            resources_index=self.resources_index,
+            resources_evictor=self.resources_evictor,
+            input_staging=None,
+            input_images_ttl=None,
+            results_ttl=None,
+            disk_budget=disk_budget,
+            sweep_interval=60.0,
+            batch_size=2,
+            max_deletions_per_second=1e9
+        )
+
+
+def test_physical_bytes_match_files_on_disk(tmp_path):
+    storage = Storage(persistence_dir=str(tmp_path), max_pack_bytes=4096)
+    storage.register(resource_identifier='aa000000', content=b'x' * 1000)
+    storage.register(resource_identifier='bb000000', content=b'x' * 1000)
+    storage.register(resource_identifier='cc000000', content=b'y' * 1000)
+    storage.compactor.pack_request(
+        resource_identifier='cc000000',
+        requester_login=REQUESTER_LOGIN
+    )
+
+    assert storage.resources_index.physical_bytes(
+        input_name_pattern=INPUT_IMAGE_PATTERN
+    ) == storage.physical_bytes()
+
+
+def test_disk_budget_evicts_packed_requests(tmp_path):
+    storage = Storage(persistence_dir=str(tmp_path), max_pack_bytes=2048)
+    resources_identifiers = [f'{i:02d}000000' for i in range(8)]
+    for resource_identifier in resources_identifiers:
+        storage.register(
+            resource_identifier=resource_identifier,
+            content=resource_identifier.encode() * 128
+        )
+    storage.compactor.compact()
+    assert storage.physical_bytes() > 5000
+
+    storage.create_sweeper(disk_budget=5000).sweep()
+
+    assert storage.physical_bytes() <= 5000
+    assert storage.resources_index.physical_bytes(
+        input_name_pattern=INPUT_IMAGE_PATTERN
+    ) == storage.physical_bytes()
+    assert storage.pack_store.read(
+        resource_identifier=resources_identifiers[-1],
+        requester_login=REQUESTER_LOGIN,
+        resource_name=INPUT_IMAGE_NAME
+    ) == resources_identifiers[-1].encode() * 128
+
+
+def test_evicting_input_image_removes_derivatives(tmp_path):
+    storage = Storage(persistence_dir=str(tmp_path), max_pack_bytes=4096)
+    storage.register(resource_identifier='aa000000', content=b'x' * 1000)
+    resources_dir = storage.layout.resources_dir(
+        resource_identifier='aa000000',
+        requester_login=REQUESTER_LOGIN
+    )
+    storage.derivatives_cache.put(
+        resources_dir=resources_dir,
+        transform=ImageTransform(
+            max_dimension=64,
+            crop=None,
+            image_format='jpeg',
+            quality=None
+        ),
+        content=b'y' * 100
+    )
+
+    storage.resources_evictor.evict_resource(
+        stored_resource=StoredResource(
+            resource_identifier='aa000000',
+            requester_login=REQUESTER_LOGIN,
+            resource_name=INPUT_IMAGE_NAME,
+            size=1000
+        )
+    )
+
+    assert not os.path.exists(derivatives_dir(resources_dir=resources_dir))
+    assert storage.resources_index.physical_bytes(
+        input_name_pattern=INPUT_IMAGE_PATTERN
+    ) == storage.physical_bytes()
+
+
+def test_evicting_result_without_input_image_removes_derivatives(tmp_path):
+    storage = Storage(persistence_dir=str(tmp_path), max_pack_bytes=4096)
+    storage.register(resource_identifier='aa000000', content=b'x' * 1000)
+    size = storage.results_store.save(
+        key=('aa000000', REQUESTER_LOGIN, 'people_detection'),
+        content={'people': []}
+    )
+    storage.resources_index.register_resource(
+        resource_identifier='aa000000',
+        requester_login=REQUESTER_LOGIN,
+        resource_name=result_resource_name(result_type='people_detection'),
+        size=size
+    )
+    resources_dir = storage.layout.resources_dir(
+        resource_identifier='aa000000',
+        requester_login=REQUESTER_LOGIN
+    )
+    storage.resources_evictor.evict_resource(
+        stored_resource=StoredResource(
+            resource_identifier='aa000000',
+            requester_login=REQUESTER_LOGIN,
+            resource_name=INPUT_IMAGE_NAME,
+            size=1000
+        )
+    )
+    storage.derivatives_cache.put(
+        resources_dir=resources_dir,
+        transform=ImageTransform(
+            max_dimension=64,
+            crop=None,
+            image_format='jpeg',
+            quality=None
+        ),
+        content=b'y' * 100
+    )
+
+    storage.resources_evictor.evict_resource(
+        stored_resource=StoredResource(
+            resource_identifier='aa000000',
+            requester_login=REQUESTER_LOGIN,
+            resource_name=COMPLETION_MARKER,
+            size=size
+        )
+    )
+
+    assert not os.path.exists(derivatives_dir(resources_dir=resources_dir))
+    assert storage.resources_index.physical_bytes(
+        input_name_pattern=INPUT_IMAGE_PATTERN
+    ) == storage.physical_bytes()